@@ -0,0 +1,81 @@
+"""Tests for Philips quirks."""
+
+import asyncio
+from unittest import mock
+
+import pytest
+import zigpy.types as t
+from zigpy.zcl import foundation
+
+import zhaquirks
+from zhaquirks.const import PRESS_TYPE
+import zhaquirks.philips.rwl022
+
+zhaquirks.setup()
+
+
+@pytest.mark.parametrize("quirk", (zhaquirks.philips.rwl022.PhilipsRWL022,))
+async def test_philips_remote_multi_press(zigpy_device_from_quirk, quirk):
+    """Test multi presses are derived per remote and per button."""
+
+    remotes = []
+    for i in range(2):
+        device = zigpy_device_from_quirk(quirk, ieee=t.EUI64([i + 1] * 8))
+        cluster = device.endpoints[1].philips_remote_cluster
+        cluster._presses.press_window = 0.05
+        listener = mock.Mock()
+        cluster.add_listener(listener)
+        remotes.append((cluster, listener))
+
+    def press(cluster, button, press_type=0):
+        hdr = foundation.ZCLHeader.cluster(tsn=1, command_id=0x00)
+        cluster.handle_cluster_request(hdr, [button, 0x000030, press_type, 0, 0, 0])
+
+    (cluster_1, listener_1), (cluster_2, listener_2) = remotes
+    press(cluster_1, 1)
+    press(cluster_2, 1)
+    press(cluster_1, 4)
+    press(cluster_1, 1)
+    press(cluster_1, 1, press_type=2)
+    press(cluster_2, 2)
+    press(cluster_2, 2)
+    press(cluster_2, 2)
+
+    assert [c.args[0] for c in listener_1.zha_send_event.mock_calls] == [
+        "on_short_release"
+    ]
+    assert listener_2.zha_send_event.call_count == 0
+
+    await asyncio.sleep(0.1)
+
+    assert [c.args[0] for c in listener_1.zha_send_event.mock_calls] == [
+        "on_short_release",
+        "off_press",
+        "on_double_press",
+    ]
+    assert listener_1.zha_send_event.mock_calls[-1].args[1][PRESS_TYPE] == (
+        "double_press"
+    )
+    assert [c.args[0] for c in listener_2.zha_send_event.mock_calls] == [
+        "on_press",
+        "up_triple_press",
+    ]
+    assert cluster_1._presses.pending == 0
+    assert cluster_2._presses.pending == 0
+
+
+async def test_philips_button_press_queue():
+    """Test the deprecated button press queue still derives multi presses."""
+
+    with pytest.warns(DeprecationWarning):
+        queue = zhaquirks.philips.ButtonPressQueue()
+    queue._presses.press_window = 0.05
+    callback = mock.Mock()
+
+    queue.press(callback, "on")
+    queue.press(callback, "on")
+    queue.press(callback, "off")
+    assert callback.call_count == 0
+
+    await asyncio.sleep(0.1)
+    assert sorted(c.args[0] for c in callback.mock_calls) == [1, 2]
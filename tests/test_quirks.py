@@ -2,10 +2,14 @@
 
 from __future__ import annotations
 
+import asyncio
 import collections
 import importlib
 import json
+import logging
 from pathlib import Path
+import subprocess
+import sys
 from unittest import mock
 
 import pytest
@@ -18,6 +22,7 @@ from zigpy.quirks import CustomDevice
 import zigpy.types
 import zigpy.zdo.types
 
+from tests.common import ZCL_IAS_MOTION_COMMAND
 import zhaquirks
 from zhaquirks import const
 import zhaquirks.bosch.motion
@@ -51,7 +56,10 @@ from zhaquirks.const import (
     SKIP_CONFIGURATION,
 )
 import zhaquirks.konke
+from zhaquirks.konke.motion import KonkeMotion
+from zhaquirks.multipress import MultiPressDetector
 import zhaquirks.philips
+from zhaquirks.timers import TimerWheel, get_timer_wheel
 from zhaquirks.xiaomi import XIAOMI_NODE_DESC
 import zhaquirks.xiaomi.aqara.vibration_aq1
 
@@ -283,6 +291,61 @@ def test_dev_from_signature(
         assert list(ep.out_clusters) == ep_data[OUTPUT_CLUSTERS]
 
 
+def test_dev_from_signature_template() -> None:
+    """Test the signature template is compiled once and applied per device."""
+
+    class QuirkDevice(zhaquirks.QuickInitDevice):
+        signature = {
+            ENDPOINTS: {
+                1: {
+                    PROFILE_ID: 260,
+                    DEVICE_TYPE: 0x0100,
+                    INPUT_CLUSTERS: [0x0000, 0x0006, 0x0006, 0xFCC0, 0x0BFF],
+                    OUTPUT_CLUSTERS: [0x000A, 0x0019],
+                },
+            },
+            MANUFACTURER: "manufacturer",
+            MODEL: "model",
+            NODE_DESCRIPTOR: XIAOMI_NODE_DESC,
+        }
+
+    app = mock.MagicMock()
+    devices = [
+        QuirkDevice.from_signature(
+            zigpy.device.Device(app, zigpy.types.EUI64([i] * 8), i), f"model_{i}"
+        )
+        for i in range(1, 4)
+    ]
+    template = QuirkDevice._compiled_signature
+
+    with mock.patch.object(zcl.Cluster, "from_id") as from_id:
+        QuirkDevice.from_signature(
+            zigpy.device.Device(app, zigpy.types.EUI64([9] * 8), 9)
+        )
+    assert from_id.call_count == 0
+    assert QuirkDevice._compiled_signature is template
+
+    for i, device in enumerate(devices, start=1):
+        ep = device.endpoints[1]
+        assert list(ep.in_clusters) == [0x0000, 0x0006, 0xFCC0, 0x0BFF]
+        assert list(ep.out_clusters) == [0x000A, 0x0019]
+        assert ep.in_clusters[0xFCC0].cluster_id == 0xFCC0
+        assert ep.in_clusters[0x0BFF].cluster_id == 0x0BFF
+        assert ep.basic.get("manufacturer") == "manufacturer"
+        assert ep.basic.get("model") == f"model_{i}"
+        assert ep.on_off.endpoint is ep
+    assert devices[0].endpoints[1].on_off is not devices[1].endpoints[1].on_off
+
+    # replacing an endpoint signature recompiles the template
+    QuirkDevice.signature[ENDPOINTS][1] = {
+        **QuirkDevice.signature[ENDPOINTS][1],
+        INPUT_CLUSTERS: [0x0000],
+    }
+    device = QuirkDevice.from_signature(devices[0])
+    assert QuirkDevice._compiled_signature is not template
+    assert list(device.endpoints[1].in_clusters) == [0x0000]
+
+
 @pytest.mark.parametrize(
     "quirk", (q for q in ALL_QUIRK_CLASSES if issubclass(q, zhaquirks.QuickInitDevice))
 )
@@ -562,6 +625,280 @@ class TestReplacementISWZPR1WP13(CustomDevice):
     assert type(zq.get_device(device)).__name__ == "TestReplacementISWZPR1WP13"
 
 
+def _run_isolated(code: str) -> str:
+    """Run code in a fresh interpreter, where no quirks are imported yet."""
+    return subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(zhaquirks.__file__).parent.parent,
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+
+
+def test_quirks_manifest_up_to_date() -> None:
+    """Ensure the prebuilt quirks manifest matches the quirks in the tree."""
+
+    built = json.loads(
+        _run_isolated(
+            "import json; from zhaquirks import manifest;"
+            " print(json.dumps(manifest.build_manifest()))"
+        )
+    )
+
+    assert (
+        built == zhaquirks.quirks_manifest.load_manifest()
+    ), "Quirks manifest is outdated, run `script/generate_manifest`"
+
+
+def test_lazy_setup() -> None:
+    """Ensure lazy setup imports quirks on lookup, in the same order as eager setup."""
+
+    manifest = zhaquirks.quirks_manifest.load_manifest()
+    keys = [
+        tuple(key) for module_keys in manifest["quirks"].values() for key in module_keys
+    ]
+
+    code = f"""
+import json, sys
+import zigpy.quirks
+import zhaquirks
+
+zhaquirks.setup(lazy=%r)
+loaded = sorted(m for m in sys.modules if m.startswith("zhaquirks."))
+for manuf, model in {keys!r}:
+    zhaquirks.quirks_manifest.load_quirks(manuf, model)
+registry = zigpy.quirks._DEVICE_REGISTRY
+quirks = [
+    [f"{{q.__module__}}.{{q.__name__}}" for q in registry.registry[manuf][model]]
+    for manuf, model in {keys!r}
+]
+v2 = [len(registry._registry_v2[key]) for key in {keys!r}]
+print(json.dumps({{"loaded": loaded, "quirks": quirks, "v2": v2}}))
+"""
+    eager = json.loads(_run_isolated(code % False))
+    lazy = json.loads(_run_isolated(code % True))
+
+    assert set(lazy["loaded"]) <= {
+        *zhaquirks.quirks_manifest.HELPER_MODULES,
+        *manifest["eager"],
+    }
+    assert len(eager["loaded"]) > len(manifest["quirks"])
+
+    assert lazy["quirks"] == eager["quirks"]
+    assert lazy["v2"] == eager["v2"]
+
+
+def test_lazy_setup_get_device() -> None:
+    """Ensure looking up a device imports its quirk modules."""
+
+    code = """
+import json, sys
+from unittest import mock
+import zigpy.device, zigpy.quirks, zigpy.types as t
+import zhaquirks
+
+zhaquirks.setup(lazy=True)
+loaded = ["zhaquirks.bosch.motion" in sys.modules]
+device = zigpy.device.Device(
+    mock.MagicMock(), t.EUI64.convert("01:02:03:04:05:06:07:08"), 0x1234
+)
+device.manufacturer = "Bosch"
+device.model = "ISW-ZPR1-WP13"
+zigpy.quirks.get_device(device)
+loaded.append("zhaquirks.bosch.motion" in sys.modules)
+print(json.dumps(loaded))
+"""
+    assert json.loads(_run_isolated(code)) == [False, True]
+
+
+def test_lazy_setup_missing_manifest(tmp_path: Path, caplog) -> None:
+    """Ensure lazy setup falls back to loading everything without a manifest."""
+
+    with mock.patch.object(
+        zhaquirks.quirks_manifest, "MANIFEST_PATH", tmp_path / "missing.json"
+    ), mock.patch.object(zhaquirks.quirks_manifest, "install_lazy_registry") as lazy:
+        zhaquirks.setup(lazy=True)
+
+    assert lazy.call_count == 0
+    assert "Quirks manifest unavailable" in caplog.text
+
+
+def test_setup_profile() -> None:
+    """Ensure profiling setup reports per module import costs."""
+
+    report = json.loads(
+        _run_isolated(
+            "import json, zhaquirks; zhaquirks.setup(profile=True);"
+            " print(json.dumps(zhaquirks.get_import_profiler().report()))"
+        )
+    )
+
+    modules = {stats["module"]: stats for stats in report["modules"]}
+    assert modules["zhaquirks.bosch.motion"]["quirks"] == 1
+    assert modules["zhaquirks.bosch.motion"]["time"] > 0
+    assert report["total_memory"] > 0
+    assert not any(stats["error"] for stats in report["modules"])
+    assert report["total_quirks"] == sum(stats["quirks"] for stats in report["modules"])
+
+
+def test_setup_profile_custom_quirks(tmp_path: Path, caplog) -> None:
+    """Ensure custom quirks are profiled, including failing ones."""
+
+    custom_quirks = tmp_path / "custom_zha_quirks"
+    custom_quirks.mkdir()
+    (custom_quirks / "__init__.py").touch()
+    (custom_quirks / "broken_quirk.py").write_text("1/")
+
+    caplog.clear()
+    with caplog.at_level(logging.INFO, logger="zhaquirks.profiling"):
+        zhaquirks.setup(custom_quirks_path=str(custom_quirks), profile=True)
+
+    profiler = zhaquirks.get_import_profiler()
+
+    stats = profiler.modules[-1]
+    assert stats.module == "broken_quirk"
+    assert stats.custom
+    assert stats.error
+    assert "Slowest:" in caplog.text
+
+    zhaquirks.setup()
+    assert zhaquirks.get_import_profiler() is None
+
+
+async def test_timer_wheel() -> None:
+    """Test timers expire in batches and can be re-armed and cancelled."""
+
+    loop = asyncio.get_running_loop()
+    wheel = TimerWheel(loop, resolution=0.01, slots=4, levels=2)
+    fired = []
+
+    def fire(name):
+        fired.append((name, loop.time()))
+
+    timers = {
+        name: wheel.call_later(delay, fire, name)
+        for name, delay in (("a", 0.02), ("b", 0.02), ("c", 0.05), ("d", 0.25))
+    }
+    short = wheel.call_later(0, fire, "short")
+    timers["b"].cancel()
+    timers["c"].reschedule(0.03)
+    assert wheel.metrics().armed == 4
+    assert wheel.metrics().peak_armed == 5
+
+    await asyncio.sleep(0.4)
+
+    assert [name for name, _ in fired] == ["short", "a", "c", "d"]
+    for name, when in fired:
+        timer = short if name == "short" else timers[name]
+        assert when >= timer.when()
+    assert timers["b"].cancelled()
+
+    metrics = wheel.metrics()
+    assert metrics.armed == 0
+    assert metrics.scheduled == 6
+    assert metrics.cancelled == 1
+    assert metrics.expired == 4
+    assert wheel._handle is None
+
+    # an expired timer can be re-armed
+    timers["a"].reschedule(0.01)
+    await asyncio.sleep(0.05)
+    assert fired[-1][0] == "a"
+
+    assert get_timer_wheel() is get_timer_wheel(loop)
+
+
+async def test_multi_press_detector_max_presses() -> None:
+    """Test presses are reported as soon as max_presses is reached."""
+
+    on_presses = mock.Mock()
+    detector = MultiPressDetector(on_presses, press_window=0.02, max_presses=2)
+
+    detector.press("a", 1)
+    detector.press("b")
+    detector.press("a", 2)
+    on_presses.assert_called_once_with("a", 2, 2)
+    assert detector.pending == 1
+
+    await asyncio.sleep(0.05)
+    assert on_presses.mock_calls[-1] == mock.call("b", 1)
+    assert detector.pending == 0
+
+    # without a press window every press is reported right away
+    detector.press_window = 0
+    detector.press("a")
+    assert on_presses.mock_calls[-1] == mock.call("a", 1)
+    assert detector.pending == 0
+
+
+async def test_multi_press_detector_hold() -> None:
+    """Test buttons kept down for hold_time are reported as held."""
+
+    on_presses = mock.Mock()
+    on_hold = mock.Mock()
+    detector = MultiPressDetector(
+        on_presses, on_hold=on_hold, press_window=0.05, hold_time=0.02
+    )
+
+    # released before hold_time, counted as a press
+    detector.button_down("a")
+    assert detector.button_up("a", "up")
+    on_presses.assert_not_called()
+
+    # the pending press is reported before the hold
+    detector.button_down("a", "down")
+    await asyncio.sleep(0.03)
+    assert on_presses.mock_calls == [mock.call("a", 1, "up")]
+    on_hold.assert_called_once_with("a", "down")
+    assert detector.pending == 0
+
+    # already reported as held, or never down
+    assert not detector.button_up("a")
+    assert not detector.button_up("b")
+
+    # holds without a press window
+    detector.press_window = 0
+    detector.button_down("b")
+    await asyncio.sleep(0.03)
+    on_hold.assert_called_with("b")
+    assert on_presses.call_count == 1
+
+    # pending holds are dropped
+    detector.button_down("c")
+    detector.cancel()
+    await asyncio.sleep(0.03)
+    assert on_hold.call_count == 2
+    assert detector.pending == 0
+
+    # holds are ignored without a hold_time
+    detector.hold_time = None
+    detector.button_down("d")
+    assert detector.pending == 0
+
+
+async def test_motion_reset_timer(zigpy_device_from_quirk) -> None:
+    """Test motion re-triggers re-arm the same shared timer."""
+
+    motion_dev = zigpy_device_from_quirk(KonkeMotion)
+    motion_cluster = motion_dev.endpoints[1].ias_zone
+    wheel = get_timer_wheel()
+    armed = wheel.metrics().armed
+
+    hdr, args = motion_cluster.deserialize(ZCL_IAS_MOTION_COMMAND)
+    motion_cluster.handle_message(hdr, args)
+    timer = motion_cluster._timer_handle
+    motion_cluster.handle_message(hdr, args)
+
+    assert motion_cluster._timer_handle is timer
+    assert wheel.metrics().armed == armed + 2  # motion and occupancy
+    assert timer.when() == pytest.approx(
+        asyncio.get_running_loop().time() + motion_cluster.reset_s, abs=0.1
+    )
+    timer.cancel()
+    motion_dev.endpoints[1].occupancy._timer_handle.cancel()
+
+
 def test_zigpy_custom_cluster_pollution() -> None:
     """Ensure all quirks subclass `CustomCluster`."""
     non_zigpy_clusters = {
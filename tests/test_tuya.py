@@ -24,7 +24,16 @@ from zhaquirks.const import (
     PROFILE_ID,
     ZONE_STATUS_CHANGE_COMMAND,
 )
-from zhaquirks.tuya import Data, TuyaManufClusterAttributes, TuyaNewManufCluster
+from zhaquirks.tuya import (
+    TUYA_QUERY_DATA,
+    Data,
+    TuyaCommand,
+    TuyaData,
+    TuyaDatapointData,
+    TuyaDPType,
+    TuyaManufClusterAttributes,
+    TuyaNewManufCluster,
+)
 import zhaquirks.tuya.sm0202_motion
 import zhaquirks.tuya.ts0041
 import zhaquirks.tuya.ts0042
@@ -1232,6 +1241,139 @@ async def test_moes(zigpy_device_from_quirk, quirk):
         datetime.datetime = origdatetime
 
 
+@pytest.mark.parametrize("quirk", (zhaquirks.tuya.ts0601_trv.MoesHY368_Type1,))
+async def test_moes_schedule_batched_update(zigpy_device_from_quirk, quirk):
+    """Test a schedule report updates its attributes in a single batch."""
+
+    valve_dev = zigpy_device_from_quirk(quirk)
+    tuya_cluster = valve_dev.endpoints[1].tuya_manufacturer
+    thermostat_cluster = valve_dev.endpoints[1].thermostat
+
+    class BatchListener:
+        def __init__(self):
+            self.batches = []
+
+        def attributes_updated(self, attributes, timestamp):
+            # every value is cached before listeners are notified
+            assert all(
+                thermostat_cluster.get(attrid) == value
+                for attrid, value in attributes.items()
+            )
+            self.batches.append(attributes)
+
+    batch_listener = BatchListener()
+    thermostat_cluster.add_listener(batch_listener)
+    thermostat_listener = ClusterListener(thermostat_cluster)
+
+    hdr, args = tuya_cluster.deserialize(ZCL_TUYA_VALVE_WORKDAY_SCHEDULE)
+    tuya_cluster.handle_message(hdr, args)
+
+    assert len(batch_listener.batches) == 1
+    assert len(batch_listener.batches[0]) == 18
+    assert batch_listener.batches[0][0x4110] == 6
+    assert batch_listener.batches[0][0x4162] == 1500
+    assert thermostat_listener.attribute_updates == list(
+        batch_listener.batches[0].items()
+    )
+    assert thermostat_cluster.get("workday_schedule_3_minute") == 30
+
+    # context listeners get the cluster as well
+    context_listener = mock.Mock(spec=["attributes_updated"])
+    thermostat_cluster.add_context_listener(context_listener)
+    attrid = thermostat_cluster.attributes_by_name["workday_schedule_3_minute"].id
+    thermostat_cluster._update_attributes({"workday_schedule_3_minute": 45})
+    context_listener.attributes_updated.assert_called_once_with(
+        thermostat_cluster, {attrid: 45}, mock.ANY
+    )
+    assert thermostat_listener.attribute_updates[-1] == (attrid, 45)
+
+    # cleared values go through _update_attribute
+    thermostat_cluster._update_attributes({attrid: None})
+    assert thermostat_cluster.get(attrid) is None
+    assert context_listener.attributes_updated.call_count == 1
+    assert len(batch_listener.batches) == 2
+
+    # clusters overriding _update_attribute keep per attribute updates
+    with mock.patch.object(
+        type(thermostat_cluster), "_update_attribute", autospec=True
+    ) as update_attribute:
+        thermostat_cluster._update_attributes({"system_mode": 0x04, 0x0025: 0x00})
+    assert update_attribute.mock_calls == [
+        mock.call(thermostat_cluster, 0x001C, 0x04),
+        mock.call(thermostat_cluster, 0x0025, 0x00),
+    ]
+    assert len(batch_listener.batches) == 2
+
+
+@pytest.mark.parametrize("quirk", (zhaquirks.tuya.ts0601_trv.MoesHY368_Type1,))
+async def test_moes_batched_and_coalesced_writes(zigpy_device_from_quirk, quirk):
+    """Test settings written together share a frame and setpoints are coalesced."""
+
+    valve_dev = zigpy_device_from_quirk(quirk)
+    tuya_cluster = valve_dev.endpoints[1].tuya_manufacturer
+    thermostat_cluster = valve_dev.endpoints[1].thermostat
+
+    async def async_success(*args, **kwargs):
+        return foundation.Status.SUCCESS
+
+    with mock.patch.object(
+        tuya_cluster.endpoint, "request", side_effect=async_success
+    ) as m1, mock.patch.object(
+        tuya_cluster,
+        "coalesce_windows",
+        {zhaquirks.tuya.ts0601_trv.MOES_TARGET_TEMP_ATTR: 0.01},
+    ):
+        (status,) = await thermostat_cluster.write_attributes(
+            {"comfort_heating_setpoint": 2100, "eco_heating_setpoint": 1500}
+        )
+        m1.assert_called_once_with(
+            61184,
+            1,
+            b"\x01\x01\x00\x00\x01"
+            b"\x6b\x02\x00\x04\x00\x00\x00\x15"
+            b"\x6c\x02\x00\x04\x00\x00\x00\x0f",
+            expect_reply=False,
+            command_id=0,
+        )
+        assert status == [
+            foundation.WriteAttributesStatusRecord(foundation.Status.SUCCESS)
+        ]
+
+        writes = [
+            asyncio.ensure_future(
+                thermostat_cluster.write_attributes(
+                    {"occupied_heating_setpoint": setpoint}
+                )
+            )
+            for setpoint in (2100, 2200, 2300)
+        ]
+        await asyncio.sleep(0)
+        assert m1.call_count == 1
+        assert not any(write.done() for write in writes)
+
+        # only the last setpoint is sent once the window ends, every write
+        # returns once it is sent
+        for (status,) in await asyncio.gather(*writes):
+            assert status == [
+                foundation.WriteAttributesStatusRecord(foundation.Status.SUCCESS)
+            ]
+        assert m1.call_count == 2
+        m1.assert_called_with(
+            61184,
+            2,
+            b"\x01\x02\x00\x00\x02\x02\x02\x00\x04\x00\x00\x00\xe6",
+            expect_reply=False,
+            command_id=0,
+        )
+
+        # send failures aren't hidden by the coalescing
+        m1.side_effect = asyncio.TimeoutError
+        with pytest.raises(asyncio.TimeoutError):
+            await thermostat_cluster.write_attributes(
+                {"occupied_heating_setpoint": 2400}
+            )
+
+
 @pytest.mark.parametrize("quirk", (zhaquirks.tuya.ts0601_electric_heating.MoesBHT,))
 async def test_eheating_state_report(zigpy_device_from_quirk, quirk):
     """Test thermostatic valves standard reporting from incoming commands."""
@@ -1453,6 +1595,89 @@ def test_multiple_attributes_report():
     assert data.data.datapoints[3].dp == 9
 
 
+async def test_tuya_new_manuf_cluster_dispatch():
+    """Test command and datapoint dispatch through the handler tables."""
+
+    class TestCluster(TuyaNewManufCluster):
+        data_point_handlers = {1: "_handle_dp", 5: "_handle_dp", 7: "_missing"}
+
+        def _handle_dp(self, record):
+            pass
+
+    ep = mock.Mock()  # fake endpoint object
+    cluster = TestCluster(ep)
+    message = (
+        b"\x09\x7B\x02\x01\x0F\x01\x01\x00\x01\x01\x05\x02\x00\x04\x00\x00\x00\x07"
+    )
+    hdr, args = cluster.deserialize(message)
+
+    # every class gets its own table, built when the class is created
+    server_to_client = foundation.Direction.Server_to_Client
+    assert (
+        TestCluster._command_handler_names[server_to_client][0x01] == "handle_get_data"
+    )
+    assert TuyaNewManufCluster._command_handler_names[server_to_client]
+    assert (
+        TestCluster._command_handler_names
+        is not TuyaNewManufCluster._command_handler_names
+    )
+
+    # handlers are bound once per instance, missing handlers are left out
+    assert cluster._command_handlers[server_to_client][0x01] == cluster.handle_get_data
+    assert cluster._dp_handlers == {1: cluster._handle_dp, 5: cluster._handle_dp}
+    with mock.patch.object(cluster, "send_default_rsp"):
+        cluster.handle_message(hdr, args)
+
+    # handlers patched on the instance are honoured
+    with mock.patch.object(cluster, "_handle_dp") as handle_dp:
+        status = cluster.handle_get_data(args.data)
+    assert status == foundation.Status.SUCCESS
+    assert [c.args[0].dp for c in handle_dp.call_args_list] == [1, 5]
+
+    with mock.patch.object(
+        cluster, "handle_set_data_response"
+    ) as handle_response, mock.patch.object(cluster, "send_default_rsp"):
+        cluster.handle_message(hdr, args)
+    handle_response.assert_called_once_with(args.data)
+
+    # unknown datapoints and datapoints without a handler
+    command = TuyaCommand(
+        status=0,
+        tsn=1,
+        datapoints=[
+            TuyaDatapointData(dp=7, data=TuyaData(t.Bool(True))),
+            TuyaDatapointData(dp=9, data=TuyaData(t.Bool(True))),
+        ],
+    )
+    assert cluster.handle_get_data(command) == foundation.Status.UNSUPPORTED_ATTRIBUTE
+
+    # unknown commands
+    with mock.patch.object(cluster, "send_default_rsp") as send_default_rsp:
+        unknown = hdr.replace(command_id=0x42)
+        cluster.handle_cluster_request(unknown, args)
+        send_default_rsp.assert_called_once_with(
+            unknown, status=foundation.Status.UNSUP_CLUSTER_COMMAND
+        )
+
+        send_default_rsp.reset_mock()
+        unknown.frame_control = unknown.frame_control.replace(
+            disable_default_response=True
+        )
+        cluster.handle_cluster_request(unknown, args)
+        assert send_default_rsp.call_count == 0
+
+    # known commands without a handler
+    with mock.patch.object(cluster, "send_default_rsp") as send_default_rsp:
+        hdr = hdr.replace(command_id=TUYA_QUERY_DATA)
+        hdr.frame_control = hdr.frame_control.replace(
+            direction=foundation.Direction.Client_to_Server
+        )
+        cluster.handle_cluster_request(hdr, ())
+        send_default_rsp.assert_called_once_with(
+            hdr, status=foundation.Status.UNSUP_CLUSTER_COMMAND
+        )
+
+
 @pytest.mark.parametrize(
     "quirk", (zhaquirks.tuya.ts0601_sensor.TuyaTempHumiditySensor,)
 )
@@ -1588,3 +1813,86 @@ async def test_power_config_no_bind(zigpy_device_from_quirk, quirk):
 
         assert len(request_mock.mock_calls) == 0
         assert len(bind_mock.mock_calls) == 0
+
+
+@pytest.mark.parametrize(
+    "data",
+    (
+        b"\x00\x05",
+        b"\x00\x05\x01\x01\x00\x01\x01",
+        b"\x01\xff\x02\x02\x00\x04\x00\x00\x00\x0b\x03\x04\x00\x01\x02",
+        b"\x00\x05\x04\x05\x00\x02\x01\x02\x05\x03\x00\x05hello",
+        b"\x00\x05\x06\x00\x00\x04\x03\x01\x02\x03\x07\x09\x00\x00",
+    ),
+)
+def test_tuya_command_deserialize(data):
+    """Test the fast Tuya command decoder matches the generic one."""
+
+    command, rest = TuyaCommand.deserialize(data)
+    expected, expected_rest = super(TuyaCommand, TuyaCommand).deserialize(data)
+
+    assert command == expected
+    assert rest == expected_rest
+    assert isinstance(command.datapoints, TuyaCommand.fields.datapoints.type)
+    for datapoint, expected_datapoint in zip(command.datapoints, expected.datapoints):
+        assert isinstance(datapoint.dp, t.uint8_t)
+        assert isinstance(datapoint.data.raw, t.LVBytes)
+        assert isinstance(datapoint.data.dp_type, TuyaDPType)
+        assert datapoint.data.dp_type == expected_datapoint.data.dp_type
+        if datapoint.data.dp_type in TuyaDPType.__members__.values():
+            assert datapoint.data.payload == expected_datapoint.data.payload
+    assert command.serialize() == data
+
+
+@pytest.mark.parametrize(
+    "data",
+    (
+        b"",
+        b"\x00",
+        b"\x00\x05\x01",
+        b"\x00\x05\x01\x01\x00",
+        b"\x00\x05\x01\x01\x00\x02\x01",
+    ),
+)
+def test_tuya_command_deserialize_too_short(data):
+    """Test the fast Tuya command decoder rejects truncated frames."""
+
+    with pytest.raises(ValueError):
+        super(TuyaCommand, TuyaCommand).deserialize(data)
+
+    with pytest.raises(ValueError):
+        TuyaCommand.deserialize(data)
+
+
+@pytest.mark.parametrize(
+    "dp_type, raw, expected",
+    (
+        (TuyaDPType.VALUE, b"\xff\xff\xff\xfe", -2),
+        (TuyaDPType.BOOL, b"\x01", True),
+        (TuyaDPType.STRING, b"abc", "abc"),
+        (TuyaDPType.ENUM, b"\x02", 2),
+        (TuyaDPType.BITMAP, b"\x01\x02", 0x0201),
+        (TuyaDPType.RAW, b"\x01\x02", b"\x01\x02"),
+    ),
+)
+def test_tuya_data_payload(dp_type, raw, expected):
+    """Test decoding Tuya data payloads."""
+
+    data = TuyaData()
+    data.dp_type = dp_type
+    data.raw = raw
+    assert data.payload == expected
+
+
+def test_tuya_data_payload_invalid():
+    """Test decoding invalid Tuya data payloads."""
+
+    data = TuyaData()
+    data.dp_type = TuyaDPType.BITMAP
+    data.raw = b"\x01\x02\x03"
+    with pytest.raises(ValueError, match="Wrong bitmap length"):
+        data.payload
+
+    data.dp_type = TuyaDPType(0x09)
+    with pytest.raises(ValueError, match="datapoint type"):
+        data.payload
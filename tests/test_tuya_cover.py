@@ -1,4 +1,9 @@
 """Test units for Tuya covers."""
+import asyncio
+from unittest import mock
+
+from zigpy.zcl import foundation
+
 from zhaquirks.tuya.ts0601_cover import TuyaMoesCover0601
 
 
@@ -19,3 +24,32 @@ def test_ts601_moes_signature(assert_signature_matches_quirk):
         "class": "zigpy.device.Device",
     }
     assert_signature_matches_quirk(TuyaMoesCover0601, signature)
+
+
+async def test_ts601_moes_coalesced_positions(zigpy_device_from_quirk):
+    """Test only the last of several positions set in a row is sent."""
+
+    cover_dev = zigpy_device_from_quirk(TuyaMoesCover0601)
+    tuya_cluster = cover_dev.endpoints[1].tuya_manufacturer
+    cover_cluster = cover_dev.endpoints[1].window_covering
+
+    with mock.patch.object(cover_cluster, "coalesce_window", 0.01), mock.patch.object(
+        tuya_cluster.endpoint, "request", return_value=foundation.Status.SUCCESS
+    ) as m1:
+        results = await asyncio.gather(
+            *(cover_cluster.go_to_lift_percentage(value) for value in (20, 40, 60))
+        )
+
+        # every caller gets the response to the single frame sent
+        assert results == [foundation.Status.SUCCESS] * 3
+        m1.assert_called_once_with(
+            61184,
+            1,
+            b"\x01\x01\x00\x00\x00\x02\x02\x00\x04\x00\x00\x00\x28",
+            expect_reply=True,
+            command_id=0,
+        )
+
+        # stop isn't coalesced
+        await cover_cluster.stop()
+        assert m1.call_count == 2
@@ -1,14 +1,29 @@
 """Tests for Tuya quirks."""
 
+import asyncio
+import dataclasses
 import datetime
+import time
 from unittest import mock
 
 import pytest
+import zigpy.types as t
 from zigpy.zcl import foundation
 
 from tests.common import ClusterListener, MockDatetime
 import zhaquirks
-from zhaquirks.tuya import TUYA_MCU_VERSION_RSP, TUYA_SET_TIME, TuyaDPType
+from zhaquirks.tuya import (
+    TUYA_ACTIVE_STATUS_RPT,
+    TUYA_GET_DATA,
+    TUYA_MCU_VERSION_RSP,
+    TUYA_SET_DATA,
+    TUYA_SET_DATA_RESPONSE,
+    TUYA_SET_TIME,
+    TuyaCommand,
+    TuyaData,
+    TuyaDatapointData,
+    TuyaDPType,
+)
 from zhaquirks.tuya.mcu import (
     ATTR_MCU_VERSION,
     TUYA_MCU_CONNECTION_STATUS,
@@ -16,6 +31,7 @@ from zhaquirks.tuya.mcu import (
     TuyaClusterData,
     TuyaMCUCluster,
 )
+from zhaquirks.tuya.ts0601_rcbo import TuyaRCBOManufCluster
 
 zhaquirks.setup()
 
@@ -375,3 +391,289 @@ async def test_tuya_mcu_classes():
         TuyaClusterData(manufacturer="xiaomi")
     with pytest.raises(ValueError):
         TuyaClusterData(manufacturer=b"")
+
+
+def _all_subclasses(cls):
+    for subclass in cls.__subclasses__():
+        yield subclass
+        yield from _all_subclasses(subclass)
+
+
+@pytest.mark.parametrize(
+    "cluster",
+    sorted(
+        {c for c in _all_subclasses(TuyaMCUCluster) if hasattr(c, "dp_to_attribute")},
+        key=lambda c: f"{c.__module__}.{c.__qualname__}",
+    ),
+)
+def test_tuya_mcu_dp_mapping_index(cluster):
+    """Test the reverse datapoint index matches a scan of dp_to_attribute."""
+
+    def scan(own_endpoint_id, endpoint_id, attribute_name):
+        return {
+            dp: dp_mapping
+            for dp, dp_mapping in cluster.dp_to_attribute.items()
+            if (
+                attribute_name == dp_mapping.attribute_name
+                or (
+                    isinstance(dp_mapping.attribute_name, tuple)
+                    and attribute_name in dp_mapping.attribute_name
+                )
+            )
+            and (
+                (dp_mapping.endpoint_id is None and endpoint_id == own_endpoint_id)
+                or endpoint_id == dp_mapping.endpoint_id
+            )
+        }
+
+    attribute_names = {"not_exists_attribute"}
+    endpoint_ids = {1, 2, 3}
+    for dp_mapping in cluster.dp_to_attribute.values():
+        if isinstance(dp_mapping.attribute_name, tuple):
+            attribute_names.update(dp_mapping.attribute_name)
+        else:
+            attribute_names.add(dp_mapping.attribute_name)
+        if dp_mapping.endpoint_id is not None:
+            endpoint_ids.add(dp_mapping.endpoint_id)
+
+    for own_endpoint_id in (1, 2):
+        index = cluster._build_dp_mapping_index(own_endpoint_id)
+        for endpoint_id in endpoint_ids:
+            for attribute_name in attribute_names:
+                expected = scan(own_endpoint_id, endpoint_id, attribute_name)
+                found = index.get((endpoint_id, attribute_name), {})
+                assert list(found.items()) == list(expected.items())
+
+
+@pytest.mark.parametrize("quirk", (zhaquirks.tuya.ts0601_siren.TuyaSirenGPP_NoSensors,))
+async def test_tuya_mcu_batch_set_data(zigpy_device_from_quirk, quirk):
+    """Test settings written in the same loop iteration share a set_data frame."""
+
+    tuya_device = zigpy_device_from_quirk(quirk)
+    tuya_cluster = tuya_device.endpoints[1].tuya_manufacturer
+    siren_cluster = tuya_device.endpoints[1].on_off
+
+    with mock.patch.object(tuya_cluster, "batch_set_data", True), mock.patch.object(
+        tuya_cluster, "command"
+    ) as m1:
+        await siren_cluster.write_attributes({"volume": 0, "alarm_duration": 20})
+        await siren_cluster.write_attributes({"melody": 3, "volume": 2})
+
+        # nothing sent until the event loop iteration ends, cache already updated
+        m1.assert_not_called()
+        assert siren_cluster.get("volume") == 2
+
+        await asyncio.sleep(0)
+
+        assert m1.call_count == 1
+        assert m1.call_args[0][0] == TUYA_SET_DATA
+        assert m1.call_args[1] == {
+            "expect_reply": False,
+            "manufacturer": foundation.ZCLHeader.NO_MANUFACTURER_ID,
+        }
+        datapoints = m1.call_args[0][1].datapoints
+        assert [dp.dp for dp in datapoints] == [5, 7, 21]
+        assert [dp.data.payload for dp in datapoints] == [2, 20, 3]
+
+
+@pytest.mark.parametrize(
+    "quirk", (zhaquirks.tuya.ts0601_dimmer.TuyaDoubleSwitchDimmer,)
+)
+async def test_tuya_mcu_coalesce_writes(zigpy_device_from_quirk, quirk):
+    """Test only the latest write of a datapoint is sent once its window ends."""
+
+    tuya_device = zigpy_device_from_quirk(quirk)
+    tuya_cluster = tuya_device.endpoints[1].tuya_manufacturer
+    dimmer1_cluster = tuya_device.endpoints[1].level
+
+    dp_to_attribute = tuya_cluster.dp_to_attribute.copy()
+    # bulb_type is sent right away
+    dp_to_attribute[4] = dataclasses.replace(dp_to_attribute[4], coalesce_window=0)
+
+    with mock.patch.object(tuya_cluster, "coalesce_window", 0.01), mock.patch.object(
+        tuya_cluster, "dp_to_attribute", dp_to_attribute
+    ), mock.patch.object(tuya_cluster, "command") as m1:
+        for level in (10, 20, 30):
+            await dimmer1_cluster.write_attributes({"minimum_level": level})
+            assert dimmer1_cluster.get("minimum_level") == level
+        await dimmer1_cluster.write_attributes({"bulb_type": 1})
+
+        assert m1.call_count == 1
+        assert [dp.dp for dp in m1.call_args[0][1].datapoints] == [4]
+
+        await asyncio.sleep(0.02)
+
+        assert m1.call_count == 2
+        datapoints = m1.call_args[0][1].datapoints
+        assert [dp.dp for dp in datapoints] == [3]
+        assert datapoints[0].data.raw == b"\x00\x00\x00\x75"  # 30 * 1000 // 255
+
+        # a new window starts with the next write
+        await dimmer1_cluster.write_attributes({"minimum_level": 40})
+        assert m1.call_count == 2
+        await asyncio.sleep(0.02)
+        assert m1.call_count == 3
+
+
+async def test_tuya_mcu_command_scheduler(zigpy_device_from_quirk):
+    """Test set_data frames are rate limited, matched with responses and retried."""
+
+    with mock.patch.multiple(
+        TuyaRCBOManufCluster,
+        max_inflight_commands=1,
+        min_command_interval=0.01,
+        command_timeout=0.05,
+        command_retries=1,
+    ):
+        tuya_device = zigpy_device_from_quirk(
+            zhaquirks.tuya.ts0601_rcbo.TuyaCircuitBreaker
+        )
+
+    tuya_cluster = tuya_device.endpoints[1].tuya_manufacturer
+    switch_cluster = tuya_device.endpoints[1].on_off
+    scheduler = tuya_cluster.command_scheduler
+
+    def mcu_response(command_id, tsn, datapoints):
+        hdr = foundation.ZCLHeader.cluster(
+            tsn=0x10,
+            command_id=command_id,
+            direction=foundation.Direction.Server_to_Client,
+        )
+        hdr.frame_control.disable_default_response = True
+        command = TuyaCommand(status=0, tsn=tsn, datapoints=datapoints)
+        tuya_cluster.handle_cluster_request(hdr, [command])
+
+    with mock.patch.object(tuya_cluster, "command") as m1:
+        await switch_cluster.write_attributes({"countdown_timer": 600})
+        await asyncio.sleep(0)
+        await switch_cluster.write_attributes({"child_lock": 1})
+        await asyncio.sleep(0)
+
+        # a single frame in flight
+        assert m1.call_count == 1
+        first = m1.call_args[0][1]
+        assert [dp.dp for dp in first.datapoints] == [9]
+        assert scheduler.stats["queued"] == 1
+        assert scheduler.stats["inflight"] == 1
+
+        # a report echoing the TSN is not a set_data_response
+        mcu_response(TUYA_GET_DATA, first.tsn, [])
+        assert scheduler.stats["acked"] == 0
+
+        # matched by TSN, next frame waits for the minimum gap
+        mcu_response(TUYA_SET_DATA_RESPONSE, first.tsn, first.datapoints)
+        assert scheduler.stats["acked"] == 1
+        assert m1.call_count == 1
+        await asyncio.sleep(0.02)
+        assert m1.call_count == 2
+        second = m1.call_args[0][1]
+        assert [dp.dp for dp in second.datapoints] == [29]
+
+        # periodic reports of the datapoint with another value don't confirm it
+        mcu_response(
+            TUYA_ACTIVE_STATUS_RPT, 0, [TuyaDatapointData(29, TuyaData(t.Bool(0)))]
+        )
+        assert scheduler.stats["acked"] == 1
+
+        # no response, retried with a new TSN
+        await asyncio.sleep(0.06)
+        assert m1.call_count == 3
+        retry = m1.call_args[0][1]
+        assert retry.datapoints == second.datapoints
+        assert retry.tsn != second.tsn
+        assert scheduler.stats["retried"] == 1
+
+        # confirmed by a report carrying the written value
+        mcu_response(TUYA_ACTIVE_STATUS_RPT, 0, second.datapoints)
+        assert scheduler.stats == {
+            "queued": 0,
+            "inflight": 0,
+            "sent": 3,
+            "acked": 2,
+            "retried": 1,
+            "failed": 0,
+            "latency_avg": mock.ANY,
+            "latency_max": mock.ANY,
+        }
+        assert 0 < scheduler.stats["latency_avg"] <= scheduler.stats["latency_max"]
+
+        # gives up after the retries
+        await switch_cluster.write_attributes({"child_lock": 0})
+        await asyncio.sleep(0.2)
+        assert m1.call_count == 5
+        assert scheduler.stats["failed"] == 1
+        assert scheduler.stats["inflight"] == 0
+
+        # momentary actions are never retried
+        await switch_cluster.command(0x74)
+        await asyncio.sleep(0.1)
+        assert m1.call_count == 6
+        assert scheduler.stats["retried"] == 2
+        assert scheduler.stats["failed"] == 2
+
+
+@pytest.mark.parametrize(
+    "quirk", (zhaquirks.tuya.ts0601_dimmer.TuyaDoubleSwitchDimmer,)
+)
+async def test_tuya_mcu_suppress_unchanged_reports(zigpy_device_from_quirk, quirk):
+    """Test reports not changing the cached values are dropped until the heartbeat."""
+
+    tuya_device = zigpy_device_from_quirk(quirk)
+    tuya_cluster = tuya_device.endpoints[1].tuya_manufacturer
+    on_off_listener = ClusterListener(tuya_device.endpoints[1].on_off)
+    level_listener = ClusterListener(tuya_device.endpoints[1].level)
+
+    def report(on_off, level):
+        tuya_cluster.handle_get_data(
+            TuyaCommand(
+                status=0,
+                tsn=1,
+                datapoints=[
+                    TuyaDatapointData(dp=1, data=TuyaData(on_off)),
+                    TuyaDatapointData(dp=2, data=TuyaData(level)),
+                ],
+            )
+        )
+
+    # disabled by default
+    report(True, 500)
+    report(True, 500)
+    assert len(on_off_listener.attribute_updates) == 2
+    assert len(level_listener.attribute_updates) == 2
+    assert tuya_cluster._dp_reported == {}
+
+    now = time.monotonic()
+    dp_to_attribute = tuya_cluster.dp_to_attribute.copy()
+    # current_level is always reported
+    dp_to_attribute[2] = dataclasses.replace(
+        dp_to_attribute[2], suppress_unchanged=False
+    )
+
+    with mock.patch.object(
+        tuya_cluster, "suppress_unchanged_reports", True
+    ), mock.patch.object(tuya_cluster, "report_heartbeat", 60), mock.patch.object(
+        tuya_cluster, "dp_to_attribute", dp_to_attribute
+    ), mock.patch(
+        "zhaquirks.tuya.time"
+    ) as time_mock:
+        time_mock.monotonic.return_value = now
+        # the first report after enabling it is always forwarded
+        report(True, 500)
+        report(True, 500)
+        assert len(on_off_listener.attribute_updates) == 3
+        assert len(level_listener.attribute_updates) == 4
+
+        report(False, 500)
+        assert on_off_listener.attribute_updates[-1] == (0x0000, False)
+        report(False, 500)
+        assert len(on_off_listener.attribute_updates) == 4
+
+        # unchanged values are still reported once per heartbeat
+        time_mock.monotonic.return_value = now + 59
+        report(False, 500)
+        assert len(on_off_listener.attribute_updates) == 4
+        time_mock.monotonic.return_value = now + 60
+        report(False, 500)
+        assert len(on_off_listener.attribute_updates) == 5
+        report(False, 500)
+        assert len(on_off_listener.attribute_updates) == 5
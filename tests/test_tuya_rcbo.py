@@ -205,6 +205,41 @@ async def test_report_values_rcbo(zigpy_device_from_quirk, frame, cluster, attri
     assert tuya_listener.attribute_updates == list(attributes.items())
 
 
+async def test_report_masked_values_rcbo(zigpy_device_from_quirk):
+    """Test merging masked attributes and caching the target clusters."""
+
+    rcbo_dev = zigpy_device_from_quirk(zhaquirks.tuya.ts0601_rcbo.TuyaCircuitBreaker)
+    tuya_cluster = rcbo_dev.endpoints[1].tuya_manufacturer
+    em_cluster = rcbo_dev.endpoints[1].electrical_measurement
+    em_listener = ClusterListener(em_cluster)
+
+    def report(frame):
+        hdr, args = tuya_cluster.deserialize(frame)
+        tuya_cluster.handle_message(hdr, args)
+
+    # voltage threshold: over/under voltage alarms, bits 6 and 7
+    report(b'\x09\x0e\x01\x02\x03n\x00\x00\x08\x0b"\x00\x01\x01\xf4\x00\x01')
+    assert em_cluster.get("ac_alarms_mask") == 0xC0
+    # current threshold: over current alarm, bit 1
+    report(b"\x09\x0f\x01\x02\x03o\x00\x00\x05\x01\x86\xa0\x00\x01")
+    assert em_cluster.get("ac_alarms_mask") == 0xC2
+    report(b'\x09\x0e\x01\x02\x03n\x00\x00\x08\x0b"\x00\x00\x01\xf4\x00\x01')
+    assert em_cluster.get("ac_alarms_mask") == 0x82
+    assert len(em_listener.attribute_updates) == 5 + 3 + 5
+
+    assert tuya_cluster._dp_targets[110] == (
+        em_cluster,
+        (0x0807, 0xF6E3, 0x0800, 0x0808, 0xF6E7),
+    )
+    assert tuya_cluster._dp_targets[111][0] is em_cluster
+
+    # adding endpoints invalidates the cache
+    rcbo_dev.add_endpoint(2)
+    report(b"\x09\x0f\x01\x02\x03o\x00\x00\x05\x01\x86\xa0\x00\x00")
+    assert em_cluster.get("ac_alarms_mask") == 0x80
+    assert list(tuya_cluster._dp_targets) == [111]
+
+
 @pytest.mark.parametrize(
     "frames_pre, frame, cluster, attributes",
     (
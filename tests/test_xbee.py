@@ -1,5 +1,6 @@
 """Test XBee device."""
 
+import asyncio
 from unittest import mock
 
 import pytest
@@ -17,6 +18,7 @@ from zhaquirks.xbee import (
     XBEE_IO_CLUSTER,
     XBEE_PROFILE_ID,
 )
+from zhaquirks.xbee.types import IOSample
 from zhaquirks.xbee.xbee3_io import XBee3Sensor
 from zhaquirks.xbee.xbee_io import XBeeSensor
 
@@ -190,6 +192,128 @@ async def test_receive_serial_data(zigpy_device_from_quirk):
     )
 
 
+async def test_serial_stream(zigpy_device_from_quirk):
+    """Test streaming serial data to and from an XBee device."""
+
+    xbee3_device = zigpy_device_from_quirk(XBee3Sensor)
+    xbee3_device.application.request.reset_mock()
+
+    listener = mock.MagicMock()
+    xbee3_device.endpoints[XBEE_DATA_ENDPOINT].out_clusters[
+        LevelControl.cluster_id
+    ].add_listener(listener)
+
+    reader, writer = await xbee3_device.open_serial_connection(chunk_size=4)
+    with pytest.raises(RuntimeError):
+        await xbee3_device.open_serial_connection()
+
+    # written data is split into chunks
+    writer.write(b"\x00\x01\x02\x03\xff\xfe")
+    writer.write(b"\xfd")
+    await writer.drain()
+    await asyncio.sleep(0)
+    assert [c.args[6] for c in xbee3_device.application.request.await_args_list] == [
+        b"\x00\x01\x02\x03",
+        b"\xff\xfe\xfd",
+    ]
+
+    # received data is reassembled as bytes and not relayed as events
+    for data in (b"\xe9Test", b" UART ", b"data\n"):
+        xbee3_device.handle_message(
+            XBEE_PROFILE_ID,
+            XBEE_DATA_CLUSTER,
+            XBEE_DATA_ENDPOINT,
+            XBEE_DATA_ENDPOINT,
+            data,
+        )
+    assert await reader.readline() == b"\xe9Test UART data\n"
+    assert listener.zha_send_event.call_count == 0
+
+    writer.close()
+    await writer.wait_closed()
+    assert reader.at_eof()
+
+    xbee3_device.handle_message(
+        XBEE_PROFILE_ID,
+        XBEE_DATA_CLUSTER,
+        XBEE_DATA_ENDPOINT,
+        XBEE_DATA_ENDPOINT,
+        b"Test UART data",
+    )
+    listener.zha_send_event.assert_called_once_with(
+        "receive_data", {"data": "Test UART data"}
+    )
+
+
+async def test_serial_stream_pause_reading(zigpy_device_from_quirk):
+    """Test data received while reading is paused is held back until resumed."""
+
+    xbee3_device = zigpy_device_from_quirk(XBee3Sensor)
+    _, writer = await xbee3_device.open_serial_connection()
+    transport = writer.transport
+    protocol = mock.Mock()
+    transport.set_protocol(protocol)
+
+    def receive(data):
+        xbee3_device.handle_message(
+            XBEE_PROFILE_ID,
+            XBEE_DATA_CLUSTER,
+            XBEE_DATA_ENDPOINT,
+            XBEE_DATA_ENDPOINT,
+            data,
+        )
+
+    transport.pause_reading()
+    assert not transport.is_reading()
+    receive(b"Test ")
+    receive(b"UART ")
+    await asyncio.sleep(0)
+    assert protocol.data_received.call_count == 0
+
+    transport.resume_reading()
+    receive(b"data\n")
+    assert protocol.data_received.call_count == 0
+    await asyncio.sleep(0)
+    assert protocol.data_received.mock_calls == [mock.call(b"Test UART data\n")]
+
+    receive(b"more\n")
+    assert protocol.data_received.mock_calls[-1] == mock.call(b"more\n")
+
+
+async def test_serial_stream_backpressure(zigpy_device_from_quirk):
+    """Test writers wait for the serial data to be sent and see send failures."""
+
+    xbee3_device = zigpy_device_from_quirk(XBee3Sensor)
+    sent = asyncio.Event()
+
+    async def request(*args, **kwargs):
+        await sent.wait()
+        sent.clear()
+        return foundation.Status.SUCCESS, None
+
+    xbee3_device.application.request.configure_mock(side_effect=request)
+
+    _, writer = await xbee3_device.open_serial_connection(chunk_size=10)
+    writer.transport.set_write_buffer_limits(high=20)
+    writer.write(bytes(50))
+    drain = asyncio.create_task(writer.drain())
+
+    # writing resumes once the buffer is down to the low water mark of 5 bytes
+    for buffered in (40, 30, 20, 10, 0):
+        for _ in range(5):
+            await asyncio.sleep(0)
+        assert writer.transport.get_write_buffer_size() == buffered
+        assert not drain.done()
+        sent.set()
+    await drain
+
+    xbee3_device.application.request.configure_mock(side_effect=OSError("failed"))
+    writer.write(bytes(50))
+    with pytest.raises(OSError):
+        await writer.drain()
+    assert writer.is_closing()
+
+
 @pytest.mark.parametrize(
     "command_id, request_value, request_data, response_data, response_command, response_value",
     (
@@ -501,6 +625,164 @@ async def test_remote_at_tx_failure(zigpy_device_from_quirk):
     xbee3_device.application.request.configure_mock(side_effect=None)
 
 
+async def test_remote_at_pending_requests(zigpy_device_from_quirk):
+    """Test frame ids of remote AT commands are tracked per device."""
+
+    xbee_1 = zigpy_device_from_quirk(XBee3Sensor, ieee="01:02:03:04:05:06:07:08")
+    xbee_2 = zigpy_device_from_quirk(XBee3Sensor, ieee="01:02:03:04:05:06:07:09")
+    pending_1 = (
+        xbee_1.endpoints[XBEE_AT_ENDPOINT]
+        .in_clusters[XBEE_AT_RESPONSE_CLUSTER]
+        .pending_requests
+    )
+    pending_2 = (
+        xbee_2.endpoints[XBEE_AT_ENDPOINT]
+        .in_clusters[XBEE_AT_RESPONSE_CLUSTER]
+        .pending_requests
+    )
+
+    # both devices use frame id 1 without answering each other's requests
+    task_1 = asyncio.create_task(xbee_1.remote_at("TP"))
+    task_2 = asyncio.create_task(xbee_2.remote_at("TP"))
+    await asyncio.sleep(0)
+    assert 1 in pending_1 and 1 in pending_2
+
+    xbee_2.handle_message(
+        XBEE_PROFILE_ID,
+        XBEE_AT_RESPONSE_CLUSTER,
+        XBEE_AT_ENDPOINT,
+        XBEE_AT_ENDPOINT,
+        b"\x01TP\x00\x00\x18",
+    )
+    assert await task_2 == 24
+    assert not task_1.done()
+
+    # a late response after the request timed out is dropped
+    pending_1.timeout = 0
+    task_3 = asyncio.create_task(xbee_1.remote_at("TP"))
+    with pytest.raises(TimeoutError):
+        await task_3
+    assert 2 not in pending_1
+    xbee_1.handle_message(
+        XBEE_PROFILE_ID,
+        XBEE_AT_RESPONSE_CLUSTER,
+        XBEE_AT_ENDPOINT,
+        XBEE_AT_ENDPOINT,
+        b"\x02TP\x00\x00\x18",
+    )
+
+    # cancelled requests release their frame id
+    task_1.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task_1
+    await asyncio.sleep(0)
+    assert len(pending_1) == 0
+
+    metrics = pending_1.metrics()
+    assert metrics.in_flight == 0
+    assert metrics.peak_in_flight == 2
+    assert metrics.sent == 2
+    assert metrics.expired == 1
+    assert metrics.cancelled == 1
+    assert metrics.unexpected == 1
+    assert pending_2.metrics().completed == 1
+
+
+async def test_remote_at_frame_id_allocation():
+    """Test frame ids skip pending requests and run out after 255 requests."""
+
+    pending = zhaquirks.xbee.PendingATRequests()
+    futures = {}
+    for _ in range(255):
+        frame_id, future = pending.new_request()
+        futures[frame_id] = future
+    assert sorted(futures) == list(range(1, 256))
+
+    with pytest.raises(RuntimeError):
+        pending.new_request()
+
+    # only frame ids 7 and 3 are free, in allocation order
+    pending.pop(3).set_result(None)
+    pending.pop(7).set_result(None)
+    for frame_id in (3, 7):
+        new_frame_id, futures[frame_id] = pending.new_request()
+        assert new_frame_id == frame_id
+
+    for future in futures.values():
+        future.cancel()
+    await asyncio.sleep(0)
+    assert len(pending) == 0
+
+
+async def test_remote_at_batch(zigpy_device_from_quirk):
+    """Test batched remote AT commands are applied together."""
+
+    xbee3_device = zigpy_device_from_quirk(XBee3Sensor)
+    in_flight = peak_in_flight = 0
+
+    async def remote_at_command(nwk, cmd_name, *args, **kwargs):
+        nonlocal in_flight, peak_in_flight
+        in_flight += 1
+        peak_in_flight = max(peak_in_flight, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        if cmd_name == "D3":
+            raise RuntimeError("AT Command response: INVALID_PARAMETER")
+
+    with mock.patch.object(
+        xbee3_device.application,
+        "remote_at_command",
+        create=True,
+        new_callable=mock.AsyncMock,
+        side_effect=remote_at_command,
+    ) as m1:
+        results, apply_results = await xbee3_device.remote_at_batch(
+            [(f"D{pin}", 3) for pin in range(6)], max_in_flight=2, write=True
+        )
+
+    assert apply_results == [None, None]
+    assert results[:3] == [None, None, None]
+    assert isinstance(results[3], RuntimeError)
+    assert results[4:] == [None, None]
+    assert peak_in_flight == 2
+    assert m1.await_args_list == [
+        *(
+            mock.call(0x1234, f"D{pin}", 3, apply_changes=False, encryption=False)
+            for pin in range(6)
+        ),
+        mock.call(0x1234, "AC", apply_changes=True, encryption=False),
+        mock.call(0x1234, "WR", apply_changes=True, encryption=False),
+    ]
+
+
+async def test_remote_at_batch_apply_failure(zigpy_device_from_quirk):
+    """Test the command responses are kept when applying the changes fails."""
+
+    xbee3_device = zigpy_device_from_quirk(XBee3Sensor)
+    error = RuntimeError("AT Command response: ERROR")
+
+    async def remote_at_command(nwk, cmd_name, *args, **kwargs):
+        if cmd_name == "AC":
+            raise error
+        return cmd_name
+
+    with mock.patch.object(
+        xbee3_device.application,
+        "remote_at_command",
+        create=True,
+        new_callable=mock.AsyncMock,
+        side_effect=remote_at_command,
+    ) as m1:
+        results, apply_results = await xbee3_device.remote_at_batch(
+            [("D0", 3), ("D1", 3)], write=True
+        )
+
+    assert results == ["D0", "D1"]
+    assert apply_results == [error]
+    # nothing is written to flash if the changes weren't applied
+    assert [c.args[1] for c in m1.await_args_list] == ["D0", "D1", "AC"]
+
+
 async def test_io_sample_report(zigpy_device_from_quirk):
     """Test DigitalIOCluster cluster."""
 
@@ -543,6 +825,134 @@ async def test_io_sample_report(zigpy_device_from_quirk):
     assert analog_listeners[4].attribute_updates[0] == (0x0055, 3.305)
 
 
+async def test_io_sample_report_sample_sets(zigpy_device_from_quirk):
+    """Test every sample set of an IO sample report is applied in order."""
+
+    xbee3_device = zigpy_device_from_quirk(XBee3Sensor)
+    digital_listener = ClusterListener(xbee3_device.endpoints[0xD0].on_off)
+    analog_listener = ClusterListener(xbee3_device.endpoints[0xD1].analog_input)
+
+    # D0 digital, A1 analog, three sample sets
+    xbee3_device.handle_message(
+        XBEE_PROFILE_ID,
+        XBEE_IO_CLUSTER,
+        XBEE_DATA_ENDPOINT,
+        XBEE_DATA_ENDPOINT,
+        b"\x03\x00\x01\x02" b"\x00\x01\x00\x66" b"\x00\x00\x00\xcc" b"\x00\x01\x01\x32",
+    )
+
+    assert digital_listener.attribute_updates == [(0x0000, 1), (0x0000, 0), (0x0000, 1)]
+    assert [value for _, value in analog_listener.attribute_updates] == [
+        0x66 / 10.23,
+        0xCC / 10.23,
+        0x132 / 10.23,
+    ]
+
+
+async def test_io_sample_report_changes_only(zigpy_device_from_quirk):
+    """Test only changed pins and analog values beyond the deadband are updated."""
+
+    xbee3_device = zigpy_device_from_quirk(XBee3Sensor)
+    io_cluster = xbee3_device.endpoints[XBEE_DATA_ENDPOINT].in_clusters[XBEE_IO_CLUSTER]
+    io_cluster.analog_deadband = 5
+    digital_listeners = [
+        ClusterListener(xbee3_device.endpoints[e].on_off) for e in (0xD0, 0xD1)
+    ]
+    analog_listener = ClusterListener(xbee3_device.endpoints[0xD2].analog_input)
+
+    def io_sample(digital_sample, analog_sample):
+        # D0 and D1 digital, A2 analog
+        xbee3_device.handle_message(
+            XBEE_PROFILE_ID,
+            XBEE_IO_CLUSTER,
+            XBEE_DATA_ENDPOINT,
+            XBEE_DATA_ENDPOINT,
+            b"\x01\x00\x03\x04"
+            + digital_sample.to_bytes(2, "big")
+            + analog_sample.to_bytes(2, "big"),
+        )
+
+    io_sample(0b01, 100)
+    io_sample(0b01, 104)
+    io_sample(0b11, 95)
+    io_sample(0b10, 90)
+
+    assert digital_listeners[0].attribute_updates == [(0x0000, 1), (0x0000, 0)]
+    assert digital_listeners[1].attribute_updates == [(0x0000, 0), (0x0000, 1)]
+    assert [value for _, value in analog_listener.attribute_updates] == [
+        100 / 10.23,
+        90 / 10.23,
+    ]
+
+
+async def test_io_sample_report_missing_pin_endpoint(zigpy_device_from_quirk):
+    """Test samples of pins without an endpoint are skipped."""
+
+    xbee3_device = zigpy_device_from_quirk(XBee3Sensor)
+    del xbee3_device.endpoints[0xD1]
+    digital_listener = ClusterListener(xbee3_device.endpoints[0xD0].on_off)
+    analog_listener = ClusterListener(xbee3_device.endpoints[0xD2].analog_input)
+
+    # D0 and D1 digital, A1 and A2 analog
+    xbee3_device.handle_message(
+        XBEE_PROFILE_ID,
+        XBEE_IO_CLUSTER,
+        XBEE_DATA_ENDPOINT,
+        XBEE_DATA_ENDPOINT,
+        b"\x01\x00\x03\x06\x00\x03\x00\x10\x00\x20",
+    )
+
+    assert digital_listener.attribute_updates == [(0x0000, 1)]
+    assert analog_listener.attribute_updates == [(0x0055, 0x20 / 10.23)]
+
+
+@pytest.mark.parametrize(
+    "data, digital_samples, analog_samples",
+    (
+        # D0, D7 and P4 digital, A0 and supply voltage analog, two sample sets
+        (
+            b"\x02\x40\x81\x81\x40\x01\x00\x10\x0c\xe9\x00\x80\x00\x20\x0c\xe8",
+            [
+                [1, *[None] * 6, 0, *[None] * 6, 1],
+                [0, *[None] * 6, 1, *[None] * 6, 0],
+            ],
+            [
+                [0x10, *[None] * 6, 0xCE9],
+                [0x20, *[None] * 6, 0xCE8],
+            ],
+        ),
+        # A1 analog only
+        (
+            b"\x01\x00\x00\x02\x01\xff",
+            [[None] * 15],
+            [[None, 0x1FF, *[None] * 6]],
+        ),
+    ),
+)
+def test_io_sample_deserialize(data, digital_samples, analog_samples):
+    """Test deserializing IO samples with several sample sets."""
+
+    sample, rest = IOSample.deserialize(data + b"rest")
+
+    assert rest == b"rest"
+    assert [s["digital_samples"] for s in sample.sample_sets] == digital_samples
+    assert [s["analog_samples"] for s in sample.sample_sets] == analog_samples
+    assert sample is sample.sample_sets[-1]
+    assert all(not s.earlier_sample_sets for s in sample.earlier_sample_sets)
+    assert all(s is not sample for s in sample.earlier_sample_sets)
+
+
+@pytest.mark.parametrize(
+    "data",
+    (b"", b"\x00\x00\x01\x00", b"\x02\x00\x01\x00\x00\x01"),
+)
+def test_io_sample_deserialize_invalid(data):
+    """Test IO samples without sample sets or truncated ones are rejected."""
+
+    with pytest.raises(ValueError):
+        IOSample.deserialize(data)
+
+
 async def test_io_sample_report_on_at_response(zigpy_device_from_quirk):
     """Test update samples on non-native IS command response."""
 
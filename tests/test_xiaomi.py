@@ -7,6 +7,7 @@ from unittest import mock
 
 import pytest
 import zigpy.device
+import zigpy.quirks
 import zigpy.types as t
 from zigpy.zcl import foundation
 from zigpy.zcl.clusters.closures import WindowCovering
@@ -36,6 +37,11 @@ import zhaquirks
 from zhaquirks.const import (
     BUTTON_1,
     BUTTON_2,
+    CLICK_TYPE,
+    COMMAND_CLICK,
+    COMMAND_HOLD,
+    COMMAND_RELEASE,
+    COMMAND_SINGLE,
     DEVICE_TYPE,
     ENDPOINTS,
     INPUT_CLUSTERS,
@@ -56,7 +62,9 @@ from zhaquirks.xiaomi import (
     BasicCluster,
     XiaomiCustomDevice,
     XiaomiQuickInitDevice,
+    XiaomiRoute,
     handle_quick_init,
+    register_aqara_tags,
 )
 import zhaquirks.xiaomi.aqara.driver_curtain_e1
 from zhaquirks.xiaomi.aqara.feeder_acn001 import (
@@ -127,6 +135,201 @@ def test_basic_cluster_deserialize_wrong_len_2():
     assert deserialized[1]
 
 
+@pytest.mark.parametrize(
+    "model, expected",
+    (
+        (
+            "lumi.weather",
+            {
+                "battery_voltage_mV": 3000.0,
+                "temperature_measurement": 2000.0,
+                "humidity_measurement": 5000.0,
+                "pressure_measurement_precision": 100000.0,
+                "0xff01-200": 1.0,
+            },
+        ),
+        (
+            "lumi.airmonitor.acn01",
+            {
+                "battery_voltage_mV": 3000.0,
+                "temperature_measurement": 2000.0,
+                "humidity_measurement": 5000.0,
+                "tvoc_measurement": 100000.0,
+                "0xff01-200": 1.0,
+            },
+        ),
+        (
+            "lumi.unknown",
+            {
+                "battery_voltage_mV": 3000.0,
+                "0xff01-100": 2000.0,
+                "0xff01-101": 5000.0,
+                "0xff01-102": 100000.0,
+                "0xff01-200": 1.0,
+            },
+        ),
+    ),
+)
+def test_xiaomi_parse_aqara_attributes(model, expected):
+    """Test Aqara attribute tags are named according to the model."""
+    cluster = BasicCluster(mock.MagicMock())
+    cluster.endpoint.device.model = model
+
+    value = create_aqara_attr_report(
+        {1: 3000, 100: 2000, 101: 5000, 102: 100000, 200: 1}
+    )
+    assert cluster._parse_aqara_attributes(value + b"\x00") == expected
+
+
+def test_xiaomi_register_aqara_tags():
+    """Test registering Aqara attribute tags for a new model."""
+    cluster = BasicCluster(mock.MagicMock())
+    cluster.endpoint.device.model = "lumi.new_model"
+    value = create_aqara_attr_report({1: 3000, 3: 25, 150: 230})
+
+    with mock.patch.dict(zhaquirks.xiaomi._AQARA_MODEL_TAGS):
+        register_aqara_tags(("lumi.new_model",), {150: "voltage"})
+        register_aqara_tags(("lumi.new_model",), {3: "device_temperature"})
+
+        assert cluster._parse_aqara_attributes(value) == {
+            "battery_voltage_mV": 3000.0,
+            "device_temperature": 25.0,
+            "voltage": 230.0,
+        }
+
+    assert cluster._parse_aqara_attributes(value) == {
+        "battery_voltage_mV": 3000.0,
+        "temperature": 25.0,
+        "0xff01-150": 230.0,
+    }
+
+
+def _all_attr_report_interpretations(cluster, data):
+    """Enumerate every interpretation of a Xiaomi report, exponential reference."""
+    if not data:
+        yield ()
+        return
+
+    try:
+        parsed = list(cluster._iter_parse_attr_report(data))
+    except (KeyError, ValueError):
+        return
+
+    for attr, remaining_data in parsed:
+        for remaining_attrs in _all_attr_report_interpretations(
+            cluster, remaining_data
+        ):
+            yield (attr,) + remaining_attrs
+
+
+def _xiaomi_blob_report(count, len_offset, blob=b"\x01!\xb3\x0b\x03(\x17"):
+    """Create a report of 0xFF01 attributes with a wrong string length."""
+    return (b"\x01\xffB" + bytes([len(blob) + len_offset]) + blob) * count
+
+
+@pytest.mark.parametrize(
+    "data",
+    (
+        b'\x05\x00B\x15lumi.sensor_wleak.aq1\x01\xffB"\x01!\xb3\x0b\x03('
+        b"\x17\x04!\xa8C\x05!\xa7\x00\x06$\x00\x00\x00\x00\x00\x08!\x04"
+        b"\x02\n!\x00\x00d\x10\x01",
+        b'\x01\xffB"\x01!\xb3\x0b\x03(\x17\x04!\xa8C\x05!\xa7\x00\x06$\x15'
+        b"\x00\x14\x00\x00\x08!\x04\x02\n!\x00\x00d\x10\x01",
+        b"\x05\x00B\x03abc",
+        b"\x01\xffB\x02\x00\x00\x00",
+        b"\x01\xffB\x00\x01\xffB\x00",
+        b"\x01\xffB\x10\x00",
+        b"",
+        _xiaomi_blob_report(3, 0),
+        _xiaomi_blob_report(3, 1),
+        _xiaomi_blob_report(3, -1),
+        _xiaomi_blob_report(2, 0, blob=b"\x01\xffB\x00"),
+    ),
+)
+def test_xiaomi_interpret_attr_reports(data):
+    """Test the first interpretation of a report matches exhaustive search."""
+    cluster = BasicCluster(mock.MagicMock())
+
+    expected = list(_all_attr_report_interpretations(cluster, data))
+    attrs, ambiguous = cluster._interpret_attr_reports(data)
+
+    assert attrs == (expected[0] if expected else None)
+    assert ambiguous == (len(expected) > 1)
+
+
+@pytest.mark.parametrize(
+    "data",
+    (
+        # attribute reports
+        b"\x1c_\x11\x12\n"
+        b'\x05\x00B\x15lumi.sensor_wleak.aq1\x01\xffB"\x01!\xb3\x0b\x03('
+        b"\x17\x04!\xa8C\x05!\xa7\x00\x06$\x00\x00\x00\x00\x00\x08!\x04"
+        b"\x02\n!\x00\x00d\x10\x01",
+        b"\x18\x01\n\x05\x00B\x12lumi.sensor_magnet\x01\x00 \x01",
+        b"\x18\x01\n" + _xiaomi_blob_report(3, -1),
+        b"\x18\x01\n\x01\xffB\x00\x01\xffB\x00",
+        b"\x18\x01\n",
+        # other global commands
+        b"\x18\x02\x01\x05\x00\x00B\x03abc",
+        b"\x00\x03\x00\x05\x00",
+        # cluster command
+        b"\x11\x04\x00",
+        # unknown general command
+        b"\x18\x05\x7f\x01\x02",
+    ),
+)
+def test_xiaomi_deserialize(data):
+    """Test deserializing frames matches re-encoding the fixed report."""
+    cluster = BasicCluster(mock.MagicMock())
+
+    hdr, response = cluster.deserialize(data)
+    expected_hdr, expected_response = cluster._deserialize_reencoded(data)
+
+    assert hdr == expected_hdr
+    assert hdr.direction == expected_hdr.direction
+    assert response == expected_response
+    assert type(response) is type(expected_response)
+
+
+def test_xiaomi_deserialize_manufacturer_specific():
+    """Test manufacturer specific reports are parsed as Xiaomi reports."""
+    cluster = BasicCluster(mock.MagicMock())
+    data = b"\x1c\x5f\x11\x12\n" + _xiaomi_blob_report(2, 1)
+
+    hdr, response = cluster.deserialize(data)
+
+    assert hdr.manufacturer == 0x115F
+    assert len(response.attribute_reports) == 2
+    assert (hdr, response) == cluster._deserialize_reencoded(data)
+
+    with pytest.raises(ValueError):
+        cluster.deserialize(b"\x1c\x5f\x11\x12")
+
+    # unparsable reports are passed through
+    with pytest.raises(ValueError):
+        cluster._deserialize_reencoded(b"\x18\x01\n\x01\xffB\x10\x00")
+    with pytest.raises(ValueError):
+        cluster.deserialize(b"\x18\x01\n\x01\xffB\x10\x00")
+
+
+def test_xiaomi_interpret_attr_reports_linear():
+    """Test every suffix of a report is only parsed once."""
+    cluster = BasicCluster(mock.MagicMock())
+    data = _xiaomi_blob_report(50, -1)
+
+    with mock.patch.object(
+        cluster,
+        "_iter_parse_attr_report",
+        wraps=cluster._iter_parse_attr_report,
+    ) as iter_parse:
+        attrs, ambiguous = cluster._interpret_attr_reports(data)
+
+    assert len(attrs) == 50
+    assert not ambiguous
+    suffixes = [len(c.args[0]) for c in iter_parse.call_args_list]
+    assert len(suffixes) == len(set(suffixes))
+
+
 @pytest.mark.parametrize(
     "quirk",
     (
@@ -234,6 +437,89 @@ def test_xiaomi_quick_init_wrong_cluster_or_message(raw_device, cluster, message
     assert raw_device.application.device_initialized.call_count == 0
 
 
+@pytest.mark.parametrize(
+    "cluster, message",
+    (
+        (1, b"\x18\x00\n\x05\x00B\x11lumi.sensor_sm0ke\x01\x00 \x01"),
+        (0, b"\x19\x00\n\x05\x00B\x11lumi.sensor_sm0ke\x01\x00 \x01"),
+        (0, b"\x18\x00\x01\x05\x00B\x11lumi.sensor_sm0ke\x01\x00 \x01"),
+        (0, b"\x18\x00\n\x04\x00B\x11lumi.sensor_sm0ke\x01\x00 \x01"),
+        (0, b"\x1c\x5f\x11\x00\x01\x05\x00B\x03abc"),
+        (0, b"\x18\x00"),
+        (0, b""),
+    ),
+)
+def test_xiaomi_quick_init_prefilter(raw_device, cluster, message):
+    """Test messages which can't be model reports are not parsed."""
+
+    with mock.patch("zigpy.zcl.foundation.ZCLHeader.deserialize") as hdr_deserialize:
+        assert handle_quick_init(raw_device, 0x0260, cluster, 1, 1, message) is None
+        assert hdr_deserialize.call_count == 0
+
+
+def test_xiaomi_quick_init_quirk_cache(raw_device):
+    """Test quick init quirks are cached per model until the registry changes."""
+
+    model = "lumi.sensor_cache_test"
+    message = b"\x18\x00\n\x05\x00B\x16lumi.sensor_cache_test\x01\x00 \x01"
+
+    with mock.patch.object(
+        zhaquirks.xiaomi.XiaomiQuickInitDevice, "from_signature"
+    ) as from_signature:
+        assert handle_quick_init(raw_device, 0x0260, 0, 1, 1, message) is None
+        assert zhaquirks.xiaomi._QUICK_INIT_QUIRKS[model][1] == ()
+
+        class OtherQuirk(XiaomiCustomDevice):
+            signature = {MANUFACTURER: LUMI, MODEL: model}
+
+        assert handle_quick_init(raw_device, 0x0260, 0, 1, 1, message) is None
+
+        class CacheQuirk(XiaomiQuickInitDevice):
+            signature = {MANUFACTURER: LUMI, MODEL: model}
+
+        assert handle_quick_init(raw_device, 0x0260, 0, 1, 1, message) is True
+        assert zhaquirks.xiaomi._QUICK_INIT_QUIRKS[model][1] == (CacheQuirk,)
+        from_signature.assert_called_once_with(raw_device, model)
+
+
+def test_xiaomi_quick_init_quirk_cache_replaced(raw_device):
+    """Test replacing a quick init quirk invalidates the cached quirks."""
+
+    model = "lumi.sensor_replace_test"
+    message = b"\x18\x00\n\x05\x00B\x18lumi.sensor_replace_test\x01\x00 \x01"
+
+    class OldQuirk(XiaomiQuickInitDevice):
+        signature = {MANUFACTURER: LUMI, MODEL: model}
+
+    with mock.patch.object(
+        zhaquirks.xiaomi.XiaomiQuickInitDevice, "from_signature"
+    ) as from_signature:
+        assert handle_quick_init(raw_device, 0x0260, 0, 1, 1, message) is True
+        assert zhaquirks.xiaomi._QUICK_INIT_QUIRKS[model][1] == (OldQuirk,)
+
+        # same registry list with the same length, but a different quirk
+        zigpy.quirks._DEVICE_REGISTRY.remove(OldQuirk)
+
+        class NewQuirk(XiaomiQuickInitDevice):
+            signature = {MANUFACTURER: LUMI, MODEL: model}
+
+        assert handle_quick_init(raw_device, 0x0260, 0, 1, 1, message) is True
+        assert zhaquirks.xiaomi._QUICK_INIT_QUIRKS[model][1] == (NewQuirk,)
+        assert from_signature.call_count == 2
+
+    class OtherQuirk(XiaomiQuickInitDevice):
+        signature = {MANUFACTURER: LUMI, MODEL: model}
+
+    assert zhaquirks.xiaomi._get_quick_init_quirks(model) == (OtherQuirk, NewQuirk)
+
+    # reordered in place, like the lazy loader does
+    zigpy.quirks.get_quirk_list(LUMI, model).reverse()
+    assert zhaquirks.xiaomi._get_quick_init_quirks(model) == (NewQuirk, OtherQuirk)
+
+    zigpy.quirks._DEVICE_REGISTRY.remove(NewQuirk)
+    zigpy.quirks._DEVICE_REGISTRY.remove(OtherQuirk)
+
+
 def test_xiaomi_quick_init_wrong_quirk_type(raw_device):
     """Test quick init for existing quirk which is not enabled for quick joining."""
 
@@ -388,6 +674,33 @@ async def test_xiaomi_batt_size(zigpy_device_from_quirk, quirk, batt_size):
     assert succ["battery_size"] == batt_size
 
 
+async def test_mija_button_click_and_hold(zigpy_device_from_quirk):
+    """Test the mija button derives clicks and holds from on/off reports."""
+
+    device = zigpy_device_from_quirk(zhaquirks.xiaomi.mija.sensor_switch.MijaButton)
+    cluster = device.endpoints[1].out_clusters[OnOff.cluster_id]
+    cluster.hold_duration = 0.02
+    listener = mock.Mock()
+    cluster.add_listener(listener)
+
+    # on/off is inverted: 0 is pressed, 1 is released
+    cluster._update_attribute(0x0000, 0)
+    cluster._update_attribute(0x0000, 1)
+    assert listener.zha_send_event.mock_calls == [
+        mock.call(COMMAND_CLICK, {CLICK_TYPE: COMMAND_SINGLE})
+    ]
+
+    listener.reset_mock()
+    cluster._update_attribute(0x0000, 0)
+    await asyncio.sleep(0.05)
+    cluster._update_attribute(0x0000, 1)
+    assert listener.zha_send_event.mock_calls == [
+        mock.call(COMMAND_HOLD, []),
+        mock.call(COMMAND_RELEASE, []),
+    ]
+    assert cluster._presses.pending == 0
+
+
 @pytest.mark.parametrize(
     "raw_report",
     (
@@ -1130,6 +1443,30 @@ async def test_xiaomi_e1_thermostat_schedule_settings_deserialization(
     assert str(s) == expected_string
 
 
+def test_xiaomi_e1_thermostat_schedule_settings_canonical():
+    """Test schedule strings and blobs share one canonical encoding."""
+
+    schedule = "mon,tue,wed,thu,fri|8:00,24.0|18:00,17.0|23:00,22.0|8:00,22.0"
+    blob = ScheduleSettings(schedule)
+    # unused event bytes are dropped from the canonical encoding
+    padded = bytearray(blob)
+    padded[4:6] = b"\xff\xff"
+
+    encode = zhaquirks.xiaomi.aqara.thermostat_agl001._encode_schedule_settings
+    encode.cache_clear()
+    settings = [ScheduleSettings(schedule) for _ in range(40)]
+    settings.append(ScheduleSettings(bytes(blob)))
+    settings.append(ScheduleSettings(bytes(padded)))
+
+    assert all(s == blob for s in settings)
+    assert all(str(s) == schedule for s in settings)
+    assert encode.cache_info().misses == 3
+    assert encode.cache_info().hits == 39
+
+    with pytest.raises(TypeError):
+        ScheduleSettings(padded)
+
+
 @pytest.mark.parametrize(
     "quirk, invalid_iilluminance_report",
     (
@@ -1357,6 +1694,62 @@ async def test_xiaomi_motion_sensor_misc(
     assert power_listener.attribute_updates[1][1] == expected_results[3]
 
 
+@pytest.mark.parametrize("quirk", (zhaquirks.xiaomi.aqara.plug.Plug,))
+async def test_xiaomi_attribute_routes(zigpy_device_from_quirk, quirk):
+    """Test parsed Xiaomi attributes are routed to the endpoint clusters."""
+
+    device = zigpy_device_from_quirk(quirk)
+    basic_cluster = device.endpoints[1].basic
+    em_listener = ClusterListener(device.endpoints[1].electrical_measurement)
+    metering_listener = ClusterListener(device.endpoints[1].smartenergy_metering)
+
+    report = create_aqara_attr_report({3: 30, 149: 1.5, 150: 2300, 152: 12.5})
+    with mock.patch.object(
+        XiaomiRoute, "resolve", autospec=True, side_effect=XiaomiRoute.resolve
+    ) as resolve:
+        basic_cluster.update_attribute(XIAOMI_AQARA_ATTRIBUTE, report)
+        basic_cluster.update_attribute(XIAOMI_AQARA_ATTRIBUTE, report)
+
+    # targets are resolved once
+    assert resolve.call_count == 5
+    assert set(basic_cluster._route_targets) == {
+        "temperature",
+        "consumption",
+        "voltage",
+        "power",
+    }
+    assert em_listener.attribute_updates[:3] == [
+        (ElectricalMeasurement.AttributeDefs.total_active_power.id, 1500),
+        (ElectricalMeasurement.AttributeDefs.rms_voltage.id, 230.0),
+        (ElectricalMeasurement.AttributeDefs.active_power.id, 125),
+    ]
+    assert len(em_listener.attribute_updates) == 6
+    assert (
+        metering_listener.attribute_updates
+        == [(Metering.AttributeDefs.current_summ_delivered.id, 1500)] * 2
+    )
+
+    # quirks can replace the routes
+    device = zigpy_device_from_quirk(quirk)
+    basic_cluster = device.endpoints[1].basic
+    em_listener = ClusterListener(device.endpoints[1].electrical_measurement)
+    routes = {
+        "voltage": (
+            XiaomiRoute(
+                "electrical_measurement",
+                ElectricalMeasurement.AttributeDefs.rms_voltage.id,
+                lambda value: value / 100,
+            ),
+        )
+    }
+    with mock.patch.object(type(basic_cluster), "attribute_routes", routes):
+        basic_cluster.update_attribute(XIAOMI_AQARA_ATTRIBUTE, report)
+
+    assert em_listener.attribute_updates == [
+        (ElectricalMeasurement.AttributeDefs.rms_voltage.id, 23.0)
+    ]
+
+
 @pytest.mark.parametrize("quirk", (zhaquirks.xiaomi.aqara.plug.Plug,))
 async def test_xiaomi_power_cluster_not_used(zigpy_device_from_quirk, caplog, quirk):
     """Test log is printed which warns when a device reports battery mV readout.
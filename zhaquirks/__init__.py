@@ -2,6 +2,10 @@
 from __future__ import annotations
 
 import asyncio
+from collections.abc import Callable
+import contextlib
+import dataclasses
+from datetime import UTC, datetime
 import importlib
 import importlib.util
 import logging
@@ -15,12 +19,14 @@ import zigpy.endpoint
 from zigpy.quirks import CustomCluster, CustomDevice
 import zigpy.types as t
 from zigpy.util import ListenableMixin
+import zigpy.zcl
 from zigpy.zcl import foundation
 from zigpy.zcl.clusters.general import PowerConfiguration
 from zigpy.zcl.clusters.measurement import OccupancySensing
 from zigpy.zcl.clusters.security import IasZone
 from zigpy.zdo import types as zdotypes
 
+from . import manifest as quirks_manifest
 from .const import (
     ATTRIBUTE_ID,
     ATTRIBUTE_NAME,
@@ -45,6 +51,8 @@ from .const import (
     ZHA_SEND_EVENT,
     ZONE_STATUS_CHANGE_COMMAND,
 )
+from .profiling import ImportProfiler
+from .timers import get_timer_wheel
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -103,6 +111,55 @@ class LocalDataCluster(CustomCluster):
             self._update_attribute(attrid, value)
         return ([foundation.WriteAttributesStatusRecord(foundation.Status.SUCCESS)],)
 
+    def _update_attributes(self, attributes: dict[int | str, Any]) -> None:
+        """Update several attributes by id or name at once.
+
+        All values are cached before any listener is notified. Listeners with an
+        `attributes_updated(attributes, timestamp)` method get a single event
+        with every update, other listeners get one `attribute_updated` per
+        attribute. Clusters overriding `_update_attribute` keep their per
+        attribute updates.
+        """
+        updates = {}
+        for attrid, value in attributes.items():
+            if isinstance(attrid, str):
+                attrid = self.attributes_by_name[attrid].id
+            updates[attrid] = value
+
+        if not updates:
+            return
+        if type(self)._update_attribute is not CustomCluster._update_attribute or (
+            None in updates.values()
+        ):
+            for attrid, value in updates.items():
+                self._update_attribute(attrid, value)
+            return
+
+        now = datetime.now(UTC)
+        self._attr_cache.update(updates)
+        self._attr_last_updated.update(dict.fromkeys(updates, now))
+
+        for listener, include_context in list(self._listeners.values()):
+            context = (self,) if include_context else ()
+            if hasattr(listener, "attributes_updated"):
+                self._notify_listener(
+                    listener.attributes_updated, *context, updates, now
+                )
+            elif hasattr(listener, "attribute_updated"):
+                for attrid, value in updates.items():
+                    self._notify_listener(
+                        listener.attribute_updated, *context, attrid, value, now
+                    )
+
+    def _notify_listener(self, method: Callable[..., Any], *args: Any) -> None:
+        """Call a listener method, logging its errors like `listener_event`."""
+        try:
+            method(*args)
+        except Exception as exc:  # pylint: disable=broad-except
+            self.debug(
+                "Error calling listener %r with args %r", method, args, exc_info=exc
+            )
+
 
 class EventableCluster(CustomCluster):
     """Cluster that generates events."""
@@ -237,8 +294,17 @@ class _Motion(CustomCluster, IasZone):
         """Init."""
         super().__init__(*args, **kwargs)
         self._loop = asyncio.get_running_loop()
+        self._timer_wheel = get_timer_wheel(self._loop)
         self._timer_handle = None
 
+    def _schedule_turn_off(self):
+        if self._timer_handle is None:
+            self._timer_handle = self._timer_wheel.call_later(
+                self.reset_s, self._turn_off
+            )
+        else:
+            self._timer_handle.reschedule(self.reset_s)
+
     def _turn_off(self):
         self._timer_handle = None
         self.debug("%s - Resetting motion sensor", self.endpoint.device.ieee)
@@ -266,9 +332,7 @@ class MotionWithReset(_Motion):
         """Handle the cluster command."""
         # check if the command is for a zone status change of ZoneStatus.Alarm_1 or ZoneStatus.Alarm_2
         if hdr.command_id == ZONE_STATUS_CHANGE_COMMAND and args[0] & 3:
-            if self._timer_handle:
-                self._timer_handle.cancel()
-            self._timer_handle = self._loop.call_later(self.reset_s, self._turn_off)
+            self._schedule_turn_off()
             if self.send_occupancy_event:
                 self.endpoint.device.occupancy_bus.listener_event(OCCUPANCY_EVENT)
 
@@ -290,11 +354,7 @@ class MotionOnEvent(_Motion):
         )
 
         self.debug("%s - Received motion event message", self.endpoint.device.ieee)
-
-        if self._timer_handle:
-            self._timer_handle.cancel()
-
-        self._timer_handle = self._loop.call_later(self.reset_s, self._turn_off)
+        self._schedule_turn_off()
 
 
 class _Occupancy(CustomCluster, OccupancySensing):
@@ -307,6 +367,15 @@ class _Occupancy(CustomCluster, OccupancySensing):
         super().__init__(*args, **kwargs)
         self._timer_handle = None
         self._loop = asyncio.get_running_loop()
+        self._timer_wheel = get_timer_wheel(self._loop)
+
+    def _schedule_turn_off(self):
+        if self._timer_handle is None:
+            self._timer_handle = self._timer_wheel.call_later(
+                self.reset_s, self._turn_off
+            )
+        else:
+            self._timer_handle.reschedule(self.reset_s)
 
     def _turn_off(self):
         self._timer_handle = None
@@ -324,11 +393,7 @@ class OccupancyOnEvent(_Occupancy):
     def occupancy_event(self):
         """Occupancy event."""
         self._update_attribute(OCCUPANCY_STATE, ON)
-
-        if self._timer_handle:
-            self._timer_handle.cancel()
-
-        self._timer_handle = self._loop.call_later(self.reset_s, self._turn_off)
+        self._schedule_turn_off()
 
 
 class OccupancyWithReset(_Occupancy):
@@ -338,10 +403,48 @@ class OccupancyWithReset(_Occupancy):
         super()._update_attribute(attrid, value)
 
         if attrid == OCCUPANCY_STATE and value == ON:
-            if self._timer_handle:
-                self._timer_handle.cancel()
             self.endpoint.device.motion_bus.listener_event(MOTION_EVENT)
-            self._timer_handle = self._loop.call_later(self.reset_s, self._turn_off)
+            self._schedule_turn_off()
+
+
+@dataclasses.dataclass(frozen=True)
+class _ClusterTemplate:
+    """A cluster class resolved once from a quirk signature."""
+
+    cluster_id: int
+    cluster_cls: type[zigpy.zcl.Cluster]
+    set_cluster_id: bool
+    basic_attr_ids: tuple[int, int] | None = None
+
+
+@dataclasses.dataclass(frozen=True)
+class _EndpointTemplate:
+    """An endpoint of a quirk signature with its clusters resolved."""
+
+    endpoint_id: int
+    signature: dict[str, Any]
+    profile_id: int
+    device_type: int
+    in_clusters: tuple[_ClusterTemplate, ...]
+    out_clusters: tuple[_ClusterTemplate, ...]
+
+
+def _compile_cluster(cluster_id: int, is_server: bool) -> _ClusterTemplate:
+    """Resolve the cluster class zigpy would instantiate for `cluster_id`."""
+    cluster = zigpy.zcl.Cluster.from_id(None, cluster_id, is_server=is_server)
+    basic_attr_ids = None
+    if is_server and cluster.ep_attribute == "basic":
+        basic_attr_ids = (
+            cluster.attributes_by_name[MANUFACTURER].id,
+            cluster.attributes_by_name[MODEL].id,
+        )
+    return _ClusterTemplate(
+        cluster_id=cluster_id,
+        cluster_cls=type(cluster),
+        # range registered and unknown clusters get the id set per instance
+        set_cluster_id="cluster_id" in cluster.__dict__,
+        basic_attr_ids=basic_attr_ids,
+    )
 
 
 class QuickInitDevice(CustomDevice):
@@ -349,6 +452,39 @@ class QuickInitDevice(CustomDevice):
 
     signature: dict[str, Any] | None = None
 
+    @classmethod
+    def _signature_template(
+        cls, endpoints: dict[int, dict[str, Any]]
+    ) -> tuple[_EndpointTemplate, ...]:
+        """Return the endpoint templates for the signature, compiled once."""
+        template = cls.__dict__.get("_compiled_signature")
+        if (
+            template is not None
+            and len(template) == len(endpoints)
+            and all(endpoints.get(ep.endpoint_id) is ep.signature for ep in template)
+        ):
+            return template
+
+        template = tuple(
+            _EndpointTemplate(
+                endpoint_id=ep_id,
+                signature=ep_data,
+                profile_id=ep_data[PROFILE_ID],
+                device_type=ep_data[DEVICE_TYPE],
+                in_clusters=tuple(
+                    _compile_cluster(cluster_id, is_server=True)
+                    for cluster_id in dict.fromkeys(ep_data[INPUT_CLUSTERS])
+                ),
+                out_clusters=tuple(
+                    _compile_cluster(cluster_id, is_server=False)
+                    for cluster_id in dict.fromkeys(ep_data[OUTPUT_CLUSTERS])
+                ),
+            )
+            for ep_id, ep_data in endpoints.items()
+        )
+        cls._compiled_signature = template
+        return template
+
     @classmethod
     def from_signature(
         cls, device: zigpy.device.Device, model: str | None = None
@@ -364,23 +500,28 @@ class QuickInitDevice(CustomDevice):
 
         device.node_desc = cls.signature[NODE_DESCRIPTOR]
 
-        endpoints = cls.signature[ENDPOINTS]
-        for ep_id, ep_data in endpoints.items():
-            endpoint = device.add_endpoint(ep_id)
-            endpoint.profile_id = ep_data[PROFILE_ID]
-            endpoint.device_type = ep_data[DEVICE_TYPE]
-            for cluster_id in ep_data[INPUT_CLUSTERS]:
-                cluster = endpoint.add_input_cluster(cluster_id)
-                if cluster.ep_attribute == "basic":
-                    manuf_attr_id = cluster.attributes_by_name[MANUFACTURER].id
+        for ep_template in cls._signature_template(cls.signature[ENDPOINTS]):
+            endpoint = device.add_endpoint(ep_template.endpoint_id)
+            endpoint.profile_id = ep_template.profile_id
+            endpoint.device_type = ep_template.device_type
+            for cluster_template in ep_template.in_clusters:
+                cluster = cluster_template.cluster_cls(endpoint, True)
+                if cluster_template.set_cluster_id:
+                    cluster.cluster_id = cluster_template.cluster_id
+                endpoint.add_input_cluster(cluster_template.cluster_id, cluster)
+                if cluster_template.basic_attr_ids is not None:
+                    manuf_attr_id, model_attr_id = cluster_template.basic_attr_ids
                     cluster._update_attribute(  # pylint: disable=W0212
                         manuf_attr_id, manufacturer
                     )
                     cluster._update_attribute(  # pylint: disable=W0212
-                        cluster.attributes_by_name[MODEL].id, model
+                        model_attr_id, model
                     )
-            for cluster_id in ep_data[OUTPUT_CLUSTERS]:
-                endpoint.add_output_cluster(cluster_id)
+            for cluster_template in ep_template.out_clusters:
+                cluster = cluster_template.cluster_cls(endpoint, False)
+                if cluster_template.set_cluster_id:
+                    cluster.cluster_id = cluster_template.cluster_id
+                endpoint.add_output_cluster(cluster_template.cluster_id, cluster)
             endpoint.status = zigpy.endpoint.Status.ZDO_INIT
 
         device.status = zigpy.device.Status.ENDPOINTS_INIT
@@ -428,17 +569,83 @@ class NoReplyMixin:
         return rsp
 
 
-def setup(custom_quirks_path: str | None = None) -> None:
-    """Register all quirks with zigpy, including optional custom quirks."""
+def _import_quirks_module(modname: str, profiler: ImportProfiler | None) -> None:
+    _LOGGER.debug("Loading quirks module %r", modname)
+    if profiler is None:
+        importlib.import_module(modname)
+        return
 
-    # Import all quirks in the `zhaquirks` package first
-    for _importer, modname, _ispkg in pkgutil.walk_packages(
-        path=__path__,
-        prefix=__name__ + ".",
-    ):
-        _LOGGER.debug("Loading quirks module %r", modname)
+    with profiler.measure(modname):
         importlib.import_module(modname)
 
+
+def _setup_lazy(profiler: ImportProfiler | None) -> bool:
+    """Register quirks from the prebuilt manifest, importing them on first use."""
+
+    manifest = quirks_manifest.load_manifest()
+    if manifest is None:
+        _LOGGER.warning("Quirks manifest unavailable, loading all quirks")
+        return False
+
+    quirks_manifest.install_lazy_registry(manifest)
+
+    # Modules registering global handlers, or missing from a stale manifest
+    known = set(manifest["modules"])
+    for modname in quirks_manifest.iter_quirk_modules(__path__[0], __name__ + "."):
+        if modname in manifest["eager"] or modname not in known:
+            _import_quirks_module(modname, profiler)
+
+    return True
+
+
+_IMPORT_PROFILER: ImportProfiler | None = None
+
+
+def get_import_profiler() -> ImportProfiler | None:
+    """Return the profiler of the last `setup()`, `None` if it wasn't profiled."""
+    return _IMPORT_PROFILER
+
+
+def setup(
+    custom_quirks_path: str | None = None,
+    *,
+    lazy: bool = False,
+    profile: bool = False,
+) -> None:
+    """Register all quirks with zigpy, including optional custom quirks.
+
+    With `lazy`, quirk modules are only imported once zigpy looks up a
+    manufacturer and model they provide a quirk for.
+
+    With `profile`, the import time, memory and registered quirks of every
+    module imported during setup are recorded, see `get_import_profiler()`.
+    Quirk modules imported later by lazy lookups are not profiled.
+    """
+    global _IMPORT_PROFILER  # noqa: PLW0603
+
+    profiler = _IMPORT_PROFILER = ImportProfiler() if profile else None
+    if profiler is not None:
+        profiler.start()
+
+    try:
+        _setup(custom_quirks_path, lazy, profiler)
+    finally:
+        if profiler is not None:
+            profiler.stop()
+            profiler.log_summary()
+
+
+def _setup(
+    custom_quirks_path: str | None, lazy: bool, profiler: ImportProfiler | None
+) -> None:
+    # Import all quirks in the `zhaquirks` package first
+    if not lazy or not _setup_lazy(profiler):
+        for _importer, modname, _ispkg in pkgutil.walk_packages(
+            path=__path__,
+            prefix=__name__ + ".",
+        ):
+            _import_quirks_module(modname, profiler)
+
     if custom_quirks_path is None:
         return
 
@@ -452,10 +659,15 @@ def setup(custom_quirks_path: str | None = None) -> None:
         _LOGGER.debug("Loading custom quirk module %r", modname)
 
         try:
-            spec = importer.find_spec(modname)
-            module = importlib.util.module_from_spec(spec)
-            sys.modules[modname] = module
-            spec.loader.exec_module(module)
+            with (
+                profiler.measure(modname, custom=True)
+                if profiler is not None
+                else contextlib.nullcontext()
+            ):
+                spec = importer.find_spec(modname)
+                module = importlib.util.module_from_spec(spec)
+                sys.modules[modname] = module
+                spec.loader.exec_module(module)
         except Exception:
             _LOGGER.exception("Unexpected exception importing custom quirk %r", modname)
         else:
@@ -0,0 +1,264 @@
+"""Prebuilt quirk manifest and lazy quirk registration."""
+from __future__ import annotations
+
+import collections
+from collections.abc import Iterator
+import contextlib
+import functools
+import importlib
+import json
+import logging
+import os
+import pathlib
+import pkgutil
+import sys
+from typing import Any
+import weakref
+
+import zigpy.quirks
+from zigpy.quirks.registry import DeviceRegistry
+
+_LOGGER = logging.getLogger(__name__)
+
+MANIFEST_PATH = pathlib.Path(__file__).with_name("quirks_manifest.json")
+MANIFEST_VERSION = 1
+
+PACKAGE_PATH = str(pathlib.Path(__file__).parent)
+PACKAGE_NAME = __name__.rpartition(".")[0]
+
+# modules of the package which don't provide quirks
+HELPER_MODULES = frozenset(
+    f"{PACKAGE_NAME}.{name}"
+    for name in ("const", "manifest", "multipress", "profiling", "quirk_ids", "timers")
+)
+
+_LOADERS: weakref.WeakKeyDictionary[
+    DeviceRegistry, LazyQuirkLoader
+] = weakref.WeakKeyDictionary()
+
+
+def iter_quirk_modules(
+    path: str = PACKAGE_PATH, prefix: str = PACKAGE_NAME + "."
+) -> Iterator[str]:
+    """Yield quirk module names in `pkgutil.walk_packages` order without importing.
+
+    Helper modules of the package are skipped.
+    """
+    for module_info in pkgutil.iter_modules([path], prefix):
+        if module_info.name in HELPER_MODULES:
+            continue
+        yield module_info.name
+        if module_info.ispkg:
+            yield from iter_quirk_modules(
+                os.path.join(path, module_info.name.rpartition(".")[2]),
+                module_info.name + ".",
+            )
+
+
+def _quirk_name(quirk: Any) -> str:
+    return f"{quirk.__module__}.{quirk.__qualname__}"
+
+
+@contextlib.contextmanager
+def _patched(registry: DeviceRegistry, **methods: Any) -> Iterator[None]:
+    """Temporarily replace registry methods, restoring earlier replacements."""
+    previous = {name: registry.__dict__.get(name) for name in methods}
+    for name, method in methods.items():
+        setattr(registry, name, method)
+    try:
+        yield
+    finally:
+        for name, method in previous.items():
+            if method is None:
+                delattr(registry, name)
+            else:
+                setattr(registry, name, method)
+
+
+def build_manifest() -> dict[str, Any]:
+    """Import every quirk module and record which (manufacturer, model) it handles.
+
+    Must be run in a fresh interpreter: quirks v2 entries are attributed to
+    the module being imported and quirk precedence follows registration order.
+    """
+
+    registry = zigpy.quirks._DEVICE_REGISTRY
+    modules = list(iter_quirk_modules())
+    known = set(modules)
+    quirks: dict[str, list[tuple[str | None, str | None]]] = collections.defaultdict(
+        list
+    )
+    order: list[str] = []
+    importing: str | None = None
+
+    def add_to_registry(custom_device: Any) -> None:
+        name = _quirk_name(custom_device)
+        if custom_device.__module__ in known and name not in order:
+            order.append(name)
+        add_to_registry_orig(custom_device)
+
+    def add_to_registry_v2(manufacturer: str, model: str, entry: Any) -> Any:
+        if importing is not None and (manufacturer, model) not in quirks[importing]:
+            quirks[importing].append((manufacturer, model))
+        return add_to_registry_v2_orig(manufacturer, model, entry)
+
+    add_to_registry_orig = registry.add_to_registry
+    add_to_registry_v2_orig = registry.add_to_registry_v2
+
+    with _patched(
+        registry,
+        add_to_registry=add_to_registry,
+        add_to_registry_v2=add_to_registry_v2,
+    ):
+        for importing in modules:
+            importlib.import_module(importing)
+        importing = None
+
+    # modules registering global handlers can't wait for a device lookup
+    eager = [
+        modname
+        for modname in modules
+        if any(
+            handler.__module__ == modname
+            for handler in zigpy.quirks._uninitialized_device_message_handlers
+        )
+    ]
+
+    for manufacturer, models in registry.registry.items():
+        for model, custom_devices in models.items():
+            # devices are inserted at the front, reverse to get import order
+            for custom_device in reversed(custom_devices):
+                modname = custom_device.__module__
+                if modname in known and (manufacturer, model) not in quirks[modname]:
+                    quirks[modname].append((manufacturer, model))
+
+    return {
+        "version": MANIFEST_VERSION,
+        "modules": modules,
+        "eager": eager,
+        "order": order,
+        "quirks": {
+            modname: [list(key) for key in quirks[modname]]
+            for modname in modules
+            if quirks.get(modname)
+        },
+    }
+
+
+def write_manifest(path: pathlib.Path | None = None) -> None:
+    """Build the manifest and write it to disk."""
+    if path is None:
+        path = MANIFEST_PATH
+
+    with path.open("w") as f:
+        json.dump(build_manifest(), f, indent=1, sort_keys=False)
+        f.write("\n")
+
+
+def load_manifest(path: pathlib.Path | None = None) -> dict[str, Any] | None:
+    """Load the prebuilt manifest, returns `None` if missing or incompatible."""
+    if path is None:
+        path = MANIFEST_PATH
+
+    try:
+        with path.open() as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as exc:
+        _LOGGER.debug("Unable to load quirks manifest %s: %r", path, exc)
+        return None
+
+    if manifest.get("version") != MANIFEST_VERSION:
+        _LOGGER.debug("Unsupported quirks manifest version %r", manifest.get("version"))
+        return None
+
+    return manifest
+
+
+class LazyQuirkLoader:
+    """Imports quirk modules the first time their manufacturer/model is looked up."""
+
+    def __init__(self, manifest: dict[str, Any], registry: DeviceRegistry) -> None:
+        """Init."""
+        self._registry = registry
+        self._loading = False
+        self._rank = {name: idx for idx, name in enumerate(manifest["order"])}
+        self._pending: dict[
+            tuple[str | None, str | None], list[str]
+        ] = collections.defaultdict(list)
+        for modname, keys in manifest["quirks"].items():
+            for manufacturer, model in keys:
+                self._pending[(manufacturer, model)].append(modname)
+
+    @property
+    def pending(self) -> dict[tuple[str | None, str | None], list[str]]:
+        """(manufacturer, model) keys whose quirk modules are not imported yet."""
+        return self._pending
+
+    def load(self, manufacturer: str | None, model: str | None) -> bool:
+        """Import the quirk modules for a manufacturer/model, once."""
+        # Quirks registering themselves while we import must not trigger loads
+        if self._loading:
+            return False
+
+        modules = self._pending.pop((manufacturer, model), None)
+        if not modules:
+            return False
+
+        self._loading = True
+        try:
+            for modname in modules:
+                if modname not in sys.modules:
+                    _LOGGER.debug("Lazy loading quirks module %r", modname)
+                    importlib.import_module(modname)
+        finally:
+            self._loading = False
+
+        # Order quirks the same way an eager `setup()` would have: quirks
+        # registered later take precedence and custom quirks come first
+        custom_devices = self._registry.registry.get(manufacturer, {}).get(model)
+        if custom_devices:
+            custom_devices.sort(
+                key=lambda quirk: -self._rank.get(_quirk_name(quirk), float("inf"))
+            )
+        return True
+
+    def load_device(self, manufacturer: str | None, model: str | None) -> None:
+        """Import the quirk modules `get_device` considers for a device."""
+        for key in (
+            (manufacturer, model),
+            (manufacturer, None),
+            (None, model),
+            (None, None),
+        ):
+            self.load(*key)
+
+
+def install_lazy_registry(
+    manifest: dict[str, Any], registry: DeviceRegistry | None = None
+) -> LazyQuirkLoader:
+    """Import the quirk modules of a device before the registry looks it up."""
+    if registry is None:
+        registry = zigpy.quirks._DEVICE_REGISTRY
+
+    loader = _LOADERS[registry] = LazyQuirkLoader(manifest, registry)
+    get_device = getattr(registry.get_device, "__wrapped__", registry.get_device)
+
+    @functools.wraps(get_device)
+    def lazy_get_device(device: Any) -> Any:
+        if not isinstance(device, zigpy.quirks.CustomDevice):
+            loader.load_device(device.manufacturer, device.model)
+        return get_device(device)
+
+    registry.get_device = lazy_get_device
+    return loader
+
+
+def load_quirks(manufacturer: str | None, model: str | None) -> None:
+    """Import the lazily registered quirk modules of a manufacturer and model.
+
+    For lookups which don't go through `DeviceRegistry.get_device`, does
+    nothing unless `setup(lazy=True)` installed a lazy registry.
+    """
+    loader = _LOADERS.get(zigpy.quirks._DEVICE_REGISTRY)
+    if loader is not None:
+        loader.load(manufacturer, model)
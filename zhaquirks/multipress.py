@@ -0,0 +1,136 @@
+"""Detection of multi presses and holds of remote buttons."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Hashable
+from typing import Any
+
+DEFAULT_PRESS_WINDOW = 0.3
+
+
+class _ButtonState:
+    """Pending presses and hold of a single button."""
+
+    __slots__ = ("presses", "args", "press_handle", "hold_handle")
+
+    def __init__(self) -> None:
+        """Init."""
+        self.presses = 0
+        self.args: tuple = ()
+        self.press_handle: asyncio.TimerHandle | None = None
+        self.hold_handle: asyncio.TimerHandle | None = None
+
+
+class MultiPressDetector:
+    """Counts the presses of each button of a device into multi press events.
+
+    Presses of a button less than `press_window` seconds apart are counted
+    together. `on_presses(button, count, *args)` is called once the window
+    passes without another press, or as soon as `max_presses` is reached, with
+    the arguments of the last press. Every button is tracked on its own, so
+    presses of different buttons or remotes don't reset each other.
+
+    With a `hold_time`, a button kept down for that long between
+    `button_down()` and `button_up()` calls `on_hold(button, *args)` instead of
+    counting as a press.
+    """
+
+    def __init__(
+        self,
+        on_presses: Callable[..., Any],
+        *,
+        on_hold: Callable[..., Any] | None = None,
+        press_window: float = DEFAULT_PRESS_WINDOW,
+        hold_time: float | None = None,
+        max_presses: int | None = None,
+    ) -> None:
+        """Init."""
+        self.press_window = press_window
+        self.hold_time = hold_time
+        self.max_presses = max_presses
+        self._on_presses = on_presses
+        self._on_hold = on_hold
+        self._buttons: dict[Hashable, _ButtonState] = {}
+
+    @property
+    def pending(self) -> int:
+        """Return the number of buttons with pending presses or holds."""
+        return len(self._buttons)
+
+    def press(self, button: Hashable, *args: Any) -> None:
+        """Count a press of `button`."""
+        state = self._buttons.get(button)
+        if state is None:
+            state = self._buttons[button] = _ButtonState()
+        elif state.press_handle is not None:
+            state.press_handle.cancel()
+            state.press_handle = None
+
+        state.presses += 1
+        state.args = args
+        if self.press_window <= 0 or (
+            self.max_presses is not None and state.presses >= self.max_presses
+        ):
+            self._flush(button)
+        else:
+            state.press_handle = asyncio.get_running_loop().call_later(
+                self.press_window, self._flush, button
+            )
+
+    def button_down(self, button: Hashable, *args: Any) -> None:
+        """Start timing a hold of `button`."""
+        if self.hold_time is None:
+            return
+        state = self._buttons.get(button)
+        if state is None:
+            state = self._buttons[button] = _ButtonState()
+        elif state.hold_handle is not None:
+            state.hold_handle.cancel()
+        state.hold_handle = asyncio.get_running_loop().call_later(
+            self.hold_time, self._hold, button, args
+        )
+
+    def button_up(self, button: Hashable, *args: Any) -> bool:
+        """Count a release of `button` before `hold_time` as a press.
+
+        Return False if the button wasn't down or was already reported as held.
+        """
+        state = self._buttons.get(button)
+        if state is None or state.hold_handle is None:
+            return False
+        state.hold_handle.cancel()
+        state.hold_handle = None
+        self.press(button, *args)
+        return True
+
+    def cancel(self) -> None:
+        """Drop all pending presses and holds without reporting them."""
+        for state in self._buttons.values():
+            if state.press_handle is not None:
+                state.press_handle.cancel()
+            if state.hold_handle is not None:
+                state.hold_handle.cancel()
+        self._buttons.clear()
+
+    def _flush(self, button: Hashable) -> None:
+        state = self._buttons[button]
+        presses, args = state.presses, state.args
+        state.presses = 0
+        state.args = ()
+        state.press_handle = None
+        if state.hold_handle is None:
+            del self._buttons[button]
+        self._on_presses(button, presses, *args)
+
+    def _hold(self, button: Hashable, args: tuple) -> None:
+        state = self._buttons[button]
+        state.hold_handle = None
+        if state.presses:
+            # presses before the hold are reported first
+            if state.press_handle is not None:
+                state.press_handle.cancel()
+            self._flush(button)
+        else:
+            del self._buttons[button]
+        if self._on_hold is not None:
+            self._on_hold(button, *args)
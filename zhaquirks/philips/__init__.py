@@ -1,9 +1,8 @@
 """Module for Philips quirks implementations."""
 
-import asyncio
 import logging
-import time
 from typing import Any, Optional, Union
+import warnings
 
 from zigpy.quirks import CustomCluster
 import zigpy.types as t
@@ -31,6 +30,7 @@ from zhaquirks.const import (
     TURN_ON,
     ZHA_SEND_EVENT,
 )
+from zhaquirks.multipress import MultiPressDetector
 
 PHILIPS = "Philips"
 SIGNIFY = "Signify Netherlands B.V."
@@ -102,40 +102,28 @@ class PhilipsBasicCluster(CustomCluster, Basic):
 
 
 class ButtonPressQueue:
-    """Philips button queue to derive multiple press events."""
+    """Philips button queue to derive multiple press events.
+
+    Deprecated, use `zhaquirks.multipress.MultiPressDetector` instead.
+    """
 
     def __init__(self):
         """Init."""
-        self._ms_threshold = 300
-        self._ms_last_click = 0
-        self._click_counter = 1
-        self._button = None
-        self._callback = lambda x: None
-        self._task = None
-
-    async def _job(self):
-        await asyncio.sleep(self._ms_threshold / 1000)
-        self._callback(self._click_counter)
-
-    def _reset(self, button):
-        if self._task:
-            self._task.cancel()
-        self._click_counter = 1
-        self._button = button
+        warnings.warn(
+            "ButtonPressQueue is deprecated, use"
+            " zhaquirks.multipress.MultiPressDetector instead",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        self._presses = MultiPressDetector(self._send_press_event)
+
+    @staticmethod
+    def _send_press_event(button, click_count, callback):
+        callback(click_count)
 
     def press(self, callback, button):
         """Process a button press."""
-        self._callback = callback
-        now_ms = time.time() * 1000
-        if self._button != button:
-            self._reset(button)
-        elif now_ms - self._ms_last_click > self._ms_threshold:
-            self._click_counter = 1
-        else:
-            self._task.cancel()
-            self._click_counter += 1
-        self._ms_last_click = now_ms
-        self._task = asyncio.ensure_future(self._job())
+        self._presses.press(button, callback)
 
 
 class PhilipsRemoteCluster(CustomCluster):
@@ -161,8 +149,31 @@ class PhilipsRemoteCluster(CustomCluster):
     }
     BUTTONS = {1: "on", 2: "up", 3: "down", 4: "off"}
     PRESS_TYPES = {0: "press", 1: "hold", 2: "short_release", 3: "long_release"}
+    MULTI_PRESS_TYPES = {
+        1: "press",
+        2: "double_press",
+        3: "triple_press",
+        4: "quadruple_press",
+    }
+
+    press_window: float = 0.3
 
-    button_press_queue = ButtonPressQueue()
+    def __init__(self, *args, **kwargs):
+        """Init."""
+        super().__init__(*args, **kwargs)
+        self._presses = MultiPressDetector(
+            self._send_press_event, press_window=self.press_window
+        )
+
+    def _send_press_event(self, button, click_count, event_args):
+        _LOGGER.debug(
+            "PhilipsRemoteCluster - send_press_event click_count: [%s]", click_count
+        )
+        press_type = self.MULTI_PRESS_TYPES.get(click_count, "quintuple_press")
+        # Override PRESS_TYPE
+        event_args[PRESS_TYPE] = press_type
+        action = f"{button}_{press_type}"
+        self.listener_event(ZHA_SEND_EVENT, action, event_args)
 
     def handle_cluster_request(
         self,
@@ -191,31 +202,9 @@ class PhilipsRemoteCluster(CustomCluster):
             ARGS: args,
         }
 
-        def send_press_event(click_count):
-            _LOGGER.debug(
-                "PhilipsRemoteCluster - send_press_event click_count: [%s]", click_count
-            )
-            press_type = None
-            if click_count == 1:
-                press_type = "press"
-            elif click_count == 2:
-                press_type = "double_press"
-            elif click_count == 3:
-                press_type = "triple_press"
-            elif click_count == 4:
-                press_type = "quadruple_press"
-            elif click_count > 4:
-                press_type = "quintuple_press"
-
-            if press_type:
-                # Override PRESS_TYPE
-                event_args[PRESS_TYPE] = press_type
-                action = f"{button}_{press_type}"
-                self.listener_event(ZHA_SEND_EVENT, action, event_args)
-
         # Derive Multiple Presses
         if press_type == "press":
-            self.button_press_queue.press(send_press_event, button)
+            self._presses.press(button, event_args)
         else:
             action = f"{button}_{press_type}"
             self.listener_event(ZHA_SEND_EVENT, action, event_args)
@@ -0,0 +1,142 @@
+"""Import-time profiling of quirk modules."""
+from __future__ import annotations
+
+from collections.abc import Iterator
+import contextlib
+import dataclasses
+import logging
+import time
+import tracemalloc
+from typing import Any
+
+import zigpy.quirks
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_TOP_N = 10
+
+
+@dataclasses.dataclass
+class ModuleImportStats:
+    """Cost of importing a single quirk module."""
+
+    module: str
+    time: float
+    memory: int
+    quirks: int
+    custom: bool = False
+    error: bool = False
+
+
+class ImportProfiler:
+    """Records wall time, memory and registered quirks for every imported module.
+
+    Time and memory include the dependencies a module imports first, e.g. the
+    vendor package `__init__` for its first quirk module.
+    """
+
+    def __init__(self) -> None:
+        """Init."""
+        self.modules: list[ModuleImportStats] = []
+        self._registrations = 0
+        self._started_tracemalloc = False
+        self._patched: dict[str, Any] = {}
+
+    def start(self) -> None:
+        """Start counting quirk registrations and tracing allocations."""
+        registry = zigpy.quirks._DEVICE_REGISTRY
+        add_to_registry = registry.add_to_registry
+        add_to_registry_v2 = registry.add_to_registry_v2
+
+        def count_registration(custom_device):
+            self._registrations += 1
+            return add_to_registry(custom_device)
+
+        def count_registration_v2(manufacturer, model, entry):
+            self._registrations += 1
+            return add_to_registry_v2(manufacturer, model, entry)
+
+        # keep replacements of the registry methods made by others
+        self._patched = {
+            name: registry.__dict__.get(name)
+            for name in ("add_to_registry", "add_to_registry_v2")
+        }
+        registry.add_to_registry = count_registration
+        registry.add_to_registry_v2 = count_registration_v2
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    def stop(self) -> None:
+        """Stop profiling, modules imported afterwards are not recorded.
+
+        This includes quirk modules imported on demand by a lazy setup.
+        """
+        registry = zigpy.quirks._DEVICE_REGISTRY
+        for name, method in self._patched.items():
+            if method is not None:
+                setattr(registry, name, method)
+            else:
+                with contextlib.suppress(AttributeError):
+                    delattr(registry, name)
+        self._patched = {}
+
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    @contextlib.contextmanager
+    def measure(self, modname: str, *, custom: bool = False) -> Iterator[None]:
+        """Measure importing a module."""
+        registrations = self._registrations
+        memory = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        error = True
+
+        try:
+            yield
+            error = False
+        finally:
+            self.modules.append(
+                ModuleImportStats(
+                    module=modname,
+                    time=time.perf_counter() - start,
+                    memory=tracemalloc.get_traced_memory()[0] - memory,
+                    quirks=self._registrations - registrations,
+                    custom=custom,
+                    error=error,
+                )
+            )
+
+    def top(self, n: int = DEFAULT_TOP_N, key: str = "time") -> list[ModuleImportStats]:
+        """Return the `n` most expensive modules by `time`, `memory` or `quirks`."""
+        return sorted(
+            self.modules, key=lambda stats: getattr(stats, key), reverse=True
+        )[:n]
+
+    def report(self) -> dict[str, Any]:
+        """Return a JSON serializable startup report."""
+        return {
+            "total_time": sum(stats.time for stats in self.modules),
+            "total_memory": sum(stats.memory for stats in self.modules),
+            "total_quirks": sum(stats.quirks for stats in self.modules),
+            "modules": [dataclasses.asdict(stats) for stats in self.modules],
+        }
+
+    def log_summary(self, n: int = DEFAULT_TOP_N) -> None:
+        """Log the slowest modules."""
+        report = self.report()
+        _LOGGER.info(
+            "Imported %d quirk modules registering %d quirks in %.3fs (%.1f KiB)."
+            " Slowest: %s",
+            len(self.modules),
+            report["total_quirks"],
+            report["total_time"],
+            report["total_memory"] / 1024,
+            ", ".join(
+                f"{stats.module} {stats.time * 1000:.1f}ms"
+                f" {stats.memory / 1024:.1f}KiB {stats.quirks} quirks"
+                for stats in self.top(n)
+            ),
+        )
@@ -0,0 +1,237 @@
+"""Shared timer wheel for the many short lived timers of quirk clusters."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+import dataclasses
+import math
+from typing import Any
+import weakref
+
+DEFAULT_RESOLUTION = 1.0
+DEFAULT_SLOTS = 64
+DEFAULT_LEVELS = 3
+
+_WHEELS: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, TimerWheel
+] = weakref.WeakKeyDictionary()
+
+
+@dataclasses.dataclass
+class TimerWheelMetrics:
+    """Counters of a timer wheel."""
+
+    armed: int = 0
+    peak_armed: int = 0
+    scheduled: int = 0
+    cancelled: int = 0
+    expired: int = 0
+    ticks: int = 0
+
+
+class WheelTimer:
+    """A timer handle of a `TimerWheel`, compatible with `asyncio.TimerHandle`."""
+
+    __slots__ = (
+        "_wheel",
+        "_callback",
+        "_args",
+        "_when",
+        "_expires",
+        "_slot",
+        "_handle",
+        "_cancelled",
+    )
+
+    def __init__(
+        self, wheel: TimerWheel, callback: Callable[..., Any], args: tuple
+    ) -> None:
+        """Init."""
+        self._wheel = wheel
+        self._callback = callback
+        self._args = args
+        self._when = 0.0
+        self._expires = 0
+        self._slot: dict[WheelTimer, None] | None = None
+        self._handle: asyncio.TimerHandle | None = None
+        self._cancelled = False
+
+    def when(self) -> float:
+        """Return the loop time the timer is scheduled for."""
+        return self._when
+
+    def cancelled(self) -> bool:
+        """Return True if the timer was cancelled."""
+        return self._cancelled
+
+    def cancel(self) -> None:
+        """Cancel the timer."""
+        if self._wheel._remove(self):
+            self._wheel._metrics.cancelled += 1
+        self._cancelled = True
+
+    def reschedule(self, delay: float) -> None:
+        """Re-arm the timer to run `delay` seconds from now."""
+        self._wheel._remove(self)
+        self._cancelled = False
+        self._wheel._insert(self, delay)
+
+    def _run(self) -> None:
+        self._handle = None
+        self._wheel._armed -= 1
+        self._wheel._metrics.expired += 1
+        self._callback(*self._args)
+
+
+class TimerWheel:
+    """Hierarchical timer wheel driven by a single event loop timer per tick.
+
+    Timers are rounded up to the next tick, so all timers expiring in the same
+    tick run from one loop callback and may run up to `resolution` seconds
+    late. Arming, re-arming and cancelling a timer are O(1). Timers shorter
+    than a tick are passed on to the event loop directly.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        resolution: float = DEFAULT_RESOLUTION,
+        slots: int = DEFAULT_SLOTS,
+        levels: int = DEFAULT_LEVELS,
+    ) -> None:
+        """Init."""
+        self.resolution = resolution
+        self._loop = loop
+        self._origin = loop.time()
+        self._slots = slots
+        # ticks covered by a single slot of every level
+        self._spans = [slots**level for level in range(levels)]
+        self._wheel: list[list[dict[WheelTimer, None]]] = [
+            [{} for _ in range(slots)] for _ in range(levels)
+        ]
+        self._overflow: dict[WheelTimer, None] = {}
+        self._tick = 0
+        self._handle: asyncio.TimerHandle | None = None
+        self._pending = 0
+        self._armed = 0
+        self._metrics = TimerWheelMetrics()
+
+    def call_later(
+        self, delay: float, callback: Callable[..., Any], *args: Any
+    ) -> WheelTimer:
+        """Run `callback(*args)` after `delay` seconds."""
+        timer = WheelTimer(self, callback, args)
+        self._insert(timer, delay)
+        return timer
+
+    def metrics(self) -> TimerWheelMetrics:
+        """Return a snapshot of the wheel counters."""
+        return dataclasses.replace(self._metrics, armed=self._armed)
+
+    def _insert(self, timer: WheelTimer, delay: float) -> None:
+        now = self._loop.time()
+        timer._when = now + delay
+        self._armed += 1
+        self._metrics.scheduled += 1
+        self._metrics.peak_armed = max(self._metrics.peak_armed, self._armed)
+
+        if delay < self.resolution:
+            timer._handle = self._loop.call_later(delay, timer._run)
+            return
+
+        if self._handle is None:
+            # idle wheel, skip the ticks which passed without timers
+            self._tick = math.floor((now - self._origin) / self.resolution)
+            self._handle = self._loop.call_at(
+                self._origin + (self._tick + 1) * self.resolution, self._advance
+            )
+        timer._expires = max(
+            self._tick + 1,
+            math.ceil((timer._when - self._origin) / self.resolution),
+        )
+        self._pending += 1
+        self._place(timer)
+
+    def _place(self, timer: WheelTimer) -> None:
+        delta = timer._expires - self._tick
+        for level, span in enumerate(self._spans):
+            if delta < span * self._slots:
+                slot = self._wheel[level][(timer._expires // span) % self._slots]
+                break
+        else:
+            slot = self._overflow
+        slot[timer] = None
+        timer._slot = slot
+
+    def _remove(self, timer: WheelTimer) -> bool:
+        if timer._slot is not None:
+            del timer._slot[timer]
+            timer._slot = None
+            self._pending -= 1
+        elif timer._handle is not None:
+            timer._handle.cancel()
+            timer._handle = None
+        else:
+            return False
+        self._armed -= 1
+        return True
+
+    def _cascade(self, slot: dict[WheelTimer, None]) -> None:
+        # overflowing timers may be placed back into the same slot
+        timers = list(slot)
+        slot.clear()
+        for timer in timers:
+            self._place(timer)
+
+    def _advance(self) -> None:
+        target = max(
+            self._tick + 1,
+            math.floor((self._loop.time() - self._origin) / self.resolution),
+        )
+        while self._tick < target and self._pending:
+            self._tick += 1
+            self._metrics.ticks += 1
+            tick = self._tick
+            # move timers of higher levels down before expiring the lowest one
+            for level in range(len(self._spans) - 1, 0, -1):
+                span = self._spans[level]
+                if tick % span == 0:
+                    if level == len(self._spans) - 1:
+                        self._cascade(self._overflow)
+                    self._cascade(self._wheel[level][(tick // span) % self._slots])
+
+            slot = self._wheel[0][tick % self._slots]
+            while slot:
+                timer = next(iter(slot))
+                del slot[timer]
+                timer._slot = None
+                self._pending -= 1
+                self._armed -= 1
+                self._metrics.expired += 1
+                try:
+                    timer._callback(*timer._args)
+                except Exception as exc:  # pylint: disable=broad-except
+                    self._loop.call_exception_handler(
+                        {
+                            "message": f"Exception in timer callback {timer._callback!r}",
+                            "exception": exc,
+                        }
+                    )
+
+        if self._pending:
+            self._handle = self._loop.call_at(
+                self._origin + (self._tick + 1) * self.resolution, self._advance
+            )
+        else:
+            self._handle = None
+
+
+def get_timer_wheel(loop: asyncio.AbstractEventLoop | None = None) -> TimerWheel:
+    """Return the timer wheel shared by everything running on `loop`."""
+    if loop is None:
+        loop = asyncio.get_running_loop()
+    try:
+        return _WHEELS[loop]
+    except KeyError:
+        wheel = _WHEELS[loop] = TimerWheel(loop)
+        return wheel
@@ -1,10 +1,12 @@
 """Tuya devices."""
 
+import asyncio
 from collections.abc import Callable
 import dataclasses
 import datetime
 import enum
 import logging
+import time
 from typing import Any, Optional, Union
 
 from zigpy.quirks import CustomCluster, CustomDevice
@@ -144,6 +146,32 @@ class TuyaDPType(t.enum8):
     BITMAP = 0x05
 
 
+# Bitmap payload length -> bitmap type
+TUYA_BITMAP_TYPES: dict[int, type[Union[t.bitmap8, t.bitmap16, t.bitmap32]]] = {
+    1: t.bitmap8,
+    2: t.bitmap16,
+    4: t.bitmap32,
+}
+
+
+def _bitmap_payload(raw: bytes) -> Union[t.bitmap8, t.bitmap16, t.bitmap32]:
+    try:
+        return TUYA_BITMAP_TYPES[len(raw)].deserialize(raw)[0]
+    except KeyError as exc:
+        raise ValueError(f"Wrong bitmap length: {len(raw)}") from exc
+
+
+# Data point type -> raw payload decoder
+TUYA_PAYLOAD_DECODERS: dict[TuyaDPType, Callable[[bytes], Any]] = {
+    TuyaDPType.VALUE: lambda raw: t.int32s_be.deserialize(raw)[0],
+    TuyaDPType.BOOL: lambda raw: t.Bool.deserialize(raw)[0],
+    TuyaDPType.STRING: lambda raw: t.CharacterString(raw.decode("utf8")),
+    TuyaDPType.ENUM: lambda raw: t.enum8.deserialize(raw)[0],
+    TuyaDPType.BITMAP: _bitmap_payload,
+    TuyaDPType.RAW: lambda raw: raw,
+}
+
+
 class TuyaData(t.Struct):
     """Tuya Data type."""
 
@@ -165,24 +193,11 @@ class TuyaData(t.Struct):
         t.LVBytes,
     ]:
         """Payload accordingly to data point type."""
-        if self.dp_type == TuyaDPType.VALUE:
-            return t.int32s_be.deserialize(self.raw)[0]
-        elif self.dp_type == TuyaDPType.BOOL:
-            return t.Bool.deserialize(self.raw)[0]
-        elif self.dp_type == TuyaDPType.STRING:
-            return t.CharacterString(self.raw.decode("utf8"))
-        elif self.dp_type == TuyaDPType.ENUM:
-            return t.enum8.deserialize(self.raw)[0]
-        elif self.dp_type == TuyaDPType.BITMAP:
-            bitmaps = {1: t.bitmap8, 2: t.bitmap16, 4: t.bitmap32}
-            try:
-                return bitmaps[len(self.raw)].deserialize(self.raw)[0]
-            except KeyError as exc:
-                raise ValueError(f"Wrong bitmap length: {len(self.raw)}") from exc
-        elif self.dp_type == TuyaDPType.RAW:
-            return self.raw
-        else:
-            raise ValueError(f"Unknown {self.dp_type} datapoint type")
+        try:
+            decoder = TUYA_PAYLOAD_DECODERS[self.dp_type]
+        except KeyError as exc:
+            raise ValueError(f"Unknown {self.dp_type} datapoint type") from exc
+        return decoder(self.raw)
 
     @payload.setter
     def payload(self, value):
@@ -280,6 +295,10 @@ class TuyaDatapointData(t.Struct):
     data: TuyaData
 
 
+_UINT8 = tuple(t.uint8_t(i) for i in range(256))
+_DP_TYPES = {int(dp_type): dp_type for dp_type in TuyaDPType}
+
+
 class TuyaCommand(t.Struct):
     """Tuya manufacturer cluster command."""
 
@@ -287,6 +306,50 @@ class TuyaCommand(t.Struct):
     tsn: t.uint8_t
     datapoints: t.List[TuyaDatapointData]
 
+    @classmethod
+    def deserialize(cls, data: bytes) -> tuple["TuyaCommand", bytes]:
+        """Parse the whole frame in a single pass.
+
+        Builds the same objects as the generic `t.Struct` deserialization,
+        without going through it for every datapoint.
+        """
+        view = memoryview(data)
+        length = len(view)
+        if length < 2:
+            raise ValueError(f"Data is too short to contain {cls}")
+
+        datapoints = cls.fields.datapoints.type()
+        offset = 2
+        while offset < length:
+            # dp: uint8, dp_type: enum8, function: uint8, raw: LVBytes
+            if length - offset < 4:
+                raise ValueError(f"Data is too short to contain {TuyaDatapointData}")
+            raw_end = offset + 4 + view[offset + 3]
+            if raw_end > length:
+                raise ValueError(f"Data is too short to contain {t.LVBytes}")
+
+            # RAW is 0, compare with None
+            dp_type = _DP_TYPES.get(view[offset + 1])
+            if dp_type is None:
+                dp_type = TuyaDPType(view[offset + 1])
+            tuya_data = object.__new__(TuyaData)
+            tuya_data.dp_type = dp_type
+            tuya_data.function = _UINT8[view[offset + 2]]
+            tuya_data.raw = t.LVBytes(view[offset + 4 : raw_end])
+
+            datapoint = object.__new__(TuyaDatapointData)
+            datapoint.dp = _UINT8[view[offset]]
+            datapoint.data = tuya_data
+            datapoints.append(datapoint)
+
+            offset = raw_end
+
+        command = object.__new__(cls)
+        command.status = _UINT8[view[0]]
+        command.tsn = _UINT8[view[1]]
+        command.datapoints = datapoints
+        return command, b""
+
 
 class NoManufacturerCluster(CustomCluster):
     """Forces the NO manufacturer id in command."""
@@ -456,6 +519,21 @@ class TuyaManufCluster(CustomCluster):
 class TuyaManufClusterAttributes(TuyaManufCluster):
     """Manufacturer specific cluster for Tuya converting attributes <-> commands."""
 
+    # Send the attributes written by a single write_attributes call in one
+    # set_data frame. Only enable for MCUs accepting multiple datapoints.
+    batch_set_data: bool = False
+
+    # Seconds during which writes of an attribute are coalesced, only the
+    # latest value is sent when the window ends. Empty sends writes right away.
+    coalesce_windows: dict[int, float] = {}
+
+    def __init__(self, *args, **kwargs):
+        """Init."""
+        super().__init__(*args, **kwargs)
+        self._coalesced_writes: dict[
+            int, tuple[foundation.Attribute, Optional[int], asyncio.Task]
+        ] = {}
+
     def handle_cluster_request(
         self,
         hdr: foundation.ZCLHeader,
@@ -508,16 +586,76 @@ class TuyaManufClusterAttributes(TuyaManufCluster):
     async def write_attributes(self, attributes, manufacturer=None):
         """Defer attributes writing to the set_data tuya command."""
 
-        records = self._write_attr_records(attributes)
+        records = []
+        coalesced = []
+        for record in self._write_attr_records(attributes):
+            window = self.coalesce_windows.get(record.attrid)
+            if window:
+                coalesced.append(self._coalesce_write(record, manufacturer, window))
+            else:
+                records.append(record)
 
-        for record in records:
-            cmd_payload = TuyaManufCluster.Command()
-            cmd_payload.status = 0
-            cmd_payload.tsn = self.endpoint.device.application.get_sequence()
-            cmd_payload.command_id = record.attrid
-            cmd_payload.function = 0
-            cmd_payload.data = record.value.value
+        await self._send_records(records, manufacturer)
+        # coalesced writes succeed once their frame is sent
+        await asyncio.gather(*coalesced)
+
+        return [[foundation.WriteAttributesStatusRecord(foundation.Status.SUCCESS)]]
+
+    @staticmethod
+    def _record_payload(
+        record: foundation.Attribute, tsn: int
+    ) -> TuyaManufCluster.Command:
+        """Build the set_data payload of an attribute record."""
+
+        cmd_payload = TuyaManufCluster.Command()
+        cmd_payload.status = 0
+        cmd_payload.tsn = tsn
+        cmd_payload.command_id = record.attrid
+        cmd_payload.function = 0
+        cmd_payload.data = record.value.value
+        return cmd_payload
+
+    @staticmethod
+    def _record_datapoint(record: foundation.Attribute) -> TuyaDatapointData:
+        """Build the set_data datapoint of an attribute record."""
+
+        # the attribute id is the datapoint id followed by its type, the
+        # legacy data is the big-endian value prefixed with its length
+        data = TuyaData()
+        data.dp_type = TuyaDPType(record.attrid >> 8)
+        data.raw = t.LVBytes(Data(record.value.value)[1:])
+        return TuyaDatapointData(dp=record.attrid & 0xFF, data=data)
+
+    async def _send_records(
+        self, records: list[foundation.Attribute], manufacturer: Optional[int]
+    ) -> None:
+        """Send attribute records, in a single set_data frame if batching."""
+
+        if self.batch_set_data and len(records) > 1:
+            tsn = self.endpoint.device.application.get_sequence()
+            cmd_payload = TuyaCommand(
+                status=0,
+                tsn=tsn,
+                datapoints=[self._record_datapoint(record) for record in records],
+            )
+
+            if manufacturer is None:
+                manufacturer = self.endpoint.manufacturer_id
+            await self.request(
+                False,
+                TUYA_SET_DATA,
+                TuyaNewManufCluster.server_commands[TUYA_SET_DATA].schema,
+                cmd_payload,
+                manufacturer=manufacturer,
+                expect_reply=False,
+                tsn=tsn,
+            )
+            return
 
+        for record in records:
+            cmd_payload = self._record_payload(
+                record, self.endpoint.device.application.get_sequence()
+            )
             await super().command(
                 TUYA_SET_DATA,
                 cmd_payload,
@@ -526,7 +664,33 @@ class TuyaManufClusterAttributes(TuyaManufCluster):
                 tsn=cmd_payload.tsn,
             )
 
-        return [[foundation.WriteAttributesStatusRecord(foundation.Status.SUCCESS)]]
+    def _coalesce_write(
+        self,
+        record: foundation.Attribute,
+        manufacturer: Optional[int],
+        window: float,
+    ) -> asyncio.Future:
+        """Hold an attribute write until its window ends, replacing pending ones.
+
+        Every caller awaits the single frame sent.
+        """
+
+        try:
+            *_, task = self._coalesced_writes[record.attrid]
+        except KeyError:
+            task = asyncio.ensure_future(
+                self._send_coalesced_write(record.attrid, window)
+            )
+
+        self._coalesced_writes[record.attrid] = (record, manufacturer, task)
+        return asyncio.shield(task)
+
+    async def _send_coalesced_write(self, attrid: int, window: float) -> None:
+        """Send the latest write of an attribute once its window ended."""
+
+        await asyncio.sleep(window)
+        record, manufacturer, _ = self._coalesced_writes.pop(attrid)
+        await self._send_records([record], manufacturer)
 
 
 class EnchantedDevice(CustomDevice):
@@ -1250,10 +1414,16 @@ class TuyaWindowCoverControl(LocalDataCluster, WindowCovering):
     attributes.update({ATTR_COVER_DIRECTION: ("motor_direction", t.Bool)})
     attributes.update({ATTR_COVER_INVERTED: ("cover_inverted", t.Bool)})
 
+    # Seconds during which position commands are coalesced, only the latest
+    # position is sent when the window ends. 0 sends positions right away.
+    coalesce_window: float = 0
+
     def __init__(self, *args, **kwargs):
         """Initialize instance."""
         super().__init__(*args, **kwargs)
         self.endpoint.device.cover_bus.add_listener(self)
+        self._coalesced_position: Optional[TuyaManufCluster.Command] = None
+        self._coalesced_position_task: Optional[asyncio.Task] = None
 
     def cover_event(self, attribute, value):
         """Event listener for cover events."""
@@ -1350,6 +1520,9 @@ class TuyaWindowCoverControl(LocalDataCluster, WindowCovering):
                 tuya_payload.data,
             )
 
+            if command_id == WINDOW_COVER_COMMAND_LIFTPERCENT and self.coalesce_window:
+                return self._coalesce_position(tuya_payload)
+
             return self.endpoint.tuya_manufacturer.command(
                 TUYA_SET_DATA, tuya_payload, expect_reply=True
             )
@@ -1357,6 +1530,27 @@ class TuyaWindowCoverControl(LocalDataCluster, WindowCovering):
             _LOGGER.debug("Unrecognised command: %x", command_id)
             return foundation.Status.UNSUP_CLUSTER_COMMAND
 
+    def _coalesce_position(self, tuya_payload: TuyaManufCluster.Command):
+        """Hold a position until the window ends, replacing the pending one.
+
+        Every caller awaits the response to the single frame sent.
+        """
+        self._coalesced_position = tuya_payload
+        if self._coalesced_position_task is None:
+            self._coalesced_position_task = asyncio.ensure_future(
+                self._send_coalesced_position()
+            )
+        return asyncio.shield(self._coalesced_position_task)
+
+    async def _send_coalesced_position(self):
+        """Send the latest position once the window ended."""
+        await asyncio.sleep(self.coalesce_window)
+        tuya_payload = self._coalesced_position
+        self._coalesced_position = self._coalesced_position_task = None
+        return await self.endpoint.tuya_manufacturer.command(
+            TUYA_SET_DATA, tuya_payload, expect_reply=True
+        )
+
 
 class TuyaWindowCover(CustomDevice):
     """Tuya Window cover device."""
@@ -1496,6 +1690,8 @@ class DPToAttributeMapping:
         ]
     ] = None
     endpoint_id: Optional[int] = None
+    # overrides the cluster's `suppress_unchanged_reports` for this datapoint
+    suppress_unchanged: Optional[bool] = None
 
 
 @dataclasses.dataclass
@@ -1557,6 +1753,92 @@ class TuyaNewManufCluster(CustomCluster):
 
     data_point_handlers: dict[int, str] = {}
 
+    # Drop datapoint reports not changing the cached attribute values, e.g. the
+    # periodic full state reports of some MCUs. Unchanged values are still
+    # reported every `report_heartbeat` seconds to keep availability working.
+    suppress_unchanged_reports: bool = False
+    report_heartbeat: float = 600
+
+    # {direction: {command_id: handler name}}, per class
+    _command_handler_names: dict[foundation.Direction, dict[int, str]] = {}
+    # attributes the bound handler tables are built from, per class
+    _handler_attributes: frozenset[str] = frozenset()
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        """Give every subclass its own command handler table."""
+        super().__init_subclass__(**kwargs)
+        cls._build_handler_table()
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Init."""
+        super().__init__(*args, **kwargs)
+        # {dp: (cluster, attribute ids)}, see `_get_dp_target()`
+        self._dp_targets: dict[
+            int, tuple[CustomCluster, Optional[tuple[int, ...]]]
+        ] = {}
+        self._dp_targets_endpoints: Optional[tuple[int, int]] = None
+        # {dp: monotonic time the datapoint was last reported to its cluster}
+        self._dp_reported: dict[int, float] = {}
+        self._bind_handlers()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Rebind the handler tables when a handler is replaced on the instance."""
+        super().__setattr__(name, value)
+        if name in self._handler_attributes:
+            self._bind_handlers()
+
+    def __delattr__(self, name: str) -> None:
+        """Rebind the handler tables when an instance handler is removed."""
+        super().__delattr__(name)
+        if name in self._handler_attributes:
+            self._bind_handlers()
+
+    @classmethod
+    def _build_handler_table(cls) -> None:
+        """Map command ids to the name of their handler method."""
+
+        cls._command_handler_names = {
+            foundation.Direction.Server_to_Client: {
+                command_id: f"handle_{command.name}"
+                for command_id, command in cls.client_commands.items()
+            },
+            foundation.Direction.Client_to_Server: {
+                command_id: f"handle_{command.name}"
+                for command_id, command in cls.server_commands.items()
+            },
+        }
+        cls._handler_attributes = frozenset(
+            {"data_point_handlers"}
+            | set(cls.data_point_handlers.values())
+            | {
+                name
+                for names in cls._command_handler_names.values()
+                for name in names.values()
+            }
+        )
+
+    def _bind_handlers(self) -> None:
+        """Resolve the command and datapoint handlers of this instance.
+
+        Handlers missing on the cluster are left out of the tables.
+        """
+
+        self._command_handlers: dict[
+            foundation.Direction, dict[int, Callable[..., foundation.Status]]
+        ] = {}
+        for direction, names in self._command_handler_names.items():
+            handlers = self._command_handlers[direction] = {}
+            for command_id, name in names.items():
+                handler = getattr(self, name, None)
+                if handler is not None:
+                    handlers[command_id] = handler
+
+        self._dp_handlers: dict[int, Callable[[TuyaDatapointData], None]] = {}
+        for dp, name in self.data_point_handlers.items():
+            handler = getattr(self, name, None)
+            if handler is not None:
+                self._dp_handlers[dp] = handler
+
     def handle_cluster_request(
         self,
         hdr: foundation.ZCLHeader,
@@ -1569,30 +1851,31 @@ class TuyaNewManufCluster(CustomCluster):
         """Handle cluster specific request."""
 
         try:
-            if hdr.direction == foundation.Direction.Server_to_Client:
-                # server_cluster -> client_cluster cluster specific command
-                handler_name = f"handle_{self.client_commands[hdr.command_id].name}"
-            else:
-                handler_name = f"handle_{self.server_commands[hdr.command_id].name}"
+            handler = self._command_handlers[hdr.direction][hdr.command_id]
         except KeyError:
-            self.debug(
-                "Received unknown manufacturer command %s: %s", hdr.command_id, args
+            handler_name = self._command_handler_names[hdr.direction].get(
+                hdr.command_id
             )
-            if not hdr.frame_control.disable_default_response:
-                self.send_default_rsp(
-                    hdr, status=foundation.Status.UNSUP_CLUSTER_COMMAND
+            if handler_name is None:
+                self.debug(
+                    "Received unknown manufacturer command %s: %s",
+                    hdr.command_id,
+                    args,
                 )
+                if not hdr.frame_control.disable_default_response:
+                    self.send_default_rsp(
+                        hdr, status=foundation.Status.UNSUP_CLUSTER_COMMAND
+                    )
                 return
 
-        try:
-            status = getattr(self, handler_name)(*args)
-        except AttributeError:
             self.warning(
                 "No '%s' tuya handler found for %s",
                 handler_name,
                 args,
             )
             status = foundation.Status.UNSUP_CLUSTER_COMMAND
+        else:
+            status = handler(*args)
 
         if not hdr.frame_control.disable_default_response:
             self.send_default_rsp(hdr, status=status)
@@ -1600,10 +1883,10 @@ class TuyaNewManufCluster(CustomCluster):
     def handle_get_data(self, command: TuyaCommand) -> foundation.Status:
         """Handle get_data response (report)."""
         dp_error = False
+        dp_handlers = self._dp_handlers
         for record in command.datapoints:
             try:
-                dp_handler = self.data_point_handlers[record.dp]
-                getattr(self, dp_handler)(record)
+                dp_handlers[record.dp](record)
             except (AttributeError, KeyError):
                 self.debug("No datapoint handler for %s", record)
                 dp_error = True
@@ -1622,6 +1905,42 @@ class TuyaNewManufCluster(CustomCluster):
         """Handle Time set request."""
         return foundation.Status.SUCCESS
 
+    def _get_dp_target(
+        self, dp: int, dp_map: DPToAttributeMapping
+    ) -> tuple[CustomCluster, Optional[tuple[int, ...]]]:
+        """Return the cluster and attribute ids a datapoint is reported to."""
+
+        # clusters are only replaced while the quirk is built, so the targets
+        # only go stale when endpoints are added or removed
+        endpoints = self.endpoint.device.endpoints
+        if self._dp_targets_endpoints != (id(endpoints), len(endpoints)):
+            self._dp_targets.clear()
+            self._dp_targets_endpoints = (id(endpoints), len(endpoints))
+
+        try:
+            return self._dp_targets[dp]
+        except KeyError:
+            pass
+
+        endpoint = self.endpoint
+        if dp_map.endpoint_id:
+            endpoint = endpoints[dp_map.endpoint_id]
+        cluster = getattr(endpoint, dp_map.ep_attribute)
+
+        attribute_names = dp_map.attribute_name
+        if not isinstance(attribute_names, tuple):
+            attribute_names = (attribute_names,)
+        try:
+            attr_ids = tuple(
+                cluster.find_attribute(name).id for name in attribute_names
+            )
+        except (KeyError, ValueError):
+            # let `cluster.get()` report unknown attributes
+            attr_ids = None
+
+        target = self._dp_targets[dp] = (cluster, attr_ids)
+        return target
+
     def _dp_2_attr_update(self, datapoint: TuyaDatapointData) -> None:
         """Handle data point to attribute report conversion."""
         try:
@@ -1630,22 +1949,72 @@ class TuyaNewManufCluster(CustomCluster):
             self.debug("No attribute mapping for %s data point", datapoint.dp)
             return
 
-        endpoint = self.endpoint
-        if dp_map.endpoint_id:
-            endpoint = self.endpoint.device.endpoints[dp_map.endpoint_id]
-        cluster = getattr(endpoint, dp_map.ep_attribute)
+        cluster, attr_ids = self._get_dp_target(datapoint.dp, dp_map)
         value = datapoint.data.payload
         if dp_map.converter:
             value = dp_map.converter(value)
 
         if isinstance(dp_map.attribute_name, tuple):
-            for k, v in zip(dp_map.attribute_name, value):
-                if isinstance(v, AttributeWithMask):
-                    v = cluster.get(k, 0) & (~v.mask) | v.value
-                cluster.update_attribute(k, v)
+            attribute_names = dp_map.attribute_name
         else:
-            if isinstance(value, AttributeWithMask):
-                value = (
-                    cluster.get(dp_map.attribute_name, 0) & (~value.mask) | value.value
-                )
-            cluster.update_attribute(dp_map.attribute_name, value)
+            attribute_names = (dp_map.attribute_name,)
+            value = (value,)
+
+        # apply masks to the cached values first, then update every attribute once
+        updates: dict[str, Any] = {}
+        for idx, (k, v) in enumerate(zip(attribute_names, value)):
+            if isinstance(v, AttributeWithMask):
+                if k in updates:
+                    current = updates[k]
+                else:
+                    current = cluster.get(k if attr_ids is None else attr_ids[idx], 0)
+                v = current & (~v.mask) | v.value
+            updates[k] = v
+
+        if self._suppress_report(datapoint.dp, dp_map, cluster, attr_ids, updates):
+            self.debug("Dropping unchanged %s data point report", datapoint.dp)
+            return
+
+        for k, v in updates.items():
+            cluster.update_attribute(k, v)
+
+    def _suppress_report(
+        self,
+        dp: int,
+        dp_map: DPToAttributeMapping,
+        cluster: CustomCluster,
+        attr_ids: Optional[tuple[int, ...]],
+        updates: dict[str, Any],
+    ) -> bool:
+        """Return True if a datapoint report doesn't need to be forwarded."""
+
+        suppress = dp_map.suppress_unchanged
+        if suppress is None:
+            suppress = self.suppress_unchanged_reports
+        if not suppress:
+            return False
+
+        now = time.monotonic()
+        last_reported = self._dp_reported.get(dp)
+        if (
+            attr_ids is not None
+            and last_reported is not None
+            and now - last_reported < self.report_heartbeat
+        ):
+            names = dp_map.attribute_name
+            if not isinstance(names, tuple):
+                names = (names,)
+            attr_ids_by_name = dict(zip(names, attr_ids))
+            if all(
+                k in attr_ids_by_name
+                and v is not None
+                and cluster.get(attr_ids_by_name[k], None) == v
+                for k, v in updates.items()
+            ):
+                return True
+
+        self._dp_reported[dp] = now
+        return False
+
+
+TuyaNewManufCluster._build_handler_table()
@@ -1,8 +1,11 @@
 """Tuya MCU communications."""
 
+import asyncio
+import collections
 from collections.abc import Callable
 import dataclasses
 import datetime
+import time
 from typing import Any, Optional, Union
 
 import zigpy.types as t
@@ -13,14 +16,18 @@ from zhaquirks import Bus, DoublingPowerConfigurationCluster
 
 # add EnchantedDevice import for custom quirks backwards compatibility
 from zhaquirks.tuya import (
+    TUYA_ACTIVE_STATUS_RPT,
+    TUYA_GET_DATA,
     TUYA_MCU_COMMAND,
     TUYA_MCU_VERSION_RSP,
     TUYA_SET_DATA,
+    TUYA_SET_DATA_RESPONSE,
     TUYA_SET_TIME,
     EnchantedDevice,  # noqa: F401
     NoManufacturerCluster,
     PowerOnState,
     TuyaCommand,
+    TuyaData,
     TuyaDatapointData,
     TuyaEnchantableCluster,
     TuyaLocalCluster,
@@ -58,6 +65,12 @@ class DPToAttributeMapping:
         ]
     ] = None
     endpoint_id: Optional[int] = None
+    # overrides the cluster's `coalesce_window` for this datapoint
+    coalesce_window: Optional[float] = None
+    # overrides the cluster's `suppress_unchanged_reports` for this datapoint
+    suppress_unchanged: Optional[bool] = None
+    # momentary actions (e.g. clearing counters) are never retried
+    momentary: bool = False
 
 
 class TuyaClusterData(t.Struct):
@@ -80,6 +93,178 @@ class MoesBacklight(t.enum8):
     freeze = 0x03
 
 
+@dataclasses.dataclass
+class _ScheduledCommand:
+    """set_data command waiting to be sent or acknowledged by the MCU."""
+
+    command: TuyaCommand
+    expect_reply: bool
+    manufacturer: Optional[int]
+    attempts: int = 0
+    sent_at: float = 0
+    timer: Optional[asyncio.TimerHandle] = None
+
+    def confirmed_by(self, reported: dict[int, TuyaData]) -> bool:
+        """Whether a report carries every written datapoint value."""
+        for datapoint in self.command.datapoints:
+            data = reported.get(datapoint.dp)
+            if data is None or (data.dp_type, data.raw) != (
+                datapoint.data.dp_type,
+                datapoint.data.raw,
+            ):
+                return False
+        return True
+
+
+class TuyaCommandScheduler:
+    """Per MCU outbound set_data queue.
+
+    Bounds the number of frames awaiting an MCU response, enforces a minimum
+    gap between frames and retries frames the MCU didn't respond to. A frame is
+    acknowledged by the set_data_response echoing its TSN, or by a report
+    carrying the written datapoint values.
+    """
+
+    def __init__(
+        self,
+        cluster: "TuyaMCUCluster",
+        max_inflight: int,
+        min_interval: float,
+        timeout: float,
+        retries: int,
+    ) -> None:
+        """Init."""
+        self._cluster = cluster
+        self.max_inflight = max_inflight
+        self.min_interval = min_interval
+        self.timeout = timeout
+        self.retries = retries
+
+        self._queue: collections.deque[_ScheduledCommand] = collections.deque()
+        self._inflight: dict[int, _ScheduledCommand] = {}
+        self._last_sent: Optional[float] = None
+        self._pump_handle: Optional[asyncio.TimerHandle] = None
+
+        self._sent = 0
+        self._acked = 0
+        self._retried = 0
+        self._failed = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+
+    @property
+    def stats(self) -> dict[str, Union[int, float]]:
+        """Queue depth, response latency and counters."""
+        return {
+            "queued": len(self._queue),
+            "inflight": len(self._inflight),
+            "sent": self._sent,
+            "acked": self._acked,
+            "retried": self._retried,
+            "failed": self._failed,
+            "latency_avg": self._latency_total / self._acked if self._acked else 0.0,
+            "latency_max": self._latency_max,
+        }
+
+    def submit(
+        self, command: TuyaCommand, expect_reply: bool, manufacturer: Optional[int]
+    ) -> None:
+        """Queue a set_data command."""
+        self._queue.append(_ScheduledCommand(command, expect_reply, manufacturer))
+        self._pump()
+
+    def handle_response(self, command_id: int, command: TuyaCommand) -> None:
+        """Acknowledge in-flight commands answered by an MCU report."""
+
+        scheduled = None
+        if command_id == TUYA_SET_DATA_RESPONSE:
+            scheduled = self._inflight.get(command.tsn)
+
+        if scheduled is not None:
+            self._ack(scheduled)
+        else:
+            # periodic reports of the same datapoints don't confirm a write
+            # unless they carry the written values
+            reported = {
+                datapoint.dp: datapoint.data for datapoint in command.datapoints
+            }
+            for scheduled in list(self._inflight.values()):
+                if scheduled.confirmed_by(reported):
+                    self._ack(scheduled)
+
+        self._pump()
+
+    def _ack(self, scheduled: _ScheduledCommand) -> None:
+        del self._inflight[scheduled.command.tsn]
+        scheduled.timer.cancel()
+
+        latency = time.monotonic() - scheduled.sent_at
+        self._acked += 1
+        self._latency_total += latency
+        self._latency_max = max(self._latency_max, latency)
+
+    def _pump(self) -> None:
+        """Send queued commands while in-flight and frame gap limits allow."""
+
+        loop = asyncio.get_running_loop()
+        while self._queue and len(self._inflight) < self.max_inflight:
+            if self._last_sent is not None:
+                delay = self._last_sent + self.min_interval - time.monotonic()
+                if delay > 0:
+                    if self._pump_handle is None:
+                        self._pump_handle = loop.call_later(delay, self._delayed_pump)
+                    return
+
+            self._send(self._queue.popleft())
+
+    def _delayed_pump(self) -> None:
+        self._pump_handle = None
+        self._pump()
+
+    def _send(self, scheduled: _ScheduledCommand) -> None:
+        if scheduled.attempts:
+            # a fresh TSN so the retry isn't mistaken for the original frame
+            scheduled.command = scheduled.command.replace(
+                tsn=self._cluster.endpoint.device.application.get_sequence()
+            )
+
+        scheduled.attempts += 1
+        scheduled.sent_at = self._last_sent = time.monotonic()
+        scheduled.timer = asyncio.get_running_loop().call_later(
+            self.timeout, self._timed_out, scheduled
+        )
+        self._inflight[scheduled.command.tsn] = scheduled
+        self._sent += 1
+
+        self._cluster.create_catching_task(
+            self._cluster.command(
+                TUYA_SET_DATA,
+                scheduled.command,
+                expect_reply=scheduled.expect_reply,
+                manufacturer=scheduled.manufacturer,
+            )
+        )
+
+    def _timed_out(self, scheduled: _ScheduledCommand) -> None:
+        del self._inflight[scheduled.command.tsn]
+
+        if scheduled.attempts <= self.retries and not self._cluster._is_momentary(
+            scheduled.command
+        ):
+            self._cluster.debug("No MCU response to %s, retrying", scheduled.command)
+            self._retried += 1
+            self._queue.appendleft(scheduled)
+        else:
+            self._cluster.warning(
+                "No MCU response to %s after %d attempts",
+                scheduled.command,
+                scheduled.attempts,
+            )
+            self._failed += 1
+
+        self._pump()
+
+
 class TuyaPowerConfigurationCluster(
     TuyaLocalCluster, DoublingPowerConfigurationCluster
 ):
@@ -131,6 +316,20 @@ class TuyaMCUCluster(TuyaAttributesCluster, TuyaNewManufCluster):
     set_time_offset = 1970  # MCU timestamp from 1/1/1970
     set_time_local_offset = None
 
+    # Send the datapoints written during the same event loop iteration in a
+    # single set_data frame. Only enable for MCUs accepting multiple datapoints.
+    batch_set_data: bool = False
+
+    # Seconds during which writes of the same datapoint are coalesced, only
+    # the latest value is sent when the window ends. 0 sends writes right away.
+    coalesce_window: float = 0
+
+    # Outbound set_data scheduling, disabled unless `max_inflight_commands` is set
+    max_inflight_commands: int = 0
+    min_command_interval: float = 0
+    command_timeout: float = 5
+    command_retries: int = 1
+
     class MCUVersion(t.Struct):
         """Tuya MCU version response Zcl payload."""
 
@@ -203,12 +402,59 @@ class TuyaMCUCluster(TuyaAttributesCluster, TuyaNewManufCluster):
         }
     )
 
+    # {own endpoint_id: {(endpoint_id, attribute_name): {dp: mapping}}}, per class
+    _dp_mapping_index: dict[
+        int, dict[tuple[int, str], dict[int, DPToAttributeMapping]]
+    ] = {}
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        """Give every subclass its own reverse datapoint index."""
+        super().__init_subclass__(**kwargs)
+        cls._dp_mapping_index = {}
+
     def __init__(self, *args, **kwargs):
         """Init."""
         super().__init__(*args, **kwargs)
         # Cluster for endpoint: 1 (listen MCU commands)
         self.endpoint.device.command_bus = Bus()
         self.endpoint.device.command_bus.add_listener(self)
+        self._pending_datapoints: dict[
+            tuple[bool, Optional[int]], tuple[int, dict[int, TuyaDatapointData]]
+        ] = {}
+        self._flush_handle: Optional[asyncio.Handle] = None
+        self._coalesced_writes: dict[
+            int, tuple[TuyaCommand, bool, Optional[int], asyncio.TimerHandle]
+        ] = {}
+        self.command_scheduler: Optional[TuyaCommandScheduler] = None
+        if self.max_inflight_commands:
+            self.command_scheduler = TuyaCommandScheduler(
+                self,
+                max_inflight=self.max_inflight_commands,
+                min_interval=self.min_command_interval,
+                timeout=self.command_timeout,
+                retries=self.command_retries,
+            )
+
+    def handle_cluster_request(
+        self,
+        hdr: foundation.ZCLHeader,
+        args: tuple,
+        *,
+        dst_addressing: Optional[
+            Union[t.Addressing.Group, t.Addressing.IEEE, t.Addressing.NWK]
+        ] = None,
+    ) -> None:
+        """Match MCU reports with scheduled commands."""
+
+        if (
+            self.command_scheduler is not None
+            and hdr.direction == foundation.Direction.Server_to_Client
+            and hdr.command_id
+            in (TUYA_GET_DATA, TUYA_SET_DATA_RESPONSE, TUYA_ACTIVE_STATUS_RPT)
+        ):
+            self.command_scheduler.handle_response(hdr.command_id, args[0])
+
+        super().handle_cluster_request(hdr, args, dst_addressing=dst_addressing)
 
     def from_cluster_data(self, data: TuyaClusterData) -> Optional[TuyaCommand]:
         """Convert from cluster data to a tuya data payload."""
@@ -270,42 +516,182 @@ class TuyaMCUCluster(TuyaAttributesCluster, TuyaNewManufCluster):
             )
             return
 
+        immediate = []
         for tuya_command in tuya_commands:
-            self.create_catching_task(
-                self.command(
-                    TUYA_SET_DATA,
+            window = self._get_coalesce_window(tuya_command.datapoints[0].dp)
+            if window:
+                self._coalesce_write(
                     tuya_command,
-                    expect_reply=cluster_data.expect_reply,
-                    manufacturer=cluster_data.manufacturer,
+                    cluster_data.expect_reply,
+                    cluster_data.manufacturer,
+                    window,
                 )
+            else:
+                immediate.append(tuya_command)
+
+        if immediate:
+            self._send_tuya_commands(
+                immediate, cluster_data.expect_reply, cluster_data.manufacturer
             )
 
         endpoint = self.endpoint.device.endpoints[cluster_data.endpoint_id]
         cluster = getattr(endpoint, cluster_data.cluster_name)
         cluster.update_attribute(cluster_data.cluster_attr, cluster_data.attr_value)
 
+    def _send_tuya_commands(
+        self,
+        tuya_commands: list[TuyaCommand],
+        expect_reply: bool,
+        manufacturer: Optional[int],
+    ) -> None:
+        """Send set_data commands, batched if enabled."""
+
+        if self.batch_set_data:
+            self._queue_datapoints(tuya_commands, expect_reply, manufacturer)
+            return
+
+        for tuya_command in tuya_commands:
+            self._send_set_data(tuya_command, expect_reply, manufacturer)
+
+    def _send_set_data(
+        self,
+        tuya_command: TuyaCommand,
+        expect_reply: bool,
+        manufacturer: Optional[int],
+    ) -> None:
+        """Send a set_data frame, through the command scheduler if enabled."""
+
+        if self.command_scheduler is not None:
+            self.command_scheduler.submit(tuya_command, expect_reply, manufacturer)
+            return
+
+        self.create_catching_task(
+            self.command(
+                TUYA_SET_DATA,
+                tuya_command,
+                expect_reply=expect_reply,
+                manufacturer=manufacturer,
+            )
+        )
+
+    def _is_momentary(self, tuya_command: TuyaCommand) -> bool:
+        """Whether a set_data command triggers a momentary action."""
+
+        return any(
+            getattr(self.dp_to_attribute.get(datapoint.dp), "momentary", False)
+            for datapoint in tuya_command.datapoints
+        )
+
+    def _get_coalesce_window(self, dp: int) -> float:
+        """Return the write coalescing window of a datapoint."""
+
+        dp_mapping = self.dp_to_attribute.get(dp)
+        if dp_mapping is not None and dp_mapping.coalesce_window is not None:
+            return dp_mapping.coalesce_window
+        return self.coalesce_window
+
+    def _coalesce_write(
+        self,
+        tuya_command: TuyaCommand,
+        expect_reply: bool,
+        manufacturer: Optional[int],
+        window: float,
+    ) -> None:
+        """Hold a datapoint write until its window ends, replacing pending ones."""
+
+        dp = tuya_command.datapoints[0].dp
+        try:
+            *_, handle = self._coalesced_writes[dp]
+            self.debug("Superseding pending write of datapoint %s", dp)
+        except KeyError:
+            handle = asyncio.get_running_loop().call_later(
+                window, self._send_coalesced_write, dp
+            )
+
+        self._coalesced_writes[dp] = (tuya_command, expect_reply, manufacturer, handle)
+
+    def _send_coalesced_write(self, dp: int) -> None:
+        """Send the latest write of a datapoint once its window ended."""
+
+        tuya_command, expect_reply, manufacturer, _ = self._coalesced_writes.pop(dp)
+        self._send_tuya_commands([tuya_command], expect_reply, manufacturer)
+
+    def _queue_datapoints(
+        self,
+        tuya_commands: list[TuyaCommand],
+        expect_reply: bool,
+        manufacturer: Optional[int],
+    ) -> None:
+        """Queue datapoints until the end of the current event loop iteration."""
+
+        # the frame reuses the TSN of the first queued command
+        _, batch = self._pending_datapoints.setdefault(
+            (expect_reply, manufacturer), (tuya_commands[0].tsn, {})
+        )
+        for tuya_command in tuya_commands:
+            for datapoint in tuya_command.datapoints:
+                # a later write of the same datapoint supersedes the queued one
+                batch[datapoint.dp] = datapoint
+
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_soon(
+                self._flush_datapoints
+            )
+
+    def _flush_datapoints(self) -> None:
+        """Send all queued datapoints, one set_data frame per reply/manufacturer."""
+
+        self._flush_handle = None
+        batches, self._pending_datapoints = self._pending_datapoints, {}
+
+        for (expect_reply, manufacturer), (tsn, datapoints) in batches.items():
+            cmd_payload = TuyaCommand()
+            cmd_payload.status = 0
+            cmd_payload.tsn = tsn
+            cmd_payload.datapoints = list(datapoints.values())
+            self.debug("batched set_data: %s", cmd_payload)
+
+            self._send_set_data(cmd_payload, expect_reply, manufacturer)
+
+    @classmethod
+    def _build_dp_mapping_index(
+        cls, own_endpoint_id: int
+    ) -> dict[tuple[int, str], dict[int, DPToAttributeMapping]]:
+        """Build the (endpoint_id, attribute_name) -> {dp: mapping} index."""
+
+        index = {}
+        for dp, dp_mapping in cls.dp_to_attribute.items():
+            endpoint_id = (
+                own_endpoint_id
+                if dp_mapping.endpoint_id is None
+                else dp_mapping.endpoint_id
+            )
+            attribute_names = (
+                dp_mapping.attribute_name
+                if isinstance(dp_mapping.attribute_name, tuple)
+                else (dp_mapping.attribute_name,)
+            )
+            for attribute_name in attribute_names:
+                index.setdefault((endpoint_id, attribute_name), {})[dp] = dp_mapping
+        return index
+
     def get_dp_mapping(
         self, endpoint_id: int, attribute_name: str
-    ) -> Optional[tuple[int, DPToAttributeMapping]]:
-        """Search for the DP in dp_to_attribute."""
-
-        result = {}
-        for dp, dp_mapping in self.dp_to_attribute.items():
-            if (
-                attribute_name == dp_mapping.attribute_name
-                or (
-                    isinstance(dp_mapping.attribute_name, tuple)
-                    and attribute_name in dp_mapping.attribute_name
-                )
-            ) and (
-                (
-                    dp_mapping.endpoint_id is None
-                    and endpoint_id == self.endpoint.endpoint_id
-                )
-                or (endpoint_id == dp_mapping.endpoint_id)
-            ):
-                self.debug("get_dp_mapping --> found DP: %s", dp)
-                result[dp] = dp_mapping
+    ) -> dict[int, DPToAttributeMapping]:
+        """Search for the DP in dp_to_attribute.
+
+        The returned mapping is shared and must not be modified.
+        """
+
+        try:
+            index = self._dp_mapping_index[self.endpoint.endpoint_id]
+        except KeyError:
+            index = self._dp_mapping_index[
+                self.endpoint.endpoint_id
+            ] = self._build_dp_mapping_index(self.endpoint.endpoint_id)
+
+        result = index.get((endpoint_id, attribute_name), {})
+        self.debug("get_dp_mapping --> found DPs: %s", list(result))
         return result
 
     def handle_mcu_version_response(self, payload: MCUVersion) -> foundation.Status:
@@ -466,9 +466,11 @@ class TuyaRCBOManufCluster(TuyaMCUCluster):
             lambda x: x.rstrip(),
         ),
         TUYA_DP_CLEAR_ENERGY: DPToAttributeMapping(
-            TuyaRCBOMetering.ep_attribute, "clear_device_data"
+            TuyaRCBOMetering.ep_attribute, "clear_device_data", momentary=True
+        ),
+        TUYA_DP_LOCKING: DPToAttributeMapping(
+            TuyaRCBOOnOff.ep_attribute, "trip", momentary=True
         ),
-        TUYA_DP_LOCKING: DPToAttributeMapping(TuyaRCBOOnOff.ep_attribute, "trip"),
         TUYA_DP_TOTAL_REVERSE_ACTIVE_POWER: DPToAttributeMapping(
             TuyaRCBOMetering.ep_attribute,
             "current_summ_received",
@@ -53,6 +53,8 @@ _LOGGER = logging.getLogger(__name__)
 class SiterwellManufCluster(TuyaManufClusterAttributes):
     """Manufacturer Specific Cluster of some thermostatic valves."""
 
+    batch_set_data = True
+
     set_time_offset = 1970
 
     attributes = TuyaManufClusterAttributes.attributes.copy()
@@ -141,10 +143,9 @@ class SiterwellThermostat(TuyaThermostatCluster):
         else:
             mode = self.ProgrammingOperationMode.Simple
 
-        self._update_attribute(
-            self.attributes_by_name["system_mode"].id, self.SystemMode.Heat
+        self._update_attributes(
+            {"system_mode": self.SystemMode.Heat, "programing_oper_mode": mode}
         )
-        self._update_attribute(self.attributes_by_name["programing_oper_mode"].id, mode)
 
 
 class SiterwellUserInterface(TuyaUserInterfaceCluster):
@@ -191,6 +192,8 @@ class data144(t.FixedList, item_type=t.uint8_t, length=18):
 class MoesManufCluster(TuyaManufClusterAttributes):
     """Manufacturer Specific Cluster of some thermostatic valves."""
 
+    batch_set_data = True
+
     set_time_offset = 1970
 
     attributes = TuyaManufClusterAttributes.attributes.copy()
@@ -579,136 +582,27 @@ class MoesThermostat(TuyaThermostatCluster):
             prog_mode = self.ProgrammingOperationMode.Simple
             occupancy = self.Occupancy.Occupied
 
-        self._update_attribute(
-            self.attributes_by_name["programing_oper_mode"].id, prog_mode
+        self._update_attributes(
+            {"programing_oper_mode": prog_mode, "occupancy": occupancy}
         )
-        self._update_attribute(self.attributes_by_name["occupancy"].id, occupancy)
 
     def schedule_change(self, attr, value):
         """Scheduler attribute change."""
 
         if attr == MOES_SCHEDULE_WORKDAY_ATTR:
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_1_hour"].id, value[17] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_1_minute"].id, value[16]
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_1_temperature"].id,
-                value[15] * 100,
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_2_hour"].id, value[14] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_2_minute"].id, value[13]
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_2_temperature"].id,
-                value[12] * 100,
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_3_hour"].id, value[11] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_3_minute"].id, value[10]
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_3_temperature"].id,
-                value[9] * 100,
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_4_hour"].id, value[8] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_4_minute"].id, value[7]
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_4_temperature"].id,
-                value[6] * 100,
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_5_hour"].id, value[5] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_5_minute"].id, value[4]
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_5_temperature"].id,
-                value[3] * 100,
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_6_hour"].id, value[2] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_6_minute"].id, value[1]
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_6_temperature"].id,
-                value[0] * 100,
-            )
+            prefix = "workday"
         elif attr == MOES_SCHEDULE_WEEKEND_ATTR:
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_1_hour"].id, value[17] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_1_minute"].id, value[16]
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_1_temperature"].id,
-                value[15] * 100,
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_2_hour"].id, value[14] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_2_minute"].id, value[13]
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_2_temperature"].id,
-                value[12] * 100,
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_3_hour"].id, value[11] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_3_minute"].id, value[10]
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_3_temperature"].id,
-                value[9] * 100,
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_4_hour"].id, value[8] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_4_minute"].id, value[7]
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_4_temperature"].id,
-                value[6] * 100,
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_5_hour"].id, value[5] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_5_minute"].id, value[4]
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_5_temperature"].id,
-                value[3] * 100,
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_6_hour"].id, value[2] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_6_minute"].id, value[1]
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_6_temperature"].id,
-                value[0] * 100,
-            )
+            prefix = "weekend"
+        else:
+            return
+
+        # periods are stored in reverse order as temperature, minute, hour
+        updates = {}
+        for period, offset in enumerate(range(15, -1, -3), start=1):
+            updates[f"{prefix}_schedule_{period}_hour"] = value[offset + 2] & 0x3F
+            updates[f"{prefix}_schedule_{period}_minute"] = value[offset + 1]
+            updates[f"{prefix}_schedule_{period}_temperature"] = value[offset] * 100
+        self._update_attributes(updates)
 
 
 class MoesThermostatNew(MoesThermostat):
@@ -791,13 +685,13 @@ class MoesWindowDetection(LocalDataCluster, OnOff):
     def window_detect_change(self, value):
         """Window detection change."""
 
-        self._update_attribute(
-            self.attributes_by_name["window_detection_timeout_minutes"].id, value[0]
-        )
-        self._update_attribute(
-            self.attributes_by_name["window_detection_temperature"].id, value[1] * 100
+        self._update_attributes(
+            {
+                "window_detection_timeout_minutes": value[0],
+                "window_detection_temperature": value[1] * 100,
+                "on_off": value[2],
+            }
         )
-        self._update_attribute(self.attributes_by_name["on_off"].id, value[2])
 
     async def write_attributes(self, attributes, manufacturer=None):
         """Defer attributes writing to the set_data tuya command."""
@@ -935,6 +829,8 @@ ZonnsmartManuClusterSelf = None
 class ZONNSMARTManufCluster(TuyaManufClusterAttributes):
     """Manufacturer Specific Cluster of some thermostatic valves."""
 
+    batch_set_data = True
+
     def __init__(self, *args, **kwargs):
         """Init."""
         super().__init__(*args, **kwargs)
@@ -1125,6 +1021,7 @@ class ZONNSMARTThermostat(TuyaThermostatCluster):
     def mode_change(self, attrid, value):
         """Mode change."""
         operation_preset = None
+        updates = {}
 
         if attrid == ZONNSMART_MODE_ATTR:
             prog_mode = None
@@ -1144,17 +1041,14 @@ class ZONNSMARTThermostat(TuyaThermostatCluster):
                 self.error("Unsupported value for Mode")
 
             if prog_mode is not None:
-                self._update_attribute(
-                    self.attributes_by_name["programing_oper_mode"].id, prog_mode
-                )
+                updates["programing_oper_mode"] = prog_mode
         elif attrid == ZONNSMART_FROST_PROTECT_ATTR:
             if value == 1:
                 operation_preset = self.Preset.FrostProtect
 
         if operation_preset is not None:
-            self._update_attribute(
-                self.attributes_by_name["operation_preset"].id, operation_preset
-            )
+            updates["operation_preset"] = operation_preset
+        self._update_attributes(updates)
 
     def system_mode_change(self, value):
         """System Mode change."""
@@ -1332,14 +1226,16 @@ class ZONNSMARTTemperatureOffset(LocalDataCluster, AnalogOutput):
         """Init."""
         super().__init__(*args, **kwargs)
         self.endpoint.device.temperature_calibration_bus.add_listener(self)
-        self._update_attribute(
-            self.attributes_by_name["description"].id, "Temperature Offset"
+        self._update_attributes(
+            {
+                "description": "Temperature Offset",
+                "max_present_value": 5,
+                "min_present_value": -5,
+                "resolution": 0.1,
+                "application_type": 0x0009,
+                "engineering_units": 62,
+            }
         )
-        self._update_attribute(self.attributes_by_name["max_present_value"].id, 5)
-        self._update_attribute(self.attributes_by_name["min_present_value"].id, -5)
-        self._update_attribute(self.attributes_by_name["resolution"].id, 0.1)
-        self._update_attribute(self.attributes_by_name["application_type"].id, 0x0009)
-        self._update_attribute(self.attributes_by_name["engineering_units"].id, 62)
 
     def set_value(self, value):
         """Set new temperature offset value."""
@@ -1372,20 +1268,16 @@ class ZONNSMARTWindowOpenedTemp(LocalDataCluster, AnalogOutput):
         """Init."""
         super().__init__(*args, **kwargs)
         self.endpoint.device.window_temperature_bus.add_listener(self)
-        self._update_attribute(
-            self.attributes_by_name["description"].id, "Opened Window Temperature"
-        )
-        self._update_attribute(
-            self.attributes_by_name["max_present_value"].id,
-            ZONNSMART_MAX_TEMPERATURE_VAL / 100,
-        )
-        self._update_attribute(
-            self.attributes_by_name["min_present_value"].id,
-            ZONNSMART_MIN_TEMPERATURE_VAL / 100,
+        self._update_attributes(
+            {
+                "description": "Opened Window Temperature",
+                "max_present_value": ZONNSMART_MAX_TEMPERATURE_VAL / 100,
+                "min_present_value": ZONNSMART_MIN_TEMPERATURE_VAL / 100,
+                "resolution": 0.5,
+                "application_type": 0 << 16,
+                "engineering_units": 62,
+            }
         )
-        self._update_attribute(self.attributes_by_name["resolution"].id, 0.5)
-        self._update_attribute(self.attributes_by_name["application_type"].id, 0 << 16)
-        self._update_attribute(self.attributes_by_name["engineering_units"].id, 62)
 
     def set_value(self, value):
         """Set temperature value when opened window detected."""
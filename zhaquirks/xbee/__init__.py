@@ -4,7 +4,9 @@ See xbee.md for additional information.
 """
 
 import asyncio
+import dataclasses
 import enum
+import functools
 import logging
 from typing import Any, Optional
 
@@ -22,8 +24,9 @@ from zigpy.zcl.clusters.general import (
 
 from zhaquirks import EventableCluster, LocalDataCluster
 from zhaquirks.const import ENDPOINTS, INPUT_CLUSTERS, OUTPUT_CLUSTERS
+from zhaquirks.timers import get_timer_wheel
 
-from .types import ATCommand, BinaryString, Bytes, IOSample
+from .types import ANALOG_PINS, DIGITAL_PINS, ATCommand, BinaryString, Bytes, IOSample
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -47,6 +50,13 @@ ATTR_PRESENT_VALUE = 0x0055
 PIN_ANALOG_OUTPUT = 2
 
 REMOTE_AT_COMMAND_TIMEOUT = 30
+# frame id 0 disables the response of the remote XBee
+MIN_FRAME_ID = 0x01
+MAX_FRAME_ID = 0xFF
+REMOTE_AT_COMMANDS_IN_FLIGHT = 4
+# largest serial data payload of an unencrypted unicast, see the NP command
+SERIAL_DATA_CHUNK_SIZE = 84
+SERIAL_STREAM_HIGH_WATER = 1024
 
 
 # https://github.com/zigpy/zigpy-xbee/blob/dev/zigpy_xbee/api.py
@@ -274,6 +284,102 @@ class XBeePWM(LocalDataCluster, AnalogOutput):
         return await super().read_attributes_raw(attributes, manufacturer)
 
 
+@dataclasses.dataclass
+class PendingATMetrics:
+    """Counters of the remote AT requests of an XBee."""
+
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    sent: int = 0
+    completed: int = 0
+    expired: int = 0
+    cancelled: int = 0
+    unexpected: int = 0
+
+
+class PendingATRequests:
+    """Remote AT requests of a single XBee awaiting their response.
+
+    Every request gets a frame id not used by another pending request of the
+    same device. Requests without a response after `timeout` seconds fail with
+    `TimeoutError` and their frame id is released, as is the frame id of a
+    request which is cancelled by its caller.
+    """
+
+    def __init__(self, timeout: float = REMOTE_AT_COMMAND_TIMEOUT) -> None:
+        """Init."""
+        self.timeout = timeout
+        self._pending: dict[int, tuple[asyncio.Future, Any]] = {}
+        self._next_frame_id = MIN_FRAME_ID
+        self._metrics = PendingATMetrics()
+
+    def __len__(self) -> int:
+        """Return the number of pending requests."""
+        return len(self._pending)
+
+    def __contains__(self, frame_id: int) -> bool:
+        """Return True if a request with `frame_id` is pending."""
+        return frame_id in self._pending
+
+    def metrics(self) -> PendingATMetrics:
+        """Return a snapshot of the request counters."""
+        return dataclasses.replace(self._metrics, in_flight=len(self._pending))
+
+    def new_request(self) -> tuple[int, asyncio.Future]:
+        """Allocate a free frame id and the future of its response."""
+        frame_id = self._allocate_frame_id()
+        future = asyncio.get_running_loop().create_future()
+        timer = get_timer_wheel().call_later(
+            self.timeout, self._expire, frame_id, future
+        )
+        self._pending[frame_id] = (future, timer)
+        future.add_done_callback(functools.partial(self._release, frame_id))
+
+        self._metrics.sent += 1
+        self._metrics.peak_in_flight = max(
+            self._metrics.peak_in_flight, len(self._pending)
+        )
+        return frame_id, future
+
+    def pop(self, frame_id: int) -> Optional[asyncio.Future]:
+        """Return the future of the pending request answered by `frame_id`."""
+        try:
+            future, timer = self._pending.pop(frame_id)
+        except KeyError:
+            self._metrics.unexpected += 1
+            return None
+        timer.cancel()
+        if future.done():
+            self._metrics.cancelled += 1
+            return None
+        self._metrics.completed += 1
+        return future
+
+    def _allocate_frame_id(self) -> int:
+        if len(self._pending) > MAX_FRAME_ID - MIN_FRAME_ID:
+            raise RuntimeError("No free frame id for a remote AT command")
+        frame_id = self._next_frame_id
+        while frame_id in self._pending:
+            frame_id = frame_id + 1 if frame_id < MAX_FRAME_ID else MIN_FRAME_ID
+        self._next_frame_id = frame_id + 1 if frame_id < MAX_FRAME_ID else MIN_FRAME_ID
+        return frame_id
+
+    def _expire(self, frame_id: int, future: asyncio.Future) -> None:
+        del self._pending[frame_id]
+        self._metrics.expired += 1
+        if not future.done():
+            future.set_exception(TimeoutError(f"No response to frame {frame_id}"))
+
+    def _release(self, frame_id: int, future: asyncio.Future) -> None:
+        pending = self._pending.get(frame_id)
+        if pending is None or pending[0] is not future:
+            return
+        # the caller gave up on the request before its response arrived
+        del self._pending[frame_id]
+        pending[1].cancel()
+        self._metrics.cancelled += 1
+
+
 class XBeeRemoteATRequest(LocalDataCluster):
     """Remote AT Command Request Cluster."""
 
@@ -288,12 +394,10 @@ class XBeeRemoteATRequest(LocalDataCluster):
         for k, v in zip(range(1, len(AT_COMMANDS) + 1), AT_COMMANDS.items())
     }
 
-    _seq: int = 1
-
-    def _save_at_request(self, frame_id, future):
-        self._endpoint.in_clusters[XBEE_AT_RESPONSE_CLUSTER].save_at_request(
-            frame_id, future
-        )
+    def _new_at_request(self):
+        return self._endpoint.in_clusters[
+            XBEE_AT_RESPONSE_CLUSTER
+        ].pending_requests.new_request()
 
     def remote_at_command(self, cmd_name, *args, apply_changes=True, **kwargs):
         """Execute a Remote AT Command and Return Response."""
@@ -312,22 +416,51 @@ class XBeeRemoteATRequest(LocalDataCluster):
             options |= 0x02
         return self._remote_at_command(options, cmd_name, *args)
 
+    async def remote_at_commands(
+        self, commands, *, max_in_flight=REMOTE_AT_COMMANDS_IN_FLIGHT, write=False
+    ):
+        """Execute Remote AT Commands and apply their changes at once.
+
+        `commands` are `(cmd_name, *args)` tuples, sent with at most
+        `max_in_flight` of them awaiting a response. Their changes are applied
+        by a final AC command and written to flash by WR if `write` is set,
+        unless AC fails. Return the responses in the order of the commands and
+        the responses of AC and WR, with the exception in place of the
+        response of a failed command.
+        """
+        in_flight = asyncio.Semaphore(max_in_flight)
+
+        async def send(cmd_name, *args):
+            async with in_flight:
+                return await self.remote_at_command(
+                    cmd_name, *args, apply_changes=False
+                )
+
+        results = await asyncio.gather(
+            *(send(*command) for command in commands), return_exceptions=True
+        )
+        apply_results = []
+        for cmd_name in ("AC", "WR") if write else ("AC",):
+            try:
+                apply_results.append(await self.remote_at_command(cmd_name))
+            except Exception as exc:  # pylint: disable=broad-except
+                apply_results.append(exc)
+                break
+        return results, apply_results
+
     async def _remote_at_command(self, options, name, *args):
         _LOGGER.debug("Remote AT command: %s %s", name, args)
         data = t.serialize(args, (AT_COMMANDS[name],))
+        future = await self._command(options, name.encode("ascii"), data, *args)
         try:
-            return await asyncio.wait_for(
-                await self._command(options, name.encode("ascii"), data, *args),
-                timeout=REMOTE_AT_COMMAND_TIMEOUT,
-            )
+            return await future
         except TimeoutError:
             _LOGGER.warning("No response to %s command", name)
             raise
 
     async def _command(self, options, command, data, *args):
         _LOGGER.debug("Command %s %s", command, data)
-        frame_id = self._seq
-        self._seq = (self._seq % 255) + 1
+        frame_id, future = self._new_at_request()
         schema = (
             t.uint8_t,
             t.uint8_t,
@@ -352,9 +485,6 @@ class XBeeRemoteATRequest(LocalDataCluster):
             schema,
         )
 
-        future = asyncio.Future()
-        self._save_at_request(frame_id, future)
-
         try:
             await self._endpoint.device.application.request(
                 self._endpoint.device,
@@ -421,11 +551,10 @@ class XBeeRemoteATResponse(LocalDataCluster):
 
     cluster_id = XBEE_AT_RESPONSE_CLUSTER
 
-    _awaiting = {}
-
-    def save_at_request(self, frame_id, future):
-        """Save pending request."""
-        self._awaiting[frame_id] = (future,)
+    def __init__(self, *args, **kwargs):
+        """Init."""
+        self.pending_requests = PendingATRequests()
+        super().__init__(*args, **kwargs)
 
     def handle_cluster_request(
         self,
@@ -440,7 +569,12 @@ class XBeeRemoteATResponse(LocalDataCluster):
                 "Remote AT command response: %s",
                 (args.frame_id, args.cmd, args.status, args.value),
             )
-            (fut,) = self._awaiting.pop(args.frame_id)
+            fut = self.pending_requests.pop(args.frame_id)
+            if fut is None:
+                _LOGGER.debug(
+                    "Dropping response to expired or cancelled frame %s", args.frame_id
+                )
+                return
             try:
                 status = ATCommandResult(args.status)
             except ValueError:
@@ -477,9 +611,20 @@ class XBeeRemoteATResponse(LocalDataCluster):
 
 
 class XBeeDigitalIOCluster(LocalDataCluster, BinaryInput):
-    """Digital IO Cluster for the XBee."""
+    """Digital IO Cluster for the XBee.
+
+    Only digital pins which differ from the cached value of their cluster are
+    updated, and analog pins which differ by more than `analog_deadband`, in
+    the units of the samples (ADC counts, mV for the supply voltage).
+    """
 
     cluster_id = XBEE_IO_CLUSTER
+    analog_deadband: int = 0
+
+    def __init__(self, *args, **kwargs):
+        """Init."""
+        super().__init__(*args, **kwargs)
+        self._pin_clusters = None
 
     def handle_cluster_request(
         self,
@@ -493,32 +638,51 @@ class XBeeDigitalIOCluster(LocalDataCluster, BinaryInput):
         Update the digital pin states
         """
         if hdr.command_id == SAMPLE_DATA_CMD:
-            values = args.io_sample
-            if "digital_samples" in values:
-                # Update digital inputs
-                active_pins = [
-                    i for i, x in enumerate(values["digital_samples"]) if x is not None
-                ]
-                for pin in active_pins:
-                    # pylint: disable=W0212
-                    self._endpoint.device[0xD0 + pin].on_off._update_attribute(
-                        ATTR_ON_OFF, values["digital_samples"][pin]
-                    )
-            if "analog_samples" in values:
-                # Update analog inputs
-                active_pins = [
-                    i for i, x in enumerate(values["analog_samples"]) if x is not None
-                ]
-                for pin in active_pins:
-                    # pylint: disable=W0212
-                    self._endpoint.device[0xD0 + pin].analog_input._update_attribute(
-                        ATTR_PRESENT_VALUE,
-                        values["analog_samples"][pin]
-                        / (10.23 if pin != 7 else 1000),  # supply voltage is in mV
-                    )
+            for values in args.io_sample.sample_sets:
+                self._update_pins(values)
         else:
             super().handle_cluster_request(hdr, args)
 
+    def _resolve_pin_clusters(self):
+        on_off_clusters = []
+        analog_clusters = []
+        for pin in range(DIGITAL_PINS):
+            endpoint = self._endpoint.device.endpoints.get(0xD0 + pin)
+            in_clusters = endpoint.in_clusters if endpoint is not None else {}
+            on_off_clusters.append(in_clusters.get(OnOff.cluster_id))
+            if pin < ANALOG_PINS:
+                analog_clusters.append(in_clusters.get(AnalogInput.cluster_id))
+        return on_off_clusters, analog_clusters
+
+    def _update_pins(self, values):
+        if self._pin_clusters is None:
+            # the pin endpoints are only added after this cluster is created
+            self._pin_clusters = self._resolve_pin_clusters()
+        on_off_clusters, analog_clusters = self._pin_clusters
+
+        # Update digital inputs
+        for pin, value in enumerate(values.get("digital_samples") or ()):
+            cluster = on_off_clusters[pin]
+            # pins without an endpoint are skipped
+            if value is None or cluster is None or cluster.get(ATTR_ON_OFF) == value:
+                continue
+            cluster._update_attribute(ATTR_ON_OFF, value)  # pylint: disable=W0212
+
+        # Update analog inputs
+        for pin, value in enumerate(values.get("analog_samples") or ()):
+            cluster = analog_clusters[pin]
+            if value is None or cluster is None:
+                continue
+            scale = 10.23 if pin != 7 else 1000  # supply voltage is in mV
+            cached = cluster.get(ATTR_PRESENT_VALUE)
+            if (
+                cached is not None
+                and abs(value - round(cached * scale)) <= self.analog_deadband
+            ):
+                continue
+            # pylint: disable=W0212
+            cluster._update_attribute(ATTR_PRESENT_VALUE, value / scale)
+
     client_commands = {}
     server_commands = {
         SAMPLE_DATA_CMD: foundation.ZCLCommandDef(
@@ -549,12 +713,222 @@ class XBeeEventRelayCluster(EventableCluster, LocalDataCluster, LevelControl):
     )
 
 
+class XBeeSerialTransport(asyncio.Transport):
+    """Transport of the serial data of an XBee over its serial data cluster.
+
+    Written data is sent to the XBee in chunks of at most `chunk_size` bytes,
+    one chunk at a time, and the protocol is paused while more than the high
+    water mark of the write buffer is waiting to be sent. Received data is
+    passed on to the protocol as it arrives. The XBee can't be told to stop
+    sending, so while reading is paused received data is buffered by the
+    transport and passed on once reading is resumed.
+    """
+
+    def __init__(
+        self,
+        cluster: "XBeeSerialDataCluster",
+        protocol: asyncio.Protocol,
+        chunk_size: int = SERIAL_DATA_CHUNK_SIZE,
+    ) -> None:
+        """Init."""
+        super().__init__()
+        self._cluster = cluster
+        self._protocol = protocol
+        self._chunk_size = chunk_size
+        self._buffer = bytearray()
+        self._read_buffer = bytearray()
+        self._sender: Optional[asyncio.Task] = None
+        self._closing = False
+        self._reading = True
+        self._writing_paused = False
+        self._high_water = SERIAL_STREAM_HIGH_WATER
+        self._low_water = SERIAL_STREAM_HIGH_WATER // 4
+
+    def get_protocol(self) -> asyncio.BaseProtocol:
+        """Return the protocol of the transport."""
+        return self._protocol
+
+    def set_protocol(self, protocol: asyncio.BaseProtocol) -> None:
+        """Set the protocol of the transport."""
+        self._protocol = protocol
+
+    def is_closing(self) -> bool:
+        """Return True if the transport is closing or closed."""
+        return self._closing
+
+    def is_reading(self) -> bool:
+        """Return True if the transport is receiving."""
+        return self._reading
+
+    def pause_reading(self) -> None:
+        """Pause receiving, data sent by the XBee is buffered until resumed."""
+        self._reading = False
+
+    def resume_reading(self) -> None:
+        """Resume receiving, passing on the data buffered while paused."""
+        if self._reading:
+            return
+        self._reading = True
+        if self._read_buffer:
+            asyncio.get_running_loop().call_soon(self._flush_read_buffer)
+
+    def get_write_buffer_size(self) -> int:
+        """Return the number of bytes waiting to be sent."""
+        return len(self._buffer)
+
+    def get_write_buffer_limits(self) -> tuple[int, int]:
+        """Return the low and high water marks of the write buffer."""
+        return self._low_water, self._high_water
+
+    def set_write_buffer_limits(
+        self, high: Optional[int] = None, low: Optional[int] = None
+    ) -> None:
+        """Set the high and low water marks of the write buffer."""
+        if high is None:
+            high = 4 * low if low is not None else SERIAL_STREAM_HIGH_WATER
+        if low is None:
+            low = high // 4
+        if not high >= low >= 0:
+            raise ValueError(f"high ({high!r}) must be >= low ({low!r}) must be >= 0")
+        self._high_water = high
+        self._low_water = low
+        self._maybe_pause_protocol()
+
+    def can_write_eof(self) -> bool:
+        """Return False, the serial data of an XBee has no end."""
+        return False
+
+    def write(self, data: bytes) -> None:
+        """Queue data to be sent to the XBee."""
+        if self._closing:
+            raise RuntimeError("Cannot write to a closing serial stream")
+        if not data:
+            return
+        self._buffer += data
+        if self._sender is None:
+            self._sender = asyncio.get_running_loop().create_task(self._send())
+        self._maybe_pause_protocol()
+
+    def close(self) -> None:
+        """Close the transport once the buffered data is sent."""
+        if self._closing:
+            return
+        self._closing = True
+        if self._sender is None:
+            asyncio.get_running_loop().call_soon(self._connection_lost, None)
+
+    def abort(self) -> None:
+        """Close the transport, dropping the buffered data."""
+        self._closing = True
+        self._buffer.clear()
+        self._read_buffer.clear()
+        if self._sender is not None:
+            self._sender.cancel()
+            self._sender = None
+        self._connection_lost(None)
+
+    def _data_received(self, data: bytes) -> None:
+        # keep the order of data received before the buffer is flushed
+        if not self._reading or self._read_buffer:
+            self._read_buffer += data
+            return
+        self._protocol.data_received(data)
+
+    def _flush_read_buffer(self) -> None:
+        if not self._reading or not self._read_buffer:
+            return
+        data = bytes(self._read_buffer)
+        self._read_buffer.clear()
+        self._protocol.data_received(data)
+
+    async def _send(self) -> None:
+        try:
+            while self._buffer:
+                chunk = bytes(self._buffer[: self._chunk_size])
+                del self._buffer[: self._chunk_size]
+                await self._cluster.send_data(chunk)
+                self._maybe_resume_protocol()
+        except Exception as exc:  # pylint: disable=broad-except
+            _LOGGER.debug("Failed to send serial data: %s", exc)
+            self._closing = True
+            self._buffer.clear()
+            self._sender = None
+            self._connection_lost(exc)
+            return
+
+        self._sender = None
+        if self._closing:
+            self._connection_lost(None)
+
+    def _maybe_pause_protocol(self) -> None:
+        if not self._writing_paused and len(self._buffer) > self._high_water:
+            self._writing_paused = True
+            self._protocol.pause_writing()
+
+    def _maybe_resume_protocol(self) -> None:
+        if self._writing_paused and len(self._buffer) <= self._low_water:
+            self._writing_paused = False
+            self._protocol.resume_writing()
+
+    def _connection_lost(self, exc: Optional[Exception]) -> None:
+        if self._cluster is None:
+            return
+        self._cluster._stream_closed(self)  # pylint: disable=protected-access
+        self._cluster = None
+        self._protocol.connection_lost(exc)
+
+
 class XBeeSerialDataCluster(LocalDataCluster):
     """Serial Data Cluster for the XBee."""
 
     cluster_id = XBEE_DATA_CLUSTER
     ep_attribute = "xbee_serial_data"
 
+    def __init__(self, *args, **kwargs):
+        """Init."""
+        self._transport = None
+        super().__init__(*args, **kwargs)
+
+    async def open_connection(
+        self, *, limit=2**16, chunk_size=SERIAL_DATA_CHUNK_SIZE
+    ) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        """Open a stream reader and writer over the serial data of the XBee.
+
+        While the stream is open, received serial data goes to the reader as
+        bytes instead of being relayed as receive_data events.
+        """
+        if self._transport is not None:
+            raise RuntimeError("Serial stream of the XBee is already open")
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader(limit=limit, loop=loop)
+        protocol = asyncio.StreamReaderProtocol(reader, loop=loop)
+        self._transport = XBeeSerialTransport(self, protocol, chunk_size)
+        protocol.connection_made(self._transport)
+        return reader, asyncio.StreamWriter(self._transport, protocol, reader, loop)
+
+    async def send_data(self, data: bytes):
+        """Send raw serial data to the XBee."""
+        return await self._endpoint.device.application.request(
+            self._endpoint.device,
+            XBEE_PROFILE_ID,
+            XBEE_DATA_CLUSTER,
+            XBEE_DATA_ENDPOINT,
+            XBEE_DATA_ENDPOINT,
+            self._endpoint.device.application.get_sequence(),
+            data,
+            expect_reply=False,
+        )
+
+    def _stream_closed(self, transport):
+        if self._transport is transport:
+            self._transport = None
+
+    def deserialize(self, data):
+        """Deserialize, keeping serial data as bytes for an open stream."""
+        if self._transport is None:
+            return super().deserialize(data)
+        return foundation.ZCLHeader.deserialize(data)
+
     async def command(
         self,
         command_id,
@@ -570,18 +944,7 @@ class XBeeSerialDataCluster(LocalDataCluster):
             foundation.GeneralCommand.Default_Response
         ].schema(
             command_id=0x00,
-            status=(
-                await self._endpoint.device.application.request(
-                    self._endpoint.device,
-                    XBEE_PROFILE_ID,
-                    XBEE_DATA_CLUSTER,
-                    XBEE_DATA_ENDPOINT,
-                    XBEE_DATA_ENDPOINT,
-                    self._endpoint.device.application.get_sequence(),
-                    data,
-                    expect_reply=False,
-                )
-            )[0],
+            status=(await self.send_data(data))[0],
         )
 
     def handle_cluster_request(
@@ -592,7 +955,11 @@ class XBeeSerialDataCluster(LocalDataCluster):
         dst_addressing: Optional[t.AddrMode] = None,
     ):
         """Handle incoming data."""
-        if hdr.command_id == DATA_IN_CMD:
+        if hdr.command_id == DATA_IN_CMD and isinstance(args, bytes):
+            # raw serial data deserialized for an open stream
+            if self._transport is not None:
+                self._transport._data_received(args)  # pylint: disable=W0212
+        elif hdr.command_id == DATA_IN_CMD:
             self._endpoint.out_clusters[LevelControl.cluster_id].handle_cluster_request(
                 hdr, {"data": args.data}
             )
@@ -627,6 +994,22 @@ class XBeeCommon(CustomDevice):
             .remote_at_command(command, *args, apply_changes=True, **kwargs)
         )
 
+    def remote_at_batch(self, commands, **kwargs):
+        """Remote at commands, applied together."""
+        return (
+            self.endpoints[XBEE_AT_ENDPOINT]
+            .out_clusters[XBEE_AT_REQUEST_CLUSTER]
+            .remote_at_commands(commands, **kwargs)
+        )
+
+    async def open_serial_connection(self, **kwargs):
+        """Open a stream reader and writer over the serial data."""
+        return (
+            await self.endpoints[XBEE_DATA_ENDPOINT]
+            .in_clusters[XBEE_DATA_CLUSTER]
+            .open_connection(**kwargs)
+        )
+
     def deserialize(self, endpoint_id, cluster_id, data):
         """Deserialize."""
         if endpoint_id == 0:
@@ -38,10 +38,34 @@ class BinaryString(str):
         return (cls(data), b"")
 
 
+DIGITAL_PINS = 15
+ANALOG_PINS = 8
+
+# values of the 8 pins of a mask or sample byte, least significant bit first
+_BYTE_BITS = tuple(tuple((byte >> bit) & 1 for bit in range(8)) for byte in range(256))
+# pins set in the low and high byte of a mask
+_LOW_PINS = tuple(
+    tuple(bit for bit, value in enumerate(bits) if value) for bits in _BYTE_BITS
+)
+_HIGH_PINS = tuple(
+    tuple(pin + 8 for pin in pins if pin + 8 < DIGITAL_PINS) for pins in _LOW_PINS
+)
+
+
 class IOSample(dict):
-    """Parse an XBee IO sample report."""
+    """Parse an XBee IO sample report.
+
+    The digital and analog samples are those of the last sample set of the
+    report, `earlier_sample_sets` holds the sample sets taken before it.
+    """
 
     serialize = None
+    earlier_sample_sets: tuple[IOSample, ...] = ()
+
+    @property
+    def sample_sets(self) -> tuple[IOSample, ...]:
+        """Every sample set of the report in the order it was taken."""
+        return (*self.earlier_sample_sets, self)
 
     @classmethod
     def deserialize(cls, data):
@@ -51,56 +75,36 @@ class IOSample(dict):
         Sample set count byte 0
         Digital mask byte 1, 2
         Analog mask byte 3
-        Digital samples byte 4, 5 (if any sample exists)
-        Analog Sample, 2 bytes per
+        For every sample set:
+            Digital samples 2 bytes (if any digital pin is enabled)
+            Analog samples 2 bytes per enabled analog pin
         """
-        sample_sets = int.from_bytes(data[0:1], byteorder="big")
-        if sample_sets != 1:
-            raise ValueError("Number of sets is not 1")
-        digital_mask = data[1:3]
-        analog_mask = data[3:4]
-        digital_sample = data[4:6]
-        num_bits = 15
-        digital_pins = [
-            (int.from_bytes(digital_mask, byteorder="big") >> bit) & 1
-            for bit in range(num_bits - 1, -1, -1)
-        ]
-        digital_pins = list(reversed(digital_pins))
-        analog_pins = [
-            (int.from_bytes(analog_mask, byteorder="big") >> bit) & 1
-            for bit in range(8 - 1, -1, -1)
-        ]
-        analog_pins = list(reversed(analog_pins))
-        if 1 in digital_pins:
-            digital_samples: list[int | None] = [
-                (int.from_bytes(digital_sample, byteorder="big") >> bit) & 1
-                for bit in range(num_bits - 1, -1, -1)
-            ]
-            digital_samples = list(reversed(digital_samples))
-            sample_index = 6
-        else:
-            # skip digital samples block
-            digital_samples = digital_pins
-            sample_index = 4
-        analog_samples = []
-        for apin in analog_pins:
-            if apin == 1:
-                analog_samples.append(
-                    int.from_bytes(
-                        data[sample_index : sample_index + 2], byteorder="big"
-                    )
-                )
-                sample_index += 2
-            else:
-                analog_samples.append(None)
-        for dpin in range(len(digital_pins)):
-            if digital_pins[dpin] == 0:
-                digital_samples[dpin] = None
-
-        return (
-            {
-                "digital_samples": digital_samples,
-                "analog_samples": analog_samples,
-            },
-            data[sample_index:],
-        )
+        if len(data) < 4 or data[0] == 0:
+            raise ValueError("IO sample without sample sets")
+        digital_pins = _LOW_PINS[data[2]] + _HIGH_PINS[data[1]]
+        analog_pins = _LOW_PINS[data[3]]
+        set_size = (2 if digital_pins else 0) + 2 * len(analog_pins)
+        end = 4 + data[0] * set_size
+        if len(data) < end:
+            raise ValueError("IO sample is truncated")
+
+        sample_sets = []
+        index = 4
+        for _ in range(data[0]):
+            digital_samples: list[int | None] = [None] * DIGITAL_PINS
+            if digital_pins:
+                bits = _BYTE_BITS[data[index + 1]] + _BYTE_BITS[data[index]]
+                for pin in digital_pins:
+                    digital_samples[pin] = bits[pin]
+                index += 2
+            analog_samples: list[int | None] = [None] * ANALOG_PINS
+            for pin in analog_pins:
+                analog_samples[pin] = data[index] << 8 | data[index + 1]
+                index += 2
+            sample_sets.append(
+                cls(digital_samples=digital_samples, analog_samples=analog_samples)
+            )
+
+        sample = sample_sets.pop()
+        sample.earlier_sample_sets = tuple(sample_sets)
+        return sample, data[end:]
@@ -2,13 +2,16 @@
 
 from __future__ import annotations
 
-from collections.abc import Iterable, Iterator
+from collections.abc import Callable, Iterable, Iterator
+import dataclasses
+import functools
 import logging
 import math
 from typing import Any
 
 from zigpy import types as t
 import zigpy.device
+import zigpy.endpoint
 from zigpy.profiles import zha
 from zigpy.quirks import CustomCluster, CustomDevice
 from zigpy.typing import AddressingMode
@@ -49,6 +52,7 @@ from zhaquirks.const import (
     VALUE,
     ZHA_SEND_EVENT,
 )
+from zhaquirks.manifest import load_quirks
 
 BATTERY_LEVEL = "battery_level"
 BATTERY_PERCENTAGE_REMAINING = 0x0021
@@ -110,6 +114,233 @@ XIAOMI_NODE_DESC = NodeDescriptor(
 _LOGGER = logging.getLogger(__name__)
 
 
+# Aqara 0xFF01/0x00F7 attribute tags reported by every model
+AQARA_TAGS: dict[int, str] = {
+    1: BATTERY_VOLTAGE_MV,
+    3: TEMPERATURE,
+    4: XIAOMI_ATTR_4,
+    5: XIAOMI_ATTR_5,
+    6: XIAOMI_ATTR_6,
+    10: PATH,
+}
+# {model: {tag: attribute name}}, see `register_aqara_tags()`
+_AQARA_MODEL_TAGS: dict[str, dict[int, str]] = {}
+_UNKNOWN_AQARA_TAGS = tuple(f"0xff01-{tag}" for tag in range(256))
+
+
+def register_aqara_tags(models: Iterable[str], tags: dict[int, str]) -> None:
+    """Register model specific Aqara attribute tags, on top of `AQARA_TAGS`."""
+    for model in models:
+        _AQARA_MODEL_TAGS.setdefault(model, dict(AQARA_TAGS)).update(tags)
+
+
+# Temperature sensors send temperature/humidity/pressure updates through this
+# cluster instead of the respective clusters
+register_aqara_tags(
+    ("lumi.sensor_ht", "lumi.sens", "lumi.sensor_ht.agl02"),
+    {
+        100: TEMPERATURE_MEASUREMENT,
+        101: HUMIDITY_MEASUREMENT,
+        102: PRESSURE_MEASUREMENT,
+    },
+)
+register_aqara_tags(
+    ("lumi.weather",),
+    {
+        100: TEMPERATURE_MEASUREMENT,
+        101: HUMIDITY_MEASUREMENT,
+        102: PRESSURE_MEASUREMENT_PRECISION,
+    },
+)
+register_aqara_tags(
+    ("lumi.airmonitor.acn01",),
+    {
+        100: TEMPERATURE_MEASUREMENT,
+        101: HUMIDITY_MEASUREMENT,
+        102: TVOC_MEASUREMENT,
+    },
+)
+register_aqara_tags(
+    (
+        "lumi.plug",
+        "lumi.plug.maus01",
+        "lumi.plug.maeu01",
+        "lumi.plug.mmeu01",
+        "lumi.relay.c2acn01",
+        "lumi.switch.n0agl1",
+        "lumi.switch.n0acn2",
+    ),
+    {149: CONSUMPTION, 150: VOLTAGE, 152: POWER},
+)
+register_aqara_tags(("lumi.sensor_motion.aq2",), {11: ILLUMINANCE_MEASUREMENT})
+register_aqara_tags(
+    ("lumi.curtain.acn002",), {101: BATTERY_PERCENTAGE_REMAINING_ATTRIBUTE}
+)
+register_aqara_tags(
+    ("lumi.motion.agl02", "lumi.motion.ac02", "lumi.motion.acn001"),
+    {101: ILLUMINANCE_MEASUREMENT},
+)
+register_aqara_tags(
+    ("lumi.motion.ac02",), {105: DETECTION_INTERVAL, 106: MOTION_SENSITIVITY}
+)
+register_aqara_tags(
+    ("lumi.motion.agl04",),
+    {
+        102: DETECTION_INTERVAL,
+        105: MOTION_SENSITIVITY,
+        258: DETECTION_INTERVAL,
+        268: MOTION_SENSITIVITY,
+    },
+)
+register_aqara_tags(
+    ("lumi.motion.ac01",),
+    {
+        5: POWER_OUTAGE_COUNT,
+        101: PRESENCE_DETECTED,
+        102: PRESENCE_EVENT,
+        103: MONITORING_MODE,
+        105: APPROACH_DISTANCE,
+        268: MOTION_SENSITIVITY,
+        322: PRESENCE_DETECTED,
+        323: PRESENCE_EVENT,
+        324: MONITORING_MODE,
+        326: APPROACH_DISTANCE,
+    },
+)
+register_aqara_tags(
+    ("lumi.sensor_smoke.acn03",),
+    {
+        160: SMOKE,
+        161: SMOKE_DENSITY,
+        162: SELF_TEST,
+        163: BUZZER_MANUAL_MUTE,
+        164: HEARTBEAT_INDICATOR,
+        165: LINKAGE_ALARM,
+    },
+)
+
+
+@dataclasses.dataclass(frozen=True)
+class XiaomiRoute:
+    """Forward a parsed Xiaomi attribute to a cluster on the same endpoint."""
+
+    ep_attribute: str
+    attribute_id: int | None = None
+    transform: Callable[[Any], Any] | None = None
+    # call this cluster method with the value instead of updating an attribute
+    method: str | None = None
+    # logged with the device ieee when the target is missing
+    missing_message: str | None = None
+
+    def resolve(
+        self, endpoint: zigpy.endpoint.Endpoint
+    ) -> Callable[[Any], None] | None:
+        """Return a callable applying a value, None if the target is missing."""
+        cluster = getattr(endpoint, self.ep_attribute, None)
+        if cluster is None:
+            return None
+
+        if self.method is not None:
+            apply = getattr(cluster, self.method, None)
+            if not callable(apply):
+                return None
+        else:
+            apply = functools.partial(cluster.update_attribute, self.attribute_id)
+
+        if self.transform is None:
+            return apply
+
+        transform = self.transform
+        return lambda value: apply(transform(value))
+
+
+XIAOMI_ROUTES: dict[str, tuple[XiaomiRoute, ...]] = {
+    # many Xiaomi devices report this, but not all quirks implement the
+    # XiaomiPowerConfiguration cluster
+    BATTERY_VOLTAGE_MV: (
+        XiaomiRoute(
+            "power",
+            method="battery_reported",
+            missing_message="%s - Xiaomi battery voltage attribute received but"
+            " XiaomiPowerConfiguration not used",
+        ),
+    ),
+    BATTERY_PERCENTAGE_REMAINING_ATTRIBUTE: (
+        XiaomiRoute("power", method="battery_percent_reported"),
+    ),
+    TEMPERATURE_MEASUREMENT: (
+        XiaomiRoute(
+            "temperature", TemperatureMeasurement.AttributeDefs.measured_value.id
+        ),
+    ),
+    HUMIDITY_MEASUREMENT: (
+        XiaomiRoute("humidity", RelativeHumidity.AttributeDefs.measured_value.id),
+    ),
+    PRESSURE_MEASUREMENT: (
+        XiaomiRoute("pressure", PressureMeasurement.AttributeDefs.measured_value.id),
+    ),
+    PRESSURE_MEASUREMENT_PRECISION: (
+        XiaomiRoute(
+            "pressure",
+            PressureMeasurement.AttributeDefs.measured_value.id,
+            lambda value: value / 100,
+        ),
+    ),
+    POWER: (
+        XiaomiRoute(
+            "electrical_measurement",
+            ElectricalMeasurement.AttributeDefs.active_power.id,
+            lambda value: round(value * 10),
+        ),
+    ),
+    CONSUMPTION: (
+        XiaomiRoute(
+            "electrical_measurement",
+            ElectricalMeasurement.AttributeDefs.total_active_power.id,
+            lambda value: round(value * 1000),
+        ),
+        XiaomiRoute(
+            "smartenergy_metering",
+            Metering.AttributeDefs.current_summ_delivered.id,
+            lambda value: round(value * 1000),
+        ),
+    ),
+    VOLTAGE: (
+        XiaomiRoute(
+            "electrical_measurement",
+            ElectricalMeasurement.AttributeDefs.rms_voltage.id,
+            lambda value: value * 0.1,
+        ),
+    ),
+    ILLUMINANCE_MEASUREMENT: (
+        XiaomiRoute(
+            "illuminance", IlluminanceMeasurement.AttributeDefs.measured_value.id
+        ),
+    ),
+    TVOC_MEASUREMENT: (XiaomiRoute("voc_level", 0x0000),),
+    TEMPERATURE: (
+        XiaomiRoute(
+            "device_temperature",
+            DeviceTemperature.AttributeDefs.current_temperature.id,
+            lambda value: value * 100,
+        ),
+    ),
+    SMOKE: (XiaomiRoute("ias_zone", IasZone.AttributeDefs.zone_status.id),),
+}
+
+
+def _peek_global_command_id(data: bytes) -> int | None:
+    """Return the command id of a ZCL global command frame without parsing it."""
+    # The manufacturer code, if any, precedes the TSN
+    command_id_idx = 4 if data and data[0] & 0b100 else 2
+    if (
+        len(data) <= command_id_idx
+        or data[0] & 0b11 != foundation.FrameType.GLOBAL_COMMAND
+    ):
+        return None
+    return data[command_id_idx]
+
+
 class XiaomiCustomDevice(CustomDevice):
     """Custom device representing xiaomi devices."""
 
@@ -127,14 +358,23 @@ class XiaomiQuickInitDevice(XiaomiCustomDevice, QuickInitDevice):
 class XiaomiCluster(CustomCluster):
     """Xiaomi cluster implementation."""
 
+    # parsed attribute name -> clusters it is forwarded to
+    attribute_routes: dict[str, tuple[XiaomiRoute, ...]] = XIAOMI_ROUTES
+
+    def __init__(self, *args, **kwargs):
+        """Init."""
+        super().__init__(*args, **kwargs)
+        # parsed attribute name -> updates of the clusters it is routed to
+        self._route_targets: dict[str, tuple[Callable[[Any], None], ...]] = {}
+
     def _iter_parse_attr_report(
         self, data: bytes
     ) -> Iterator[tuple[foundation.Attribute, bytes]]:
         """Yield all interpretations of the first attribute in a Xiaomi report."""
 
         # Peek at the attribute report
-        attr_id, data = t.uint16_t.deserialize(data)
-        attr_type, data = t.uint8_t.deserialize(data)
+        attr_id, remaining_data = t.uint16_t.deserialize(data)
+        attr_type, remaining_data = t.uint8_t.deserialize(remaining_data)
 
         if (
             attr_id
@@ -146,12 +386,11 @@ class XiaomiCluster(CustomCluster):
             or attr_type != 0x42  # "Character String"
         ):
             # Assume other attributes are reported correctly
-            data = attr_id.serialize() + attr_type.serialize() + data
-            attribute, data = foundation.Attribute.deserialize(data)
-
-            yield attribute, data
+            yield foundation.Attribute.deserialize(data)
             return
 
+        data = remaining_data
+
         # Length of the "string" can be wrong
         val_len, data = t.uint8_t.deserialize(data)
 
@@ -164,7 +403,7 @@ class XiaomiCluster(CustomCluster):
 
             val, final_data = data[:fixed_len], data[fixed_len:]
             attr_val = t.LVBytes(val)
-            attr_type = 0x41  # The data type should be "Octet String"
+            attr_type = t.uint8_t(0x41)  # The data type should be "Octet String"
 
             yield (
                 foundation.Attribute(
@@ -176,24 +415,84 @@ class XiaomiCluster(CustomCluster):
 
     def _interpret_attr_reports(
         self, data: bytes
-    ) -> Iterable[tuple[foundation.Attribute]]:
-        """Yield all valid interprations of a Xiaomi attribute report."""
+    ) -> tuple[tuple[foundation.Attribute, ...] | None, bool]:
+        """Find the first valid interpretation of a Xiaomi attribute report.
 
-        if not data:
-            yield ()
-            return
+        Every interpretation of a suffix of the report is searched once, the
+        second item tells if the report has more than one valid interpretation.
+        """
 
-        try:
-            parsed = list(self._iter_parse_attr_report(data))
-        except (KeyError, ValueError):
-            return
+        # {remaining length: (first interpretation, interpretations capped at 2)}
+        memo: dict[int, tuple[tuple[foundation.Attribute, ...] | None, int]] = {
+            0: ((), 1)
+        }
+
+        def interpret(
+            data: bytes,
+        ) -> tuple[tuple[foundation.Attribute, ...] | None, int]:
+            try:
+                return memo[len(data)]
+            except KeyError:
+                pass
 
-        for attr, remaining_data in parsed:
-            for remaining_attrs in self._interpret_attr_reports(remaining_data):
-                yield (attr,) + remaining_attrs
+            first = None
+            count = 0
+
+            try:
+                parsed = list(self._iter_parse_attr_report(data))
+            except (KeyError, ValueError):
+                parsed = []
+
+            for attr, remaining_data in parsed:
+                remaining_attrs, remaining_count = interpret(remaining_data)
+                if not remaining_count:
+                    continue
+                if first is None:
+                    first = (attr,) + remaining_attrs
+                count = min(count + remaining_count, 2)
+
+            result = memo[len(data)] = first, count
+            return result
+
+        attrs, count = interpret(data)
+        return attrs, count > 1
 
     def deserialize(self, data):
         """Deserialize cluster data."""
+
+        # Only handle attribute reports differently
+        if _peek_global_command_id(data) != foundation.GeneralCommand.Report_Attributes:
+            return super().deserialize(data)
+
+        self.debug("Received ZCL frame: %r", data)
+        hdr, payload = foundation.ZCLHeader.deserialize(data)
+        attrs, ambiguous = self._interpret_attr_reports(payload)
+
+        if attrs is None:
+            _LOGGER.warning("Failed to parse Xiaomi attribute report: %r", payload)
+            return super().deserialize(data)
+        elif ambiguous:
+            _LOGGER.warning(
+                "Xiaomi attribute report has multiple valid interpretations,"
+                " using %r",
+                attrs,
+            )
+
+        # Build the report from the parsed attributes instead of parsing it again
+        command = foundation.GENERAL_COMMANDS[
+            foundation.GeneralCommand.Report_Attributes
+        ]
+        hdr.frame_control.direction = command.direction
+        response = command.schema(attribute_reports=list(attrs))
+        self.debug("Decoded ZCL frame: %s:%r", type(self).__name__, response)
+
+        return hdr, response
+
+    def _deserialize_reencoded(self, data):
+        """Deserialize cluster data by re-encoding the fixed report.
+
+        Previous implementation of `deserialize()`, kept to verify it.
+        """
         hdr, data = foundation.ZCLHeader.deserialize(data)
 
         # Only handle attribute reports differently
@@ -203,18 +502,12 @@ class XiaomiCluster(CustomCluster):
         ):
             return super().deserialize(hdr.serialize() + data)
 
-        reports = list(self._interpret_attr_reports(data))
+        attrs, _ = self._interpret_attr_reports(data)
 
-        if not reports:
-            _LOGGER.warning("Failed to parse Xiaomi attribute report: %r", data)
+        if attrs is None:
             return super().deserialize(hdr.serialize() + data)
-        elif len(reports) > 1:
-            _LOGGER.warning(
-                "Xiaomi attribute report has multiple valid interpretations: %r",
-                reports,
-            )
 
-        fixed_data = b"".join(attr.serialize() for attr in reports[0])
+        fixed_data = b"".join(attr.serialize() for attr in attrs)
 
         return super().deserialize(hdr.serialize() + fixed_data)
 
@@ -256,182 +549,44 @@ class XiaomiCluster(CustomCluster):
             attrid,
             attributes,
         )
-        if BATTERY_VOLTAGE_MV in attributes:
-            # many Xiaomi devices report this, but not all quirks implement the XiaomiPowerConfiguration cluster,
-            # so we might error out if the method doesn't exist
-            if hasattr(self.endpoint.power, "battery_reported") and callable(
-                self.endpoint.power.battery_reported
-            ):
-                self.endpoint.power.battery_reported(attributes[BATTERY_VOLTAGE_MV])
-            else:
-                # log a debug message if the cluster is not implemented
+        for key, attr_value in attributes.items():
+            try:
+                updates = self._route_targets[key]
+            except KeyError:
+                updates = self._route_targets[key] = self._resolve_routes(key)
+            for update in updates:
+                update(attr_value)
+
+    def _resolve_routes(self, key: str) -> tuple[Callable[[Any], None], ...]:
+        """Resolve the `attribute_routes` of a parsed attribute on this endpoint."""
+        updates = []
+
+        for route in self.attribute_routes.get(key, ()):
+            update = route.resolve(self.endpoint)
+            if update is None and route.missing_message is not None:
+                _LOGGER.debug(route.missing_message, self.endpoint.device.ieee)
+            elif update is None:
                 _LOGGER.debug(
-                    "%s - Xiaomi battery voltage attribute received but XiaomiPowerConfiguration not used",
+                    "%s - Xiaomi %s attribute received but no %s cluster",
                     self.endpoint.device.ieee,
+                    key,
+                    route.ep_attribute,
                 )
+            else:
+                updates.append(update)
 
-        if TEMPERATURE_MEASUREMENT in attributes:
-            self.endpoint.temperature.update_attribute(
-                TemperatureMeasurement.AttributeDefs.measured_value.id,
-                attributes[TEMPERATURE_MEASUREMENT],
-            )
-
-        if HUMIDITY_MEASUREMENT in attributes:
-            self.endpoint.humidity.update_attribute(
-                RelativeHumidity.AttributeDefs.measured_value.id,
-                attributes[HUMIDITY_MEASUREMENT],
-            )
-
-        if PRESSURE_MEASUREMENT in attributes:
-            self.endpoint.pressure.update_attribute(
-                PressureMeasurement.AttributeDefs.measured_value.id,
-                attributes[PRESSURE_MEASUREMENT],
-            )
-
-        if PRESSURE_MEASUREMENT_PRECISION in attributes:
-            self.endpoint.pressure.update_attribute(
-                PressureMeasurement.AttributeDefs.measured_value.id,
-                attributes[PRESSURE_MEASUREMENT_PRECISION] / 100,
-            )
-
-        if POWER in attributes:
-            self.endpoint.electrical_measurement.update_attribute(
-                ElectricalMeasurement.AttributeDefs.active_power.id,
-                round(attributes[POWER] * 10),
-            )
-
-        if CONSUMPTION in attributes:
-            zcl_consumption = round(attributes[CONSUMPTION] * 1000)
-            self.endpoint.electrical_measurement.update_attribute(
-                ElectricalMeasurement.AttributeDefs.total_active_power.id,
-                zcl_consumption,
-            )
-            self.endpoint.smartenergy_metering.update_attribute(
-                Metering.AttributeDefs.current_summ_delivered.id, zcl_consumption
-            )
-
-        if VOLTAGE in attributes:
-            self.endpoint.electrical_measurement.update_attribute(
-                ElectricalMeasurement.AttributeDefs.rms_voltage.id,
-                attributes[VOLTAGE] * 0.1,
-            )
-
-        if ILLUMINANCE_MEASUREMENT in attributes:
-            self.endpoint.illuminance.update_attribute(
-                IlluminanceMeasurement.AttributeDefs.measured_value.id,
-                attributes[ILLUMINANCE_MEASUREMENT],
-            )
-
-        if TVOC_MEASUREMENT in attributes:
-            self.endpoint.voc_level.update_attribute(
-                0x0000, attributes[TVOC_MEASUREMENT]
-            )
-
-        if TEMPERATURE in attributes:
-            if hasattr(self.endpoint, "device_temperature"):
-                self.endpoint.device_temperature.update_attribute(
-                    DeviceTemperature.AttributeDefs.current_temperature.id,
-                    attributes[TEMPERATURE] * 100,
-                )
-
-        if BATTERY_PERCENTAGE_REMAINING_ATTRIBUTE in attributes:
-            self.endpoint.power.battery_percent_reported(
-                attributes[BATTERY_PERCENTAGE_REMAINING_ATTRIBUTE]
-            )
-
-        if SMOKE in attributes:
-            self.endpoint.ias_zone.update_attribute(
-                IasZone.AttributeDefs.zone_status.id, attributes[SMOKE]
-            )
+        return tuple(updates)
 
     def _parse_aqara_attributes(self, value):
         """Parse non-standard attributes."""
+        tag_names = _AQARA_MODEL_TAGS.get(self.endpoint.device.model, AQARA_TAGS)
         attributes = {}
-        attribute_names = {
-            1: BATTERY_VOLTAGE_MV,
-            3: TEMPERATURE,
-            4: XIAOMI_ATTR_4,
-            5: XIAOMI_ATTR_5,
-            6: XIAOMI_ATTR_6,
-            10: PATH,
-        }
-
-        if self.endpoint.device.model in [
-            "lumi.sensor_ht",
-            "lumi.sens",
-            "lumi.weather",
-            "lumi.airmonitor.acn01",
-            "lumi.sensor_ht.agl02",
-        ]:
-            # Temperature sensors send temperature/humidity/pressure updates through this
-            # cluster instead of the respective clusters
-            attribute_names.update(
-                {
-                    100: TEMPERATURE_MEASUREMENT,
-                    101: HUMIDITY_MEASUREMENT,
-                    102: TVOC_MEASUREMENT
-                    if self.endpoint.device.model == "lumi.airmonitor.acn01"
-                    else PRESSURE_MEASUREMENT_PRECISION
-                    if self.endpoint.device.model == "lumi.weather"
-                    else PRESSURE_MEASUREMENT,
-                }
-            )
-        elif self.endpoint.device.model in [
-            "lumi.plug",
-            "lumi.plug.maus01",
-            "lumi.plug.maeu01",
-            "lumi.plug.mmeu01",
-            "lumi.relay.c2acn01",
-            "lumi.switch.n0agl1",
-            "lumi.switch.n0acn2",
-        ]:
-            attribute_names.update({149: CONSUMPTION, 150: VOLTAGE, 152: POWER})
-        elif self.endpoint.device.model == "lumi.sensor_motion.aq2":
-            attribute_names.update({11: ILLUMINANCE_MEASUREMENT})
-        elif self.endpoint.device.model == "lumi.curtain.acn002":
-            attribute_names.update({101: BATTERY_PERCENTAGE_REMAINING_ATTRIBUTE})
-        elif self.endpoint.device.model in ["lumi.motion.agl02", "lumi.motion.ac02", "lumi.motion.acn001"]:
-            attribute_names.update({101: ILLUMINANCE_MEASUREMENT})
-            if self.endpoint.device.model == "lumi.motion.ac02":
-                attribute_names.update({105: DETECTION_INTERVAL})
-                attribute_names.update({106: MOTION_SENSITIVITY})
-        elif self.endpoint.device.model == "lumi.motion.agl04":
-            attribute_names.update({102: DETECTION_INTERVAL})
-            attribute_names.update({105: MOTION_SENSITIVITY})
-            attribute_names.update({258: DETECTION_INTERVAL})
-            attribute_names.update({268: MOTION_SENSITIVITY})
-        elif self.endpoint.device.model == "lumi.motion.ac01":
-            attribute_names.update({5: POWER_OUTAGE_COUNT})
-            attribute_names.update({101: PRESENCE_DETECTED})
-            attribute_names.update({102: PRESENCE_EVENT})
-            attribute_names.update({103: MONITORING_MODE})
-            attribute_names.update({105: APPROACH_DISTANCE})
-            attribute_names.update({268: MOTION_SENSITIVITY})
-            attribute_names.update({322: PRESENCE_DETECTED})
-            attribute_names.update({323: PRESENCE_EVENT})
-            attribute_names.update({324: MONITORING_MODE})
-            attribute_names.update({326: APPROACH_DISTANCE})
-        elif self.endpoint.device.model == "lumi.sensor_smoke.acn03":
-            attribute_names.update({160: SMOKE})
-            attribute_names.update({161: SMOKE_DENSITY})
-            attribute_names.update({162: SELF_TEST})
-            attribute_names.update({163: BUZZER_MANUAL_MUTE})
-            attribute_names.update({164: HEARTBEAT_INDICATOR})
-            attribute_names.update({165: LINKAGE_ALARM})
-        result = {}
 
         # Some attribute reports end with a stray null byte
         while value not in (b"", b"\x00"):
-            skey = int(value[0])
+            tag = value[0]
             svalue, value = foundation.TypeValue.deserialize(value[1:])
-            result[skey] = svalue.value
-        for item, val in result.items():
-            key = (
-                attribute_names[item]
-                if item in attribute_names
-                else "0xff01-" + str(item)
-            )
-            attributes[key] = val
+            attributes[tag_names.get(tag) or _UNKNOWN_AQARA_TAGS[tag]] = svalue.value
 
         return attributes
 
@@ -726,6 +881,29 @@ class OnOffCluster(OnOff, CustomCluster):
         )
 
 
+# {model: (registered quirks, quick init quirks)}
+_QUICK_INIT_QUIRKS: dict[
+    str, tuple[tuple[type[CustomDevice], ...], tuple[type[XiaomiQuickInitDevice], ...]]
+] = {}
+
+
+def _get_quick_init_quirks(model: str) -> tuple[type[XiaomiQuickInitDevice], ...]:
+    """Return the quick init quirks of a model, cached until its quirks change."""
+    load_quirks(LUMI, model)
+    # quirks are added, removed and reordered in place, compare the contents
+    registered = tuple(zigpy.quirks.get_quirk_list(LUMI, model))
+
+    cached = _QUICK_INIT_QUIRKS.get(model)
+    if cached is not None and cached[0] == registered:
+        return cached[1]
+
+    quick_init_quirks = tuple(
+        quirk for quirk in registered if issubclass(quirk, XiaomiQuickInitDevice)
+    )
+    _QUICK_INIT_QUIRKS[model] = (registered, quick_init_quirks)
+    return quick_init_quirks
+
+
 def handle_quick_init(
     sender: zigpy.device.Device,
     profile: int,
@@ -738,6 +916,16 @@ def handle_quick_init(
     if src_ep == 0:
         return
 
+    # Only Basic cluster reports of the model attribute are of interest, check
+    # the raw frame before parsing it
+    if (
+        cluster != Basic.cluster_id
+        or _peek_global_command_id(message)
+        != foundation.GeneralCommand.Report_Attributes
+        or MODEL.to_bytes(2, "little") not in message
+    ):
+        return
+
     hdr, data = foundation.ZCLHeader.deserialize(message)
     sender.debug(
         """Received ZCL while uninitialized on endpoint id %s, cluster 0x%04x """
@@ -780,10 +968,7 @@ def handle_quick_init(
     if not model:
         return
 
-    for quirk in zigpy.quirks.get_quirk_list(LUMI, model):
-        if not issubclass(quirk, XiaomiQuickInitDevice):
-            continue
-
+    for quirk in _get_quick_init_quirks(model):
         sender.debug("Found '%s' quirk for '%s' model", quirk.__name__, model)
 
         try:
@@ -2,8 +2,7 @@
 
 from __future__ import annotations
 
-from functools import reduce
-import math
+import functools
 import struct
 from typing import Any
 
@@ -139,6 +138,14 @@ class ThermostatCluster(CustomCluster, Thermostat):
         return result
 
 
+# time (with NEXT_DAY_FLAG), two unused bytes, temperature in 0.01 °C
+_EVENT_STRUCT = struct.Struct(">H2xH")
+# magic byte, day selection and four events
+_SCHEDULE_STRUCT = struct.Struct(">BB" + "H2xH" * 4)
+SCHEDULE_MAGIC_BYTE = 0x04
+SCHEDULE_CACHE_SIZE = 64
+
+
 class ScheduleEvent:
     """Schedule event object."""
 
@@ -148,22 +155,17 @@ class ScheduleEvent:
         """Create ScheduleEvent object from bytes or string."""
         if isinstance(value, bytes):
             self._verify_buffer_len(value)
-            self._time = self._read_time_from_buf(value)
-            self._temp = self._read_temp_from_buf(value)
-            self._validate_time(self._time)
-            self._validate_temp(self._temp)
+            time, temp = _EVENT_STRUCT.unpack(value)
+            self._time = time & ~NEXT_DAY_FLAG
+            self._temp = temp / 100
         elif isinstance(value, str):
-            groups = value.split(",")
-            if len(groups) != 2:
-                raise ValueError("Time and temperature must contain ',' separator")
-            self._time = self._parse_time(groups[0])
-            self._temp = self._parse_temp(groups[1])
-            self._validate_time(self._time)
-            self._validate_temp(self._temp)
+            self._time, self._temp = self._parse(value)
         else:
             raise TypeError(
                 f"Cannot create ScheduleEvent object from type: {type(value)}"
             )
+        self._validate_time(self._time)
+        self._validate_temp(self._temp)
         self._is_next_day = is_next_day
 
     @staticmethod
@@ -172,10 +174,11 @@ class ScheduleEvent:
             raise ValueError("Buffer size must equal 6")
 
     @staticmethod
-    def _read_time_from_buf(buf):
-        time = struct.unpack_from(">H", buf, offset=0)[0]
-        time &= ~NEXT_DAY_FLAG
-        return time
+    def _parse(string):
+        groups = string.split(",")
+        if len(groups) != 2:
+            raise ValueError("Time and temperature must contain ',' separator")
+        return ScheduleEvent._parse_time(groups[0]), float(groups[1])
 
     @staticmethod
     def _parse_time(string):
@@ -188,14 +191,6 @@ class ScheduleEvent:
 
         return hours * 60 + minutes
 
-    @staticmethod
-    def _read_temp_from_buf(buf):
-        return struct.unpack_from(">H", buf, offset=4)[0] / 100
-
-    @staticmethod
-    def _parse_temp(string):
-        return float(string)
-
     @staticmethod
     def _validate_time(time):
         if time <= 0:
@@ -212,15 +207,6 @@ class ScheduleEvent:
         if (temp * 10) % 5 != 0:
             raise ValueError("Temperature must be whole or half degrees")
 
-    def _write_time_to_buf(self, buf):
-        time = self._time
-        if self._is_next_day:
-            time |= NEXT_DAY_FLAG
-        struct.pack_into(">H", buf, 0, time)
-
-    def _write_temp_to_buf(self, buf):
-        struct.pack_into(">H", buf, 4, int(self._temp * 100))
-
     def is_next_day(self):
         """Return if event is on the next day."""
         return self._is_next_day
@@ -235,138 +221,119 @@ class ScheduleEvent:
 
     def __str__(self):
         """Return event as string."""
-        return f"{math.floor(self._time / 60)}:{f'{self._time % 60:0>2}'},{f'{self._temp:.1f}'}"
+        return _format_event(self._time, self._temp)
 
     def serialize(self):
         """Serialize event to bytes."""
-        result = bytearray(6)
-        self._write_time_to_buf(result)
-        self._write_temp_to_buf(result)
-        return result
-
-
-class ScheduleSettings(t.LVBytes):
-    """Schedule settings object."""
+        time = self._time
+        if self._is_next_day:
+            time |= NEXT_DAY_FLAG
+        return bytearray(_EVENT_STRUCT.pack(time, int(self._temp * 100)))
 
-    def __new__(cls, value):
-        """Create ScheduleSettings object from bytes or string."""
-        day_selection = None
-        events = [None] * 4
-        if isinstance(value, bytes):
-            ScheduleSettings._verify_buffer_len(value)
-            ScheduleSettings._verify_magic_byte(value)
-            day_selection = ScheduleSettings._read_day_selection(value)
-            for i in range(4):
-                events[i] = ScheduleSettings._read_event(value, i)
-        elif isinstance(value, str):
-            groups = value.split("|")
-            ScheduleSettings._verify_string(groups)
-            day_selection = ScheduleSettings._read_day_selection(groups[0])
-            for i in range(4):
-                events[i] = ScheduleSettings._read_event(groups[i + 1], i)
-        else:
-            raise TypeError(
-                f"Cannot create ScheduleSettings object from type: {type(value)}"
-            )
 
-        for i in range(1, 4):
-            if events[i].get_time() < events[i - 1].get_time():
-                events[i].set_next_day(True)
-        ScheduleSettings._verify_event_durations(events)
+def _format_event(time: int, temp: float) -> str:
+    return f"{time // 60}:{time % 60:0>2},{temp:.1f}"
 
-        result = bytearray(b"\x04")
-        result.append(ScheduleSettings._get_day_selection_byte(day_selection))
-        for e in events:
-            result.extend(e.serialize())
-        return super().__new__(cls, bytes(result))
 
-    @staticmethod
-    def _verify_buffer_len(buf):
-        if len(buf) != 26:
-            raise ValueError("Buffer size must equal 26")
+def _verify_day_selection(days: list[str]) -> None:
+    if len(days) == 0 or len(days) > 7:
+        raise ValueError("Number of days selected must be between 1 and 7")
+    if len(days) != len(set(days)):
+        raise ValueError("Duplicate day names present")
+    for d in days:
+        if d not in DAYS_MAP:
+            raise ValueError(
+                f"String: {d} is not a valid day name, valid names: mon, tue, wed, thu, fri, sat, sun"
+            )
 
-    @staticmethod
-    def _verify_magic_byte(buf):
-        if struct.unpack_from("c", buf, offset=0)[0][0] != 0x04:
-            raise ValueError("Magic byte must be equal to 0x04")
 
-    @staticmethod
-    def _verify_string(groups):
+def _unpack_schedule(buf: bytes) -> tuple[int, list[tuple[int, float]]]:
+    """Return the day selection byte and (time, temperature) events of a blob."""
+    if len(buf) != _SCHEDULE_STRUCT.size:
+        raise ValueError(f"Buffer size must equal {_SCHEDULE_STRUCT.size}")
+    magic, days, *fields = _SCHEDULE_STRUCT.unpack(buf)
+    if magic != SCHEDULE_MAGIC_BYTE:
+        raise ValueError("Magic byte must be equal to 0x04")
+    if days & 0x01:
+        raise ValueError("Incorrect day selected")
+    if not days:
+        raise ValueError("Number of days selected must be between 1 and 7")
+    events = [
+        (time & ~NEXT_DAY_FLAG, temp / 100)
+        for time, temp in zip(fields[::2], fields[1::2])
+    ]
+    return days, events
+
+
+@functools.lru_cache(maxsize=SCHEDULE_CACHE_SIZE)
+def _encode_schedule_settings(value: str | bytes) -> bytes:
+    """Validate a schedule string or blob and return its canonical encoding.
+
+    Identical strings and blobs share one cache entry, so applying the same
+    schedule to many thermostats only parses and validates it once.
+    """
+    if isinstance(value, bytes):
+        days, events = _unpack_schedule(value)
+    else:
+        groups = value.split("|")
         if len(groups) != 5:
             raise ValueError("There must be 5 groups in a string")
-        days = groups[0].split(",")
-        ScheduleSettings._verify_day_selection_in_str(days)
-
-    @staticmethod
-    def _verify_day_selection_in_str(days):
-        if len(days) == 0 or len(days) > 7:
-            raise ValueError("Number of days selected must be between 1 and 7")
-        if len(days) != len(set(days)):
-            raise ValueError("Duplicate day names present")
-        for d in days:
-            if d not in DAYS_MAP:
-                raise ValueError(
-                    f"String: {d} is not a valid day name, valid names: mon, tue, wed, thu, fri, sat, sun"
-                )
-
-    @staticmethod
-    def _read_day_selection(value):
-        day_selection = []
-        if isinstance(value, bytes):
-            byte = struct.unpack_from("c", value, offset=1)[0][0]
-            if byte & 0x01:
-                raise ValueError("Incorrect day selected")
-            for i, v in DAYS_MAP.items():
-                if byte & v:
-                    day_selection.append(i)
-            ScheduleSettings._verify_day_selection_in_str(day_selection)
-        elif isinstance(value, str):
-            day_selection = value.split(",")
-            ScheduleSettings._verify_day_selection_in_str(day_selection)
-        return day_selection
+        day_selection = groups[0].split(",")
+        _verify_day_selection(day_selection)
+        days = 0x00
+        for d in day_selection:
+            days |= DAYS_MAP[d]
+        events = [ScheduleEvent._parse(group) for group in groups[1:]]
+
+    full_day = 24 * 60
+    fields = []
+    prev_time = None
+    total = 0
+    for time, temp in events:
+        ScheduleEvent._validate_time(time)
+        ScheduleEvent._validate_temp(temp)
+        raw_time = time
+        if prev_time is not None:
+            if time < prev_time:
+                raw_time |= NEXT_DAY_FLAG
+                duration = full_day - prev_time + time
+            else:
+                duration = time - prev_time
+            if duration < 60:
+                raise ValueError("The individual times must be at least 1 hour apart")
+            total += duration
+        prev_time = time
+        fields += (raw_time, int(temp * 100))
+    if total > full_day:
+        raise ValueError("The start and end times must be at most 24 hours apart")
+
+    return _SCHEDULE_STRUCT.pack(SCHEDULE_MAGIC_BYTE, days, *fields)
+
+
+@functools.lru_cache(maxsize=SCHEDULE_CACHE_SIZE)
+def _decode_schedule_settings(buf: bytes) -> str:
+    """Return the string representation of a canonical schedule blob."""
+    days, events = _unpack_schedule(buf)
+    return "|".join(
+        [",".join(d for d, bit in DAYS_MAP.items() if days & bit)]
+        + [_format_event(time, temp) for time, temp in events]
+    )
 
-    @staticmethod
-    def _read_event(value, index):
-        if isinstance(value, bytes):
-            event_buf = value[2 + index * 6 : 8 + index * 6]
-            return ScheduleEvent(event_buf)
-        elif isinstance(value, str):
-            return ScheduleEvent(value)
 
-    @staticmethod
-    def _verify_event_durations(events):
-        full_day = 24 * 60
-        prev_time = events[0].get_time()
-        durations = []
-        for i in range(1, 4):
-            event = events[i]
-            if event.is_next_day():
-                durations.append(full_day - prev_time + event.get_time())
-            else:
-                durations.append(event.get_time() - prev_time)
-            prev_time = event.get_time()
-        if any(d < 60 for d in durations):
-            raise ValueError("The individual times must be at least 1 hour apart")
-        if reduce((lambda x, y: x + y), durations) > full_day:
-            raise ValueError("The start and end times must be at most 24 hours apart")
+class ScheduleSettings(t.LVBytes):
+    """Schedule settings object."""
 
-    @staticmethod
-    def _get_day_selection_byte(day_selection):
-        byte = 0x00
-        for d in day_selection:
-            byte |= DAYS_MAP[d]
-        return byte
+    def __new__(cls, value):
+        """Create ScheduleSettings object from bytes or string."""
+        if not isinstance(value, (bytes, str)):
+            raise TypeError(
+                f"Cannot create ScheduleSettings object from type: {type(value)}"
+            )
+        return super().__new__(cls, _encode_schedule_settings(value))
 
     def __str__(self):
         """Return ScheduleSettings as string."""
-        day_selection = ScheduleSettings._read_day_selection(self)
-        events = [None] * 4
-        for i in range(4):
-            events[i] = ScheduleSettings._read_event(self, i)
-        result = ",".join(day_selection)
-        for e in events:
-            result += f"|{e}"
-        return result
+        return _decode_schedule_settings(self)
 
 
 class AqaraThermostatSpecificCluster(XiaomiAqaraE1Cluster):
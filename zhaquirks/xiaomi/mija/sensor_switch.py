@@ -1,6 +1,4 @@
 """Xiaomi mija button device."""
-import asyncio
-
 from zigpy.profiles import zha
 from zigpy.zcl.clusters.general import (
     Basic,
@@ -44,6 +42,7 @@ from zhaquirks.const import (
     UNKNOWN,
     ZHA_SEND_EVENT,
 )
+from zhaquirks.multipress import MultiPressDetector
 from zhaquirks.xiaomi import (
     LUMI,
     XIAOMI_NODE_DESC,
@@ -78,8 +77,12 @@ class MijaButton(XiaomiQuickInitDevice):
         def __init__(self, *args, **kwargs):
             """Init."""
             self._current_state = {}
-            self._loop = asyncio.get_running_loop()
-            self._timer_handle = None
+            self._presses = MultiPressDetector(
+                self._click,
+                on_hold=self._hold_timeout,
+                hold_time=self.hold_duration,
+                max_presses=1,
+            )
             super().__init__(*args, **kwargs)
 
         def _update_attribute(self, attrid, value):
@@ -90,16 +93,10 @@ class MijaButton(XiaomiQuickInitDevice):
                 value = not value
 
                 if value:
-                    if self._timer_handle:
-                        self._timer_handle.cancel()
-                    self._timer_handle = self._loop.call_later(
-                        self.hold_duration, self._hold_timeout
-                    )
-                elif self._timer_handle:
-                    self._timer_handle.cancel()
-                    self._timer_handle = None
-                    click_type = COMMAND_SINGLE
-                else:
+                    # read on every press, it may be changed on the instance
+                    self._presses.hold_time = self.hold_duration
+                    self._presses.button_down(attrid)
+                elif not self._presses.button_up(attrid):
                     self.listener_event(ZHA_SEND_EVENT, COMMAND_RELEASE, [])
 
             # Handle Multi Clicks
@@ -113,10 +110,16 @@ class MijaButton(XiaomiQuickInitDevice):
 
             super()._update_attribute(attrid, value)
 
-        def _hold_timeout(self):
+        def _click(self, button, count):
+            """Handle a press released before the hold timeout."""
+
+            self.listener_event(
+                ZHA_SEND_EVENT, COMMAND_CLICK, {CLICK_TYPE: COMMAND_SINGLE}
+            )
+
+        def _hold_timeout(self, button):
             """Handle hold timeout."""
 
-            self._timer_handle = None
             self.listener_event(ZHA_SEND_EVENT, COMMAND_HOLD, [])
 
     signature = {